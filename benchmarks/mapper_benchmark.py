@@ -0,0 +1,175 @@
+"""
+Benchmark: per-row vs bulk DataFrame-to-model mapping.
+
+Builds synthetic result frames shaped like the load queries and times, per
+frame, the per-row path (``to_dict("records")`` + ``map_<model>(row)``), the
+bulk ``map_<models>(df)`` mappers and, for training tables, the columnar
+``<Table>Columns.from_frame`` arrays used by ``load_data``.
+
+Run with ``python -m benchmarks.mapper_benchmark [--sets N] [--repeat R]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+
+from mapper import (
+    MEASUREMENT_COLUMNS,
+    map_body_composition,
+    map_body_compositions,
+    map_body_measurement,
+    map_body_measurements,
+    map_exercise_muscle_target,
+    map_exercise_muscle_targets,
+    map_workout_exercise,
+    map_workout_exercises,
+    map_workout_session,
+    map_workout_sessions,
+    map_workout_set,
+    map_workout_sets,
+)
+from metrics.columnar import SessionColumns, SetColumns, WorkoutExerciseColumns
+
+
+def synthetic_frames(sets: int, seed: int = 0) -> dict[str, pd.DataFrame]:
+    """Frames with ~4 exercises per session and ~4 sets per exercise."""
+    rng = np.random.default_rng(seed)
+    workout_exercises = max(sets // 4, 1)
+    sessions = max(workout_exercises // 4, 1)
+    days = max(sessions // 3, 1)
+
+    return {
+        "sessions": pd.DataFrame(
+            {
+                "session_id": np.arange(1, sessions + 1),
+                "session_date": pd.Timestamp("2020-01-01") + pd.to_timedelta(np.arange(sessions), unit="D"),
+                "start_time": ["18:00:00"] * sessions,
+                "end_time": ["19:15:00"] * sessions,
+            }
+        ),
+        "workout_exercises": pd.DataFrame(
+            {
+                "workout_exercise_id": np.arange(1, workout_exercises + 1),
+                "session_id": np.arange(workout_exercises) // 4 + 1,
+                "exercise_id": rng.integers(1, 60, workout_exercises),
+            }
+        ),
+        "sets": pd.DataFrame(
+            {
+                "workout_exercise_id": np.arange(sets) // 4 + 1,
+                "set_number": np.arange(sets) % 4 + 1,
+                "repetitions": rng.integers(3, 15, sets),
+                "weight": rng.integers(20, 200, sets) * 1.0,
+                "duration_seconds": np.full(sets, np.nan),
+                "rir": rng.integers(0, 4, sets) * 1.0,
+            }
+        ),
+        "targets": pd.DataFrame(
+            {
+                "exercise_id": np.repeat(np.arange(1, 61), 3),
+                "muscle_group": ["Chest", "Shoulders", "Arms"] * 60,
+                "muscle_name": ["Pectoralis", "Deltoid", "Triceps"] * 60,
+                "role": ["primary", "secondary", "stabilizer"] * 60,
+                "set_factor": [1.0, 0.5, 0.25] * 60,
+            }
+        ),
+        "measurements": pd.DataFrame(
+            {
+                "measurement_date": pd.date_range("2020-01-01", periods=days, freq="D").date,
+                **{col: rng.normal(60, 10, days) for col in MEASUREMENT_COLUMNS},
+            }
+        ),
+        "composition": pd.DataFrame(
+            {
+                "measurement_date": pd.date_range("2020-01-01", periods=days, freq="D").date,
+                "weight": rng.normal(80, 2, days),
+                "muscle_mass": rng.normal(38, 1, days),
+                "fat_mass": rng.normal(14, 1, days),
+                "water_mass": rng.normal(45, 1, days),
+                "body_fat_percentage": rng.normal(16, 1, days),
+                "method": ["scale"] * days,
+            }
+        ),
+    }
+
+
+def _per_row(mapper: Callable[[dict], Any], flatten: bool = False) -> Callable[[pd.DataFrame], list]:
+    if flatten:
+        return lambda df: [item for row in df.to_dict("records") for item in mapper(row)]
+    return lambda df: [mapper(row) for row in df.to_dict("records")]
+
+
+CASES: dict[str, dict[str, Callable[[pd.DataFrame], Any]]] = {
+    "sessions": {
+        "per_row": _per_row(map_workout_session),
+        "bulk": map_workout_sessions,
+        "columnar": SessionColumns.from_frame,
+    },
+    "workout_exercises": {
+        "per_row": _per_row(map_workout_exercise),
+        "bulk": map_workout_exercises,
+        "columnar": WorkoutExerciseColumns.from_frame,
+    },
+    "sets": {
+        "per_row": _per_row(map_workout_set),
+        "bulk": map_workout_sets,
+        "columnar": SetColumns.from_frame,
+    },
+    "targets": {
+        "per_row": _per_row(map_exercise_muscle_target),
+        "bulk": map_exercise_muscle_targets,
+    },
+    "measurements": {
+        "per_row": _per_row(map_body_measurement, flatten=True),
+        "bulk": map_body_measurements,
+    },
+    "composition": {
+        "per_row": _per_row(map_body_composition),
+        "bulk": map_body_compositions,
+    },
+}
+
+
+def _best_of(func: Callable[[pd.DataFrame], Any], df: pd.DataFrame, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def run(sets: int, repeat: int) -> pd.DataFrame:
+    """Best-of-``repeat`` milliseconds per frame and path, with the bulk speedup."""
+    frames = synthetic_frames(sets)
+    rows = []
+    for name, paths in CASES.items():
+        df = frames[name]
+        timings = {path: _best_of(func, df, repeat) * 1000 for path, func in paths.items()}
+        rows.append(
+            {
+                "frame": name,
+                "rows": len(df),
+                **{f"{path}_ms": round(ms, 2) for path, ms in timings.items()},
+                "bulk_speedup": round(timings["per_row"] / timings["bulk"], 1),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sets", type=int, default=100_000, help="number of set rows")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per path (best is reported)")
+    args = parser.parse_args()
+
+    print(run(args.sets, args.repeat).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
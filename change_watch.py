@@ -0,0 +1,208 @@
+"""
+Database change detection.
+
+``ChangeWatcher.token()`` is a cheap value that changes whenever the data
+the app loads changes, whoever wrote it (this process, another Streamlit
+replica, an import script). The app passes it to its dataset cache, so the
+dataset is refreshed (incrementally, see ``data_sync``) exactly when the
+database changed instead of on a fixed schedule.
+
+Two strategies:
+
+* LISTEN/NOTIFY, on PostgreSQL once ``python -m db.migrate`` has installed
+  the ``notify_dataset_change`` triggers. A daemon thread listens on a
+  dedicated connection and counts notifications; the token is that count.
+  Every replica listening on the database hears every committed write.
+* Polling everywhere else, and while the listener connection is lost (it is
+  re-established with exponential backoff, from ``token()`` or, with
+  ``background_poll``, from the polling thread): the token is the dataset
+  fingerprint (row count and maximum key per
+  table, one small query, see ``db.queries.get_dataset_fingerprint``),
+  probed at most every ``poll_interval`` seconds, on the caller's thread or,
+  with ``background_poll``, on a daemon thread so ``token()`` never waits
+  for the database. Polling sees inserts and
+  deletes; in-place updates made outside the app are only picked up by the
+  notifications or once the dataset is older than the ``max_age`` passed to
+  ``DatasetSync.serve`` (hourly in the app).
+"""
+
+from __future__ import annotations
+
+import logging
+import select
+import time
+from functools import partial
+from threading import Event, Lock, Thread
+from typing import Any, Callable, Hashable
+
+import pandas as pd
+
+from db.migrate import CHANGE_CHANNEL
+from db.queries import get_dataset_fingerprint
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 15.0
+
+# Seconds between liveness checks of an idle listener connection.
+_LISTEN_TIMEOUT = 30.0
+
+# First and maximum delay in seconds between attempts to restore a lost
+# listener connection.
+_RECONNECT_DELAY = 1.0
+_MAX_RECONNECT_DELAY = 300.0
+
+
+class ChangeWatcher:
+    """Detects database changes by notification or by polling.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Database to watch.
+    poll_interval : float
+        Minimum seconds between two fingerprint probes in polling mode.
+    listen : bool
+        Try LISTEN/NOTIFY (PostgreSQL only); False always polls.
+    probe : callable, optional
+        Returns the fingerprint frame; defaults to
+        ``get_dataset_fingerprint(engine)``.
+    background_poll : bool
+        Probe on a daemon thread every ``poll_interval`` seconds instead of
+        inside ``token()``.
+    """
+
+    def __init__(
+        self,
+        engine,
+        poll_interval: float = DEFAULT_POLL_INTERVAL,
+        listen: bool = True,
+        probe: Callable[[], pd.DataFrame] | None = None,
+        background_poll: bool = False,
+    ) -> None:
+        self.engine = engine
+        self.poll_interval = poll_interval
+        self._probe = probe or partial(get_dataset_fingerprint, engine)
+        self._lock = Lock()
+        self._stop = Event()
+        self._notifications = 0
+        self._listening = False
+        self._polled_at: float | None = None
+        self._polled_token: Hashable = None
+        self._background_poll = background_poll
+        self._listen_enabled = listen and engine.dialect.name == "postgresql"
+        self._reconnect_lock = Lock()
+        self._reconnect_delay = _RECONNECT_DELAY
+        self._reconnect_at: float | None = None
+        if self._listen_enabled:
+            self._start_listener()
+        if background_poll:
+            self._poll(force=True)
+            Thread(target=self._poll_forever, name="change_poll", daemon=True).start()
+
+    @property
+    def mode(self) -> str:
+        """``"notify"`` while the listener is connected, otherwise ``"poll"``."""
+        return "notify" if self._listening else "poll"
+
+    def token(self) -> Hashable:
+        """Value that changes when the watched tables change."""
+        if self._listening:
+            return ("notify", self._notifications)
+        if not self._background_poll and self._reconnect():
+            return ("notify", self._notifications)
+        if self._background_poll:
+            return ("poll", self._polled_token)
+        return ("poll", self._poll())
+
+    def stop(self) -> None:
+        """Stop the listener and background polling threads."""
+        self._stop.set()
+
+    def _poll(self, force: bool = False) -> Hashable:
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._polled_at is not None and now - self._polled_at < self.poll_interval:
+                return self._polled_token
+            try:
+                fingerprint = self._probe()
+                self._polled_token = tuple(fingerprint.astype(str).itertuples(index=False, name=None))
+            except Exception:
+                logger.warning("Dataset change probe failed, keeping the previous state", exc_info=True)
+            self._polled_at = now
+            return self._polled_token
+
+    def _poll_forever(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            if not self._listening and not self._reconnect():
+                self._poll(force=True)
+
+    def _reconnect(self) -> bool:
+        """Retry a lost listener once its backoff delay has passed; True if listening again."""
+        due = self._reconnect_at is not None and time.monotonic() >= self._reconnect_at
+        if not due or not self._listen_enabled or self._stop.is_set():
+            return False
+        if not self._reconnect_lock.acquire(blocking=False):
+            return False
+        try:
+            if self._reconnect_at is None or time.monotonic() < self._reconnect_at:
+                return self._listening
+            self._start_listener()
+            return self._listening
+        finally:
+            self._reconnect_lock.release()
+
+    def _schedule_reconnect(self) -> None:
+        self._reconnect_at = time.monotonic() + self._reconnect_delay
+        self._reconnect_delay = min(self._reconnect_delay * 2, _MAX_RECONNECT_DELAY)
+
+    def _start_listener(self) -> None:
+        try:
+            connection = self.engine.raw_connection()
+            connection.detach()
+            dbapi_connection = connection.dbapi_connection
+            dbapi_connection.autocommit = True
+            cursor = dbapi_connection.cursor()
+            cursor.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_proc WHERE proname = 'notify_dataset_change')"
+            )
+            if not cursor.fetchone()[0]:
+                logger.info("Change notification triggers not installed, polling for changes")
+                dbapi_connection.close()
+                self._listen_enabled = False
+                return
+            cursor.execute(f"LISTEN {CHANGE_CHANNEL}")
+        except Exception:
+            logger.warning("Could not listen for change notifications, polling instead", exc_info=True)
+            self._schedule_reconnect()
+            return
+
+        self._reconnect_at = None
+        self._reconnect_delay = _RECONNECT_DELAY
+        self._listening = True
+        Thread(target=self._receive, args=(dbapi_connection,), name="change_watch", daemon=True).start()
+
+    def _receive(self, connection: Any) -> None:
+        lost = False
+        try:
+            while not self._stop.is_set():
+                readable, _, _ = select.select([connection], [], [], _LISTEN_TIMEOUT)
+                if not readable:
+                    connection.cursor().execute("SELECT 1")
+                    continue
+                connection.poll()
+                if connection.notifies:
+                    connection.notifies.clear()
+                    with self._lock:
+                        self._notifications += 1
+        except Exception:
+            logger.warning("Lost the change notification connection, polling until it is restored", exc_info=True)
+            lost = True
+        finally:
+            self._listening = False
+            try:
+                connection.close()
+            except Exception:
+                pass
+        if lost:
+            self._schedule_reconnect()
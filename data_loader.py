@@ -7,65 +7,640 @@ structured MetricsInput for processing by the metrics engine.
 This module bridges the data persistence layer with domain logic.
 """
 
-from typing import Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from datetime import date
+from typing import Any, Callable, Collection, Dict, NamedTuple
 
+import numpy as np
 import pandas as pd
-import streamlit as st
 
 from data_manager import DataManager
+from data_version import DatasetVersion, new_dataset_version
+from db.queries import SYNC_TABLES
+from instrumentation import PerformanceReport, input_cardinalities
+from mapped_dataset import MappedVersion
 from mapper import (
-    map_body_composition,
-    map_body_measurement,
-    map_exercise,
-    map_exercise_muscle_target,
-    map_workout_exercise,
-    map_workout_session,
-    map_workout_set,
+    map_body_compositions,
+    map_body_measurements,
+    map_exercise_muscle_targets,
+    map_exercises,
 )
-from metrics.input import MetricsInput
+from metrics.columnar import ColumnarMetricsInput, read_only_frame
+from metrics.partitions import MonthPartitions
+from metrics.rollups import RollupPartitions, TrainingRollups
+from models.exercise import Exercise
+from models.exercise_muscle_target import ExerciseMuscleTarget
 
 
-@st.cache_data
-def load_data() -> Tuple[MetricsInput, pd.DataFrame]:
+_SETS_UI_COLUMNS = [
+    "session_id",
+    "set_id",
+    "session_date",
+    "exercise_name",
+    "body_part",
+    "set_number",
+    "repetitions",
+    "weight",
+    "duration_seconds",
+    "volume",
+    "rir",
+]
+_TRAINING_ROW_COLUMNS = [
+    "session_id",
+    "session_date",
+    "start_time",
+    "end_time",
+    "workout_exercise_id",
+    "exercise_id",
+    "exercise_name",
+    "body_part",
+    "set_id",
+    "set_number",
+    "repetitions",
+    "weight",
+    "duration_seconds",
+    "volume",
+    "rir",
+]
+_INTEGER_COLUMNS = [
+    "workout_exercise_id",
+    "exercise_id",
+    "set_id",
+    "set_number",
+    "repetitions",
+    "duration_seconds",
+    "rir",
+]
+
+
+class TrainingFrames(NamedTuple):
+    """Frames derived from one ``load_training_rows`` result."""
+
+    sessions: pd.DataFrame
+    workout_exercises: pd.DataFrame
+    sets_raw: pd.DataFrame
+    sets_ui: pd.DataFrame
+
+
+class LoadedData(NamedTuple):
+    """Result of one dataset load."""
+
+    metrics_input: ColumnarMetricsInput
+    sets_df: pd.DataFrame
+    load_report: Dict[str, Any]
+    version: DatasetVersion
+    partitions: MonthPartitions
+
+
+class RollupData(NamedTuple):
+    """Result of one aggregate-only load: SQL rollups instead of sets.
+
+    Serves the pages that only read rollup metric groups when
+    ``AGGREGATION_MODE=sql``, so their data scales with sessions.
+    """
+
+    exercises: list[Exercise]
+    exercise_muscle_targets: list[ExerciseMuscleTarget]
+    load_report: Dict[str, Any]
+    version: DatasetVersion
+    partitions: RollupPartitions
+
+
+def load_data(
+    workers: int | None = None,
+    dm: DataManager | None = None,
+    report: PerformanceReport | None = None,
+    mapped: MappedVersion | None = None,
+    on_rows: Callable[[pd.DataFrame, Dict[str, pd.DataFrame]], None] | None = None,
+) -> LoadedData:
     """Load all application data from database.
     
-    This is the main entry point for data loading. Data is cached automatically
-    by Streamlit to avoid redundant database queries.
+    This is the one full-load routine: the app calls it through
+    ``DatasetSync``, which keeps the result and refreshes it incrementally.
     
+    Training data is kept columnar: sessions, workout exercises and sets are
+    read straight into typed NumPy arrays instead of per-row dataclasses.
+    They come from a single set-level join that also yields the UI sets
+    frame, so every set row is transferred once.
+
+    Every query and build step is timed as a stage of a ``PerformanceReport``;
+    the stages are logged when they run and returned for the UI.
+
+    Args:
+        workers: Opt-in concurrent mode: run the independent queries on a
+            thread pool of this size, each on its own pooled connection, so
+            a cold load costs about as much as the slowest query. ``None`` or
+            1 runs them one after another.
+        dm: DataManager to query with; a new one by default.
+        report: Report to record the stages in; a new one by default.
+        mapped: Version to share the column arrays through with other
+            processes (see ``assemble_loaded_data``).
+        on_rows: Called with the joined training rows and the reference
+            frames by name before the dataset is built, e.g. to keep them
+            for incremental refreshes.
+
     Returns:
-        Tuple of:
-        - MetricsInput: structured domain objects for metrics computation
-        - pd.DataFrame: raw sets data with joined names for UI display
+        LoadedData with:
+        - metrics_input: MetricsInput-compatible columnar data for metrics computation
+        - sets_df: raw sets data with joined names for UI display
+        - load_report: per-stage load timings (``PerformanceReport.to_dict()``)
+        - version: dataset version stamped before the queries ran, used as
+          the cache key of everything derived from this load
+        - partitions: YYYY-MM month index over the input and the sets frame
     """
-    dm = DataManager()
-    sets_df = dm.load_sets_ui()
-
-    sessions = [map_workout_session(row) for row in dm.load_sessions().to_dict("records")]
-    workout_exercises = [map_workout_exercise(row) for row in dm.load_workout_exercises().to_dict("records")]
-    sets = [map_workout_set(row) for row in dm.load_sets_raw().to_dict("records")]
-    exercises = [map_exercise(row) for row in dm.load_exercises().to_dict("records")]
-    exercise_muscle_targets = [
-        map_exercise_muscle_target(row)
-        for row in dm.load_exercise_muscle_targets().to_dict("records")
-    ]
-    muscle_groups = list({ex.body_part for ex in exercises if ex.body_part})
-    body = dm.load_body_data()
-    body_measurements = [
-        measurement
-        for row in body["measurements"].to_dict("records")
-        for measurement in map_body_measurement(row)
+    version = new_dataset_version()
+    dm = dm or DataManager()
+    report = report or PerformanceReport("load_data")
+
+    results = run_queries(
+        report,
+        {"load_training_rows": dm.load_training_rows, **reference_queries(dm)},
+        workers,
+    )
+
+    with report.stage("split_training_rows") as stage:
+        rows = results.pop("load_training_rows")
+        if on_rows is not None:
+            on_rows(rows, results)
+        training = split_training_rows(rows)
+        stage["rows"] = len(training.sets_raw)
+
+    return assemble_loaded_data(report, training, results, version, mapped)
+
+
+def load_training_rollups(
+    bounds: tuple[date, date] | None = None,
+    dm: DataManager | None = None,
+) -> TrainingRollups:
+    """Per-session and per-exercise-session aggregates computed in SQL.
+
+    Args:
+        bounds: Inclusive (start, end) session dates, as returned by
+            ``DateFilter.bounds()``; None loads all time.
+        dm: DataManager to query with; a new one by default.
+    """
+    dm = dm or DataManager()
+    start, end = bounds or (None, None)
+    return TrainingRollups(
+        sessions=dm.load_session_rollups(start, end),
+        exercise_sessions=dm.load_exercise_session_rollups(start, end),
+    )
+
+
+def load_rollup_data(
+    workers: int | None = None,
+    dm: DataManager | None = None,
+    report: PerformanceReport | None = None,
+) -> RollupData:
+    """Load the all-time training rollups and the exercise catalogue, but no sets.
+
+    Args:
+        workers: Thread pool size for the queries, as in ``load_data``.
+        dm: DataManager to query with; a new one by default.
+        report: Report to record the stages in; a new one by default.
+    """
+    version = new_dataset_version()
+    dm = dm or DataManager()
+    report = report or PerformanceReport("load_rollups")
+
+    results = run_queries(
+        report,
+        {
+            "load_session_rollups": dm.load_session_rollups,
+            "load_exercise_session_rollups": dm.load_exercise_session_rollups,
+            "load_exercises": dm.load_exercises,
+            "load_exercise_muscle_targets": dm.load_exercise_muscle_targets,
+        },
+        workers,
+    )
+    with report.stage("map_reference_data") as stage:
+        exercises = map_exercises(results["load_exercises"])
+        exercise_muscle_targets = map_exercise_muscle_targets(results["load_exercise_muscle_targets"])
+        stage["rows"] = len(exercises) + len(exercise_muscle_targets)
+    with report.stage("build_rollup_partitions") as stage:
+        partitions = RollupPartitions(
+            TrainingRollups(
+                sessions=results["load_session_rollups"],
+                exercise_sessions=results["load_exercise_session_rollups"],
+            )
+        )
+        stage["months"] = len(partitions.months)
+
+    return RollupData(exercises, exercise_muscle_targets, report.to_dict(), version, partitions)
+
+
+def reference_queries(dm: DataManager) -> Dict[str, Callable[[], Any]]:
+    """Queries for the exercise catalogue, muscle map and body data, by stage name."""
+    return {
+        "load_exercises": dm.load_exercises,
+        "load_exercise_muscle_targets": dm.load_exercise_muscle_targets,
+        "load_body_measurements": dm.load_body_measurements,
+        "load_body_composition": dm.load_body_composition,
+    }
+
+
+def assemble_loaded_data(
+    report: PerformanceReport,
+    training: TrainingFrames,
+    reference: Dict[str, pd.DataFrame],
+    version: DatasetVersion,
+    mapped: MappedVersion | None = None,
+) -> LoadedData:
+    """Build the metrics input, UI frame and month partitions of one dataset.
+
+    ``reference`` holds the results of ``reference_queries`` by name. The
+    build steps are recorded as stages of ``report``. With ``mapped`` the
+    column arrays of the input and the partitions are replaced by read-only
+    memory-mapped files shared with other processes (see ``mapped_dataset``);
+    if another process already published the input columns of that version,
+    they are mapped instead of built.
+    """
+    reference_models = _map_reference(report, reference)
+
+    metrics_input = None
+    if mapped is not None:
+        with report.stage("map_published_input") as stage:
+            metrics_input = mapped.published_input(**reference_models)
+            stage["published"] = metrics_input is not None
+    if metrics_input is None:
+        with report.stage("build_columnar_input") as stage:
+            # Shared read-only by every session (see DatasetSync), never copied.
+            metrics_input = ColumnarMetricsInput.from_frames(
+                sessions_df=training.sessions,
+                workout_exercises_df=training.workout_exercises,
+                sets_df=training.sets_raw,
+                **reference_models,
+            ).freeze()
+            stage.update(input_cardinalities(metrics_input))
+
+    return _finish_loaded_data(report, metrics_input, training.sets_ui, version, mapped)
+
+
+def patch_loaded_data(
+    report: PerformanceReport,
+    previous: LoadedData,
+    before: Dict[str, pd.DataFrame],
+    after: Dict[str, pd.DataFrame],
+    changed: Dict[str, np.ndarray],
+    reference: Dict[str, pd.DataFrame],
+    version: DatasetVersion,
+    mapped: MappedVersion | None = None,
+) -> LoadedData:
+    """``previous`` with the training rows of the ``changed`` keys rebuilt.
+
+    ``before`` and ``after`` are the per-table frames (``training_tables``)
+    ``previous`` was built from and their patched state; ``changed`` holds
+    the primary keys per table whose rows were added, updated or deleted.
+    Training rows are ordered by session date, newest first, so every
+    session on a day touched by a change is joined and split again as in a
+    full load and its rows are spliced into the column arrays and the UI
+    frame of ``previous``. The other rows are not re-joined or re-sorted, and
+    the month frames of untouched months are reused.
+
+    The exercise catalogue in ``reference`` must be the one ``previous`` was
+    built with, since exercise names order the rows of a day; use
+    ``assemble_loaded_data`` when it changed.
+    """
+    with report.stage("select_changed_days") as stage:
+        days = _changed_days(before, after, changed)
+        replaced = before["workout_sessions"].loc[
+            _session_days(before["workout_sessions"]).isin(days).to_numpy(), "session_id"
+        ]
+        rebuilt = _tables_on_days(after, days)
+        stage["rows"] = len(rebuilt["workout_sessions"])
+
+    with report.stage("join_training_rows") as stage:
+        rows = join_training_tables(rebuilt, reference["load_exercises"])
+        stage["rows"] = len(rows)
+    with report.stage("split_training_rows") as stage:
+        training = split_training_rows(rows)
+        stage["rows"] = len(training.sets_raw)
+
+    reference_models = _map_reference(report, reference)
+
+    with report.stage("patch_columnar_input") as stage:
+        columns = previous.metrics_input
+        added = ColumnarMetricsInput.from_frames(
+            sessions_df=training.sessions,
+            workout_exercises_df=training.workout_exercises,
+            sets_df=training.sets_raw,
+            **reference_models,
+        )
+        old_workout_exercises = before["workout_exercises"]
+        replaced_workout_exercises = old_workout_exercises.loc[
+            old_workout_exercises["session_id"].isin(replaced), "workout_exercise_id"
+        ]
+
+        sessions = columns.session_columns
+        keep = ~np.isin(sessions.session_id, replaced)
+        session_columns = _splice_columns(
+            sessions,
+            keep,
+            added.session_columns,
+            _day_key(sessions.session_date[keep]),
+            _day_key(added.session_columns.session_date),
+        )
+        workout_exercises = columns.workout_exercise_columns
+        keep = ~np.isin(workout_exercises.session_id, replaced)
+        workout_exercise_columns = _splice_columns(
+            workout_exercises,
+            keep,
+            added.workout_exercise_columns,
+            workout_exercises.workout_exercise_id[keep],
+            added.workout_exercise_columns.workout_exercise_id,
+        )
+        sets = columns.set_columns
+        keep = ~np.isin(sets.workout_exercise_id, replaced_workout_exercises)
+        set_columns = _splice_columns(
+            sets,
+            keep,
+            added.set_columns,
+            sets.workout_exercise_id[keep],
+            added.set_columns.workout_exercise_id,
+        )
+        metrics_input = ColumnarMetricsInput(
+            session_columns=session_columns,
+            workout_exercise_columns=workout_exercise_columns,
+            set_columns=set_columns,
+            **reference_models,
+        ).freeze()
+
+        kept_sets = previous.sets_df[~previous.sets_df["session_id"].isin(replaced).to_numpy()]
+        sets_ui = _restore_integers(
+            splice_rows(
+                kept_sets,
+                training.sets_ui,
+                np.searchsorted(
+                    _day_key(pd.to_datetime(kept_sets["session_date"]).to_numpy()),
+                    _day_key(pd.to_datetime(training.sets_ui["session_date"]).to_numpy()),
+                ),
+            )
+        )
+        stage["rows"] = len(training.sets_raw)
+        stage.update(input_cardinalities(metrics_input))
+
+    months = set(days.dropna().dt.strftime("%Y-%m"))
+    return _finish_loaded_data(
+        report, metrics_input, sets_ui, version, mapped, previous=previous.partitions, changed_months=months
+    )
+
+
+def splice_rows(kept: pd.DataFrame, added: pd.DataFrame, positions: np.ndarray) -> pd.DataFrame:
+    """``kept`` with the rows of ``added`` inserted before the ``kept`` rows at ``positions``.
+
+    ``positions`` are ascending, one per ``added`` row, as returned by
+    ``np.searchsorted`` over the sort key of ``kept``; nothing is re-sorted.
+    Numeric columns stay numeric when one side only has NULLs (read back as
+    object). The result has a fresh ``RangeIndex``.
+    """
+    added = added[list(kept.columns)]
+    numeric = [
+        column for column in kept.columns
+        if kept[column].dtype.kind in "iuf" or added[column].dtype.kind in "iuf"
     ]
-    body_composition = [map_body_composition(row) for row in body["composition"].to_dict("records")]
-
-    metrics_input = MetricsInput(
-        sessions=sessions,
-        workout_exercises=workout_exercises,
-        sets=sets,
-        exercises=exercises,
-        exercise_muscle_targets=exercise_muscle_targets,
-        muscle_groups=muscle_groups,
-        body_measurements=body_measurements,
-        body_composition=body_composition,
+    kept = kept.astype({column: "float64" for column in numeric if kept[column].dtype == object})
+    added = added.astype({column: "float64" for column in numeric if added[column].dtype == object})
+    order = np.insert(np.arange(len(kept)), positions, np.arange(len(kept), len(kept) + len(added)))
+    return pd.concat([kept, added], ignore_index=True).take(order).reset_index(drop=True)
+
+
+def _map_reference(report: PerformanceReport, reference: Dict[str, pd.DataFrame]) -> Dict[str, Any]:
+    """Reference domain objects of ``reference`` as ``ColumnarMetricsInput`` fields."""
+    with report.stage("map_reference_data") as stage:
+        exercises = map_exercises(reference["load_exercises"])
+        exercise_muscle_targets = map_exercise_muscle_targets(reference["load_exercise_muscle_targets"])
+        muscle_groups = list({ex.body_part for ex in exercises if ex.body_part})
+        body_measurements = map_body_measurements(reference["load_body_measurements"])
+        body_composition = map_body_compositions(reference["load_body_composition"])
+        stage["rows"] = (
+            len(exercises) + len(exercise_muscle_targets)
+            + len(body_measurements) + len(body_composition)
+        )
+    return {
+        "exercises": exercises,
+        "exercise_muscle_targets": exercise_muscle_targets,
+        "muscle_groups": muscle_groups,
+        "body_measurements": body_measurements,
+        "body_composition": body_composition,
+    }
+
+
+def _finish_loaded_data(
+    report: PerformanceReport,
+    metrics_input: ColumnarMetricsInput,
+    sets_ui: pd.DataFrame,
+    version: DatasetVersion,
+    mapped: MappedVersion | None,
+    previous: MonthPartitions | None = None,
+    changed_months: Collection[str] = (),
+) -> LoadedData:
+    """Share the input's arrays (with ``mapped``) and partition it by month."""
+    share = None
+    if mapped is not None:
+        with report.stage("map_columns") as stage:
+            metrics_input = mapped.share_input(metrics_input)
+            share = mapped.share
+            stage["written"] = mapped.written
+
+    with report.stage("build_month_partitions") as stage:
+        # Shared by every session like the input: in-place writes raise.
+        sets_ui = read_only_frame(sets_ui)
+        partitions = MonthPartitions(
+            metrics_input, sets_ui, share=share, previous=previous, changed_months=changed_months
+        )
+        stage["months"] = len(partitions.months)
+
+    report.cardinalities = input_cardinalities(metrics_input)
+    return LoadedData(metrics_input, sets_ui, report.to_dict(), version, partitions)
+
+
+def split_training_rows(rows: pd.DataFrame) -> TrainingFrames:
+    """Derive the per-table frames and the UI sets frame from the joined rows.
+
+    ``rows`` is the result of ``DataManager.load_training_rows``: one row per
+    set, plus one row for every session without workout exercises and every
+    workout exercise without sets. The derived frames have the row order and
+    columns of the former per-table queries:
+
+    - sessions: newest first
+    - workout exercises: by id
+    - raw sets: by workout exercise and set number
+    - UI sets: by date (newest first), exercise name and set number
+    """
+    sessions = rows.drop_duplicates("session_id")[
+        ["session_id", "session_date", "start_time", "end_time"]
+    ].reset_index(drop=True)
+    sessions["session_date"] = pd.to_datetime(sessions["session_date"])
+
+    has_exercise = rows["workout_exercise_id"].notna()
+    workout_exercises = _restore_integers(
+        rows.loc[has_exercise, ["workout_exercise_id", "session_id", "exercise_id"]]
+        .drop_duplicates("workout_exercise_id")
+        .sort_values("workout_exercise_id", kind="stable")
     )
-    
-    return metrics_input, sets_df
+
+    set_rows = _restore_integers(rows[rows["set_id"].notna()])
+    sets_raw = set_rows[
+        ["workout_exercise_id", "set_number", "repetitions", "weight", "duration_seconds", "rir"]
+    ].sort_values(["workout_exercise_id", "set_number"], kind="stable").reset_index(drop=True)
+    sets_ui = set_rows.loc[set_rows["exercise_name"].notna(), _SETS_UI_COLUMNS].reset_index(drop=True)
+
+    return TrainingFrames(sessions, workout_exercises, sets_raw, sets_ui)
+
+
+def training_tables(rows: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Per-table frames (``SYNC_TABLES`` columns, by primary key) of the joined rows."""
+    tables = {}
+    for table, (key, columns) in SYNC_TABLES.items():
+        present = rows[rows[key].notna()].drop_duplicates(key)
+        tables[table] = _restore_integers(present[list(columns)].sort_values(key, kind="stable"))
+    return tables
+
+
+def join_training_tables(tables: Dict[str, pd.DataFrame], exercises: pd.DataFrame) -> pd.DataFrame:
+    """Rebuild the ``load_training_rows`` result from per-table frames.
+
+    Same joins, columns and ordering as ``db.queries.get_training_rows``, so
+    ``split_training_rows`` of the result matches a fresh load.
+    """
+    rows = (
+        tables["workout_sessions"]
+        .merge(tables["workout_exercises"], on="session_id", how="left")
+        .merge(tables["workout_sets"], on="workout_exercise_id", how="left")
+        .merge(exercises[["exercise_id", "exercise_name", "body_part"]], on="exercise_id", how="left")
+    )
+    rows["volume"] = rows["repetitions"] * rows["weight"]
+    rows = rows.sort_values(
+        ["session_date", "exercise_name", "set_number"],
+        ascending=[False, True, True],
+        kind="stable",
+    )
+    return rows[_TRAINING_ROW_COLUMNS].reset_index(drop=True)
+
+
+def _session_days(sessions: pd.DataFrame) -> pd.Series:
+    """Calendar day of every session (NaT without a date)."""
+    return pd.to_datetime(sessions["session_date"]).dt.floor("D").reset_index(drop=True)
+
+
+def _changed_days(
+    before: Dict[str, pd.DataFrame],
+    after: Dict[str, pd.DataFrame],
+    changed: Dict[str, np.ndarray],
+) -> pd.Series:
+    """Days (before and after the change) of every session a changed key belongs to."""
+    workout_exercise_ids = np.concatenate(
+        [changed["workout_exercises"]]
+        + [
+            tables["workout_sets"].loc[
+                tables["workout_sets"]["set_id"].isin(changed["workout_sets"]), "workout_exercise_id"
+            ].to_numpy()
+            for tables in (before, after)
+        ]
+    )
+    session_ids = np.concatenate(
+        [changed["workout_sessions"]]
+        + [
+            tables["workout_exercises"].loc[
+                tables["workout_exercises"]["workout_exercise_id"].isin(workout_exercise_ids), "session_id"
+            ].to_numpy()
+            for tables in (before, after)
+        ]
+    )
+    days = np.concatenate(
+        [
+            _session_days(tables["workout_sessions"])[
+                tables["workout_sessions"]["session_id"].isin(session_ids).to_numpy()
+            ].to_numpy()
+            for tables in (before, after)
+        ]
+    )
+    return pd.Series(days, dtype="datetime64[ns]").drop_duplicates()
+
+
+def _tables_on_days(tables: Dict[str, pd.DataFrame], days: pd.Series) -> Dict[str, pd.DataFrame]:
+    """The sessions on ``days`` with their workout exercises and sets."""
+    sessions = tables["workout_sessions"]
+    sessions = sessions[_session_days(sessions).isin(days).to_numpy()]
+    workout_exercises = tables["workout_exercises"]
+    workout_exercises = workout_exercises[workout_exercises["session_id"].isin(sessions["session_id"])]
+    sets = tables["workout_sets"]
+    sets = sets[sets["workout_exercise_id"].isin(workout_exercises["workout_exercise_id"])]
+    return {"workout_sessions": sessions, "workout_exercises": workout_exercises, "workout_sets": sets}
+
+
+def _day_key(dates: np.ndarray) -> np.ndarray:
+    """Ascending sort key of the training row order: newest day first, undated last."""
+    days = np.asarray(dates).astype("datetime64[D]")
+    return np.where(np.isnat(days), np.iinfo(np.int64).max, -days.astype(np.int64))
+
+
+def _splice_columns(
+    columns: Any,
+    keep: np.ndarray,
+    added: Any,
+    kept_key: np.ndarray,
+    added_key: np.ndarray,
+) -> Any:
+    """Rows of ``columns`` in ``keep`` with the rows of ``added`` merged in by sort key.
+
+    Both sides must be ordered by their key; ``added`` rows go before kept
+    rows with an equal key.
+    """
+    positions = np.searchsorted(kept_key, added_key)
+    return type(columns)(
+        **{
+            field.name: np.insert(getattr(columns, field.name)[keep], positions, getattr(added, field.name))
+            for field in fields(columns)
+        }
+    )
+
+
+def _restore_integers(df: pd.DataFrame) -> pd.DataFrame:
+    """Cast integer columns turned to float by outer-join NULLs back to int64.
+
+    Only columns without missing values are cast, matching the dtypes the
+    per-table queries returned.
+    """
+    df = df.reset_index(drop=True)
+    for column in _INTEGER_COLUMNS:
+        if column in df and df[column].dtype.kind == "f" and df[column].notna().all():
+            df[column] = df[column].astype("int64")
+    return df
+
+
+def run_queries(
+    report: PerformanceReport,
+    queries: Dict[str, Callable[[], Any]],
+    workers: int | None = None,
+) -> Dict[str, Any]:
+    """Run independent queries, sequentially or on a thread pool; results by name.
+
+    Each query opens its own connection from the engine's pool, so
+    concurrent queries do not share a connection. Per-query timings are
+    recorded in ``report`` either way; the first failing query re-raises.
+    """
+    if workers is None or workers <= 1:
+        return {name: _timed_query(report, name, query) for name, query in queries.items()}
+
+    with ThreadPoolExecutor(
+        max_workers=min(workers, len(queries)),
+        thread_name_prefix="load_data",
+    ) as pool:
+        futures = {
+            name: pool.submit(_timed_query, report, name, query)
+            for name, query in queries.items()
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def _timed_query(report: PerformanceReport, name: str, query: Callable[[], Any]) -> Any:
+    """Run one DataManager query as a stage, recording the returned row count."""
+    with report.stage(name) as stage:
+        result = query()
+        if isinstance(result, dict):
+            stage["rows"] = sum(len(df) for df in result.values())
+        else:
+            stage["rows"] = len(result)
+    return result
@@ -4,18 +4,31 @@ from datetime import time
 import pandas as pd
 from sqlalchemy import text
 
+from data_version import bump_version
 from db.connection import get_engine
 from db.queries import (
+    ImportedWorkout,
+    NewExercise,
     delete_workout_session,
     get_all_sets,
     get_body_composition,
     get_body_measurements,
+    get_database_time,
+    get_dataset_fingerprint,
+    get_deleted_rows_since,
+    get_exercise_session_rollups,
     get_exercises,
+    get_rows_changed_since,
+    get_session_rollups,
     get_sets_raw,
+    get_training_rows,
     get_workout_sessions,
     insert_body_composition,
     insert_body_measurements,
     insert_exercise,
+    insert_exercises,
+    insert_workout,
+    prune_deleted_rows,
 )
 
 logger = logging.getLogger(__name__)
@@ -26,6 +39,9 @@ class DataManager:
 
     This class encapsulates calls to the lower-level SQL query helpers and exposes
     convenience methods used by the application UI and services.
+
+    Every successful write bumps the process-wide dataset version
+    (see ``data_version``), which invalidates caches keyed by it.
     """
 
     def __init__(self):
@@ -62,6 +78,38 @@ class DataManager:
         """Sets prepared for UI (joins, names, volume)."""
         return get_all_sets(self.engine)
 
+    def load_training_rows(self) -> pd.DataFrame:
+        """Sessions, workout exercises and sets in one joined result (one round trip)."""
+        return get_training_rows(self.engine)
+
+    def load_session_rollups(self, start: Any = None, end: Any = None) -> pd.DataFrame:
+        """Per-session set aggregates computed in SQL, optionally for an inclusive date range."""
+        return get_session_rollups(self.engine, start, end)
+
+    def load_exercise_session_rollups(self, start: Any = None, end: Any = None) -> pd.DataFrame:
+        """Per-exercise, per-session set aggregates computed in SQL."""
+        return get_exercise_session_rollups(self.engine, start, end)
+
+    def load_database_time(self) -> Any:
+        """Current database server timestamp, used as the sync watermark."""
+        return get_database_time(self.engine)
+
+    def load_dataset_fingerprint(self) -> pd.DataFrame:
+        """Row count and maximum key per loaded table (a cheap change probe)."""
+        return get_dataset_fingerprint(self.engine)
+
+    def load_changed_rows(self, table: str, since: Any) -> pd.DataFrame:
+        """Rows of a sync-tracked training table inserted or updated after ``since``."""
+        return get_rows_changed_since(self.engine, table, since)
+
+    def load_deleted_rows(self, since: Any) -> pd.DataFrame:
+        """``table_name``/``row_id`` of sync-tracked rows deleted after ``since``."""
+        return get_deleted_rows_since(self.engine, since)
+
+    def prune_deleted_rows(self, before: Any) -> int:
+        """Remove deletion tombstones recorded before ``before``; returns how many."""
+        return prune_deleted_rows(self.engine, before)
+
     def load_body_data(self) -> dict[str, pd.DataFrame]:
         """Load body measurements and body composition data.
 
@@ -69,10 +117,18 @@ class DataManager:
         a DataFrame.
         """
         return {
-            "measurements": get_body_measurements(self.engine),
-            "composition": get_body_composition(self.engine),
+            "measurements": self.load_body_measurements(),
+            "composition": self.load_body_composition(),
         }
 
+    def load_body_measurements(self) -> pd.DataFrame:
+        """Load body measurements from the database."""
+        return get_body_measurements(self.engine)
+
+    def load_body_composition(self) -> pd.DataFrame:
+        """Load body composition records from the database."""
+        return get_body_composition(self.engine)
+
     def add_exercise(
         self,
         name: str,
@@ -84,11 +140,51 @@ class DataManager:
         Returns True on success, False on database error.
         """
         try:
-            return insert_exercise(self.engine, name, category, body_part)
+            inserted = insert_exercise(self.engine, name, category, body_part)
+            if inserted:
+                bump_version()
+            return inserted
         except Exception as e:
             logger.exception("add_exercise failed: %s", e)
             return False
 
+    def add_exercises(self, exercises: List[NewExercise]) -> List[int]:
+        """Create many exercises (and their muscle targets) in one transaction.
+
+        Returns the new exercise ids in input order; re-raises on failure, in
+        which case nothing was written.
+        """
+        try:
+            exercise_ids = insert_exercises(self.engine, exercises)
+        except Exception:
+            logger.exception("add_exercises failed")
+            raise
+        bump_version()
+        return exercise_ids
+
+    def add_workout(
+        self,
+        session_date: Any,
+        exercises: List[Dict[str, Any]],
+        session_start: time | None = None,
+        session_end: time | None = None,
+        notes: str = "Imported",
+    ) -> ImportedWorkout:
+        """Insert a whole parsed workout (session, exercises and sets) in one transaction.
+
+        ``exercises`` holds ``{"name": ..., "sets": [...]}`` entries, in order.
+        Returns the new ids; re-raises on failure, in which case nothing was written.
+        """
+        try:
+            imported = insert_workout(
+                self.engine, session_date, exercises, session_start, session_end, notes
+            )
+        except Exception:
+            logger.exception("add_workout failed")
+            raise
+        bump_version()
+        return imported
+
     def add_full_session(
         self,
         session_date: Any,
@@ -102,69 +198,14 @@ class DataManager:
 
         Returns True on success or re-raises the exception if the operation fails.
         """
-        try:
-            engine = self.engine
-            with engine.begin() as conn:
-                qry = text(
-                    "SELECT session_id FROM workout_sessions WHERE CAST(session_date AS DATE) = :session_date"
-                )
-                row = conn.execute(qry, {"session_date": session_date}).fetchone()
-                if row:
-                    session_id = row[0]
-                else:
-                    insert_q = text(
-                        """INSERT INTO workout_sessions (session_date, notes, start_time, end_time)
-                           VALUES (:date, :notes, :start_time, :end_time)
-                           RETURNING session_id"""
-                    )
-                    session_id = conn.execute(
-                        insert_q,
-                        {
-                            "date": session_date,
-                            "notes": notes,
-                            "start_time": session_start,
-                            "end_time": session_end,
-                        },
-                    ).scalar()
-
-                ex_id_q = text(
-                    "SELECT exercise_id FROM Exercises WHERE exercise_name = :name"
-                )
-                res = conn.execute(ex_id_q, {"name": exercise_name}).fetchone()
-                if not res:
-                    raise ValueError("Exercise not found")
-                exercise_id = res[0]
-
-                insert_we = text(
-                    "INSERT INTO workout_exercises (session_id, exercise_id) VALUES (:sid, :eid) RETURNING workout_exercise_id;")
-                workout_ex_id = conn.execute(
-                    insert_we, {"sid": session_id, "eid": exercise_id}
-                ).scalar()
-
-                for idx, s in enumerate(sets_data, start=1):
-                    ins_set = text(
-                        """
-                        INSERT INTO workout_sets
-                            (workout_exercise_id, set_number, repetitions, weight, duration_seconds, RIR)
-                        VALUES
-                            (:weid, :num, :reps, :weight, :duration_seconds, :rir)
-                        """
-                    )
-                    conn.execute(
-                        ins_set,
-                        {
-                            "weid": workout_ex_id,
-                            "num": idx,
-                            "reps": s["reps"],
-                            "weight": s["weight"],
-                            "duration_seconds": s.get("duration_seconds"),
-                            "rir": s["rir"],
-                        },
-                    )
-            return True
-        except Exception:
-            logger.exception("add_full_session failed")
-            raise
+        self.add_workout(
+            session_date,
+            [{"name": exercise_name, "sets": sets_data}],
+            session_start,
+            session_end,
+            notes,
+        )
+        return True
 
     def add_body_measurements(self, data: dict) -> bool:
         """Insert body measurement records into the database.
@@ -173,6 +214,7 @@ class DataManager:
         """
         try:
             insert_body_measurements(self.engine, data)
+            bump_version()
             return True
         except Exception as e:
             logger.exception("add_body_measurements failed: %s", e)
@@ -185,6 +227,7 @@ class DataManager:
         """
         try:
             insert_body_composition(self.engine, data)
+            bump_version()
             return True
         except Exception as e:
             logger.exception("add_body_composition failed: %s", e)
@@ -206,7 +249,10 @@ class DataManager:
 
     def delete_session(self, session_id: int) -> bool:
         try:
-            return delete_workout_session(self.engine, session_id)
+            deleted = delete_workout_session(self.engine, session_id)
+            if deleted:
+                bump_version()
+            return deleted
         except Exception:
             logger.exception("delete_session failed")
             return False
@@ -0,0 +1,517 @@
+"""
+Incremental dataset sync.
+
+``DatasetSync`` keeps the training tables of the last load in memory and,
+on every refresh after the first, fetches only the rows inserted, updated or
+deleted since then instead of re-reading the full history. It relies on the
+change tracking added by the ``sync_tracking`` migration (``python -m
+db.migrate``): an ``updated_at`` column on every training table and a ``sync_deletions``
+tombstone table.
+
+The watermark is the database server time taken before each read. Every
+delta query looks back ``overlap`` further, so rows written by transactions
+that were still open at the previous refresh are not missed; patching is
+keyed by primary key and therefore idempotent. Only the keys whose rows
+actually differ count as changes, and only the sessions on the days they
+touch are joined again and spliced into the previous dataset (see
+``data_loader.patch_loaded_data``). Reference data (exercises, muscle map,
+body data) is small and re-read in full, but only when the database
+fingerprint of its tables changed or this process wrote to the database.
+
+Every incremental refresh prunes the tombstones older than
+``tombstone_retention`` before its watermark, so ``sync_deletions`` stays
+bounded. A refresh whose previous watermark (in memory or restored from a
+snapshot) is older than that could miss deletions and reloads the full
+dataset instead.
+
+When nothing changed the previous ``LoadedData`` is returned with the same
+dataset version, so every cache keyed by the version keeps its entries. If
+the delta queries fail (e.g. the migration has not been applied) the refresh
+falls back to a full load.
+
+With a ``snapshot.DatasetSnapshot`` the tables also survive process
+restarts: the first refresh restores them from disk and revalidates with a
+single fingerprint query. With a ``mapped_dataset.MappedDataset`` as well,
+the restored dataset's version is found by its watermark and fingerprint,
+so a process that starts after another one published it maps its columns
+without building them.
+
+``DatasetSync.serve`` is how the app reads the dataset: one ``LoadedData``
+per process, shared by every session without copying, replaced as a whole
+when a refresh produces a new version. In background mode it is also
+stale-while-revalidate: after the first load it always answers with the
+current dataset at once and runs the refresh on a background thread, which
+swaps the new ``LoadedData`` in when it is done. Writes made through
+``DataManager`` in this process are the exception: the next ``serve``
+refreshes before answering, so a user sees their own import.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import timedelta
+from functools import partial
+from threading import Lock, Thread
+from typing import Any, Callable, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+from data_loader import (
+    LoadedData,
+    RollupData,
+    assemble_loaded_data,
+    join_training_tables,
+    load_data,
+    load_rollup_data,
+    patch_loaded_data,
+    reference_queries,
+    run_queries,
+    splice_rows,
+    split_training_rows,
+    training_tables,
+)
+from data_manager import DataManager
+from data_version import current_version, new_dataset_version
+from db.queries import SYNC_TABLES
+from instrumentation import PerformanceReport
+from mapped_dataset import MappedDataset, MappedVersion, dataset_key
+from snapshot import DatasetSnapshot, Snapshot
+
+logger = logging.getLogger(__name__)
+
+SYNC_OVERLAP = timedelta(minutes=5)
+SYNC_TOMBSTONE_RETENTION = timedelta(days=7)
+
+# Fingerprint tables (see db.queries.get_dataset_fingerprint) behind every reference query.
+_REFERENCE_TABLES = {
+    "load_exercises": ("exercises",),
+    "load_exercise_muscle_targets": ("exercises", "exercise_muscle_map"),
+    "load_body_measurements": ("body_measurements",),
+    "load_body_composition": ("body_composition",),
+}
+
+
+def apply_changes(
+    table: pd.DataFrame,
+    key: str,
+    changed: pd.DataFrame,
+    deleted_ids: pd.Series,
+) -> pd.DataFrame:
+    """Remove deleted and changed rows of ``table``, then add the changed rows.
+
+    ``changed`` holds the current state of every row it contains, so a row
+    that was deleted and re-inserted with the same key is kept. ``table``
+    must be ordered by ``key``, and so is the result: the changed rows are
+    merged in by binary search instead of re-sorting the table.
+    """
+    replaced = table[key].isin(deleted_ids) | table[key].isin(changed[key])
+    kept = table[~replaced.to_numpy()]
+    if changed.empty:
+        return kept.reset_index(drop=True)
+
+    changed = changed.sort_values(key, kind="stable")
+    return splice_rows(kept, changed, np.searchsorted(kept[key].to_numpy(), changed[key].to_numpy()))
+
+
+def changed_keys(
+    table: pd.DataFrame,
+    key: str,
+    changed: pd.DataFrame,
+    deleted_ids: pd.Series,
+) -> np.ndarray:
+    """Keys of the rows that ``changed`` and ``deleted_ids`` add, alter or remove in ``table``.
+
+    Rows a delta query returns again unchanged (every refresh re-reads the
+    overlap window) and deletions of rows ``table`` does not hold are not
+    counted. Only the returned rows are compared with the rows of ``table``
+    under the same keys, which are found by binary search (``table`` is
+    ordered by ``key``).
+    """
+    keys = table[key].to_numpy()
+    changed_ids = changed[key].to_numpy()
+    differs = np.ones(len(changed_ids), dtype=bool)
+    if len(keys) and len(changed_ids):
+        positions = np.minimum(np.searchsorted(keys, changed_ids), len(keys) - 1)
+        found = keys[positions] == changed_ids
+        stored = table.iloc[positions[found]].reset_index(drop=True)
+        returned = changed[found].reset_index(drop=True)
+        same = np.ones(len(stored), dtype=bool)
+        for column in table.columns:
+            before, after = stored[column].astype(object), returned[column].astype(object)
+            same &= ((before == after) | (before.isna() & after.isna())).to_numpy()
+        differs[found] = ~same
+
+    deleted_ids = deleted_ids.to_numpy()
+    removed = deleted_ids[np.isin(deleted_ids, keys) & ~np.isin(deleted_ids, changed_ids)]
+    return np.unique(np.concatenate([changed_ids[differs], removed]))
+
+
+def _fingerprint(df: pd.DataFrame) -> Dict[str, list]:
+    """``{table: [row count, max key]}`` of a ``load_dataset_fingerprint`` result."""
+    return {
+        row["table_name"]: [int(row["row_count"]), None if pd.isna(row["max_key"]) else str(row["max_key"])]
+        for row in df.to_dict("records")
+    }
+
+
+class DatasetSync:
+    """In-memory dataset kept current by incremental refreshes.
+
+    Parameters
+    ----------
+    workers : int, optional
+        Thread pool size for the refresh queries (see ``load_data``).
+    overlap : timedelta
+        How far before the watermark every delta query looks.
+    tombstone_retention : timedelta
+        Age (relative to the database time) after which deletion tombstones
+        are pruned; an older watermark forces a full load.
+    manager_factory : callable
+        Creates the ``DataManager`` used for one refresh.
+    snapshot : DatasetSnapshot, optional
+        On-disk snapshot. The first refresh of a process restores it and
+        only probes the database fingerprint; if nothing was added or
+        removed since the snapshot was written, no data is read. Every
+        dataset change is written back to it.
+    mapped : MappedDataset, optional
+        Shares the column arrays of every built dataset read-only with the
+        other processes using the same directory, one version per watermark
+        and fingerprint (see ``mapped_dataset``).
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        overlap: timedelta = SYNC_OVERLAP,
+        tombstone_retention: timedelta = SYNC_TOMBSTONE_RETENTION,
+        manager_factory: Callable[[], Any] = DataManager,
+        snapshot: DatasetSnapshot | None = None,
+        mapped: MappedDataset | None = None,
+    ) -> None:
+        self.workers = workers
+        self.overlap = overlap
+        self.tombstone_retention = tombstone_retention
+        self.manager_factory = manager_factory
+        self.snapshot = snapshot
+        self.mapped = mapped
+        self._lock = Lock()
+        self._data: LoadedData | None = None
+        self._tables: Dict[str, pd.DataFrame] = {}
+        self._reference: Dict[str, pd.DataFrame] = {}
+        self._watermark: Any = None
+        self._fingerprint: Dict[str, list] | None = None
+        self._revalidate_lock = Lock()
+        self._revalidating: Thread | None = None
+        self._wanted_token: Hashable = None
+        self._synced_token: Hashable = None
+        self._synced_writes: int | None = None
+        self._synced_at = 0.0
+
+    @property
+    def data(self) -> LoadedData | None:
+        """Dataset of the last refresh, or None before the first one."""
+        return self._data
+
+    def refresh(self) -> LoadedData:
+        """Bring the dataset up to date and return it."""
+        with self._lock:
+            return self._refresh()
+
+    def _refresh(self) -> LoadedData:
+        writes = current_version()
+        if self._data is None and self._restore_snapshot():
+            data = self._revalidate()
+        else:
+            data = self._sync()
+        self._synced_writes = writes
+        self._synced_at = time.monotonic()
+        return data
+
+    def serve(
+        self,
+        token: Hashable = None,
+        max_age: float | None = None,
+        background: bool = True,
+    ) -> LoadedData:
+        """Shared current dataset, refreshed when ``token`` or a local write says it changed.
+
+        The returned ``LoadedData`` is the object held here, not a copy, and
+        must be treated as read-only. A refresh is due when ``token`` (e.g. a
+        ``ChangeWatcher`` token) differs from the one of the last refresh or
+        the data is older than ``max_age`` seconds. With ``background``
+        (stale-while-revalidate) the due refresh runs on a background thread
+        and the previous dataset is returned meanwhile; otherwise it runs
+        before returning. The first call, and the first call after a
+        ``DataManager`` write in this process, always refresh before
+        returning.
+        """
+        if self._data is None or self._synced_writes != current_version():
+            return self._refresh_for(token, max_age)
+
+        with self._revalidate_lock:
+            self._wanted_token = token
+            stale = token != self._synced_token or (
+                max_age is not None and time.monotonic() - self._synced_at > max_age
+            )
+            if stale and background and self._revalidating is None:
+                self._revalidating = Thread(target=self._revalidate_in_background, name="dataset_sync", daemon=True)
+                self._revalidating.start()
+        if stale and not background:
+            return self._refresh_for(token, max_age)
+        return self._data
+
+    def _refresh_for(self, token: Hashable, max_age: float | None = None) -> LoadedData:
+        """Refresh on behalf of a caller that saw ``token``.
+
+        Concurrent callers queue on the refresh lock; one whose token, local
+        writes and ``max_age`` are already covered by the refresh it waited
+        for gets that dataset without another sync.
+        """
+        with self._lock:
+            if self._is_current(token, max_age):
+                return self._data
+            data = self._refresh()
+            with self._revalidate_lock:
+                self._synced_token = token
+            return data
+
+    def _is_current(self, token: Hashable, max_age: float | None) -> bool:
+        return (
+            self._data is not None
+            and self._synced_writes == current_version()
+            and token == self._synced_token
+            and (max_age is None or time.monotonic() - self._synced_at <= max_age)
+        )
+
+    def wait(self, timeout: float | None = None) -> None:
+        """Block until a running background refresh has finished."""
+        thread = self._revalidating
+        if thread is not None:
+            thread.join(timeout)
+
+    def _revalidate_in_background(self) -> None:
+        """Refresh until the dataset matches the latest requested token; retried on the next ``serve`` if it fails."""
+        while True:
+            token = self._wanted_token
+            try:
+                self.refresh()
+            except Exception:
+                logger.warning("Background dataset refresh failed, serving the previous dataset", exc_info=True)
+                with self._revalidate_lock:
+                    self._revalidating = None
+                return
+            with self._revalidate_lock:
+                self._synced_token = token
+                if self._wanted_token == token:
+                    self._revalidating = None
+                    return
+
+    def _sync(self) -> LoadedData:
+        if self._data is None:
+            return self._full_load()
+        try:
+            return self._incremental_load()
+        except Exception:
+            logger.warning(
+                "Incremental sync failed, reloading the full dataset "
+                "(has `python -m db.migrate` been run?)",
+                exc_info=True,
+            )
+            return self._full_load()
+
+    def _restore_snapshot(self) -> bool:
+        if self.snapshot is None:
+            return False
+        report = PerformanceReport("restore_snapshot")
+        with report.stage("read_snapshot") as stage:
+            expected = {table: columns for table, (_, columns) in SYNC_TABLES.items()}
+            snapshot = self.snapshot.load(expected)
+            stage["rows"] = 0 if snapshot is None else sum(len(df) for df in snapshot.tables.values())
+        if snapshot is None:
+            return False
+
+        mapped = self._mapped_version(snapshot.watermark, snapshot.fingerprint)
+        data = self._build(report, snapshot.tables, snapshot.reference, mapped)
+        self._commit(data, snapshot.tables, snapshot.reference, snapshot.watermark, snapshot.fingerprint, save=False)
+        return True
+
+    def _revalidate(self) -> LoadedData:
+        """Keep the restored snapshot if the database fingerprint still matches."""
+        try:
+            fingerprint = _fingerprint(self.manager_factory().load_dataset_fingerprint())
+        except Exception:
+            logger.warning("Dataset fingerprint probe failed, serving the snapshot", exc_info=True)
+            return self._data
+        if fingerprint == self._fingerprint:
+            return self._data
+        return self._sync()
+
+    def _probe(self, dm: Any, report: PerformanceReport) -> tuple[Any, Dict[str, list]]:
+        """Database time (the new watermark) and fingerprint, taken before any data is read."""
+        with report.stage("probe_database"):
+            return dm.load_database_time(), _fingerprint(dm.load_dataset_fingerprint())
+
+    def _full_load(self) -> LoadedData:
+        dm = self.manager_factory()
+        report = PerformanceReport("load_data")
+        watermark, fingerprint = self._probe(dm, report)
+
+        loaded = {}
+
+        def keep_frames(rows: pd.DataFrame, reference: Dict[str, pd.DataFrame]) -> None:
+            loaded["tables"], loaded["reference"] = training_tables(rows), reference
+
+        mapped = self._mapped_version(watermark, fingerprint)
+        data = load_data(self.workers, dm, report, mapped, on_rows=keep_frames)
+        return self._commit(data, loaded["tables"], loaded["reference"], watermark, fingerprint)
+
+    def _incremental_load(self) -> LoadedData:
+        dm = self.manager_factory()
+        report = PerformanceReport("sync_data")
+
+        watermark, fingerprint = self._probe(dm, report)
+        since = (pd.Timestamp(self._watermark) - self.overlap).to_pydatetime()
+        horizon = (pd.Timestamp(watermark) - self.tombstone_retention).to_pydatetime()
+        if since < horizon:
+            logger.info("Last sync is older than the deletion tombstones kept, reloading the full dataset")
+            return self._full_load()
+        self._prune_tombstones(dm, report, horizon)
+
+        queries = {
+            f"load_changed_{table}": partial(dm.load_changed_rows, table, since)
+            for table in SYNC_TABLES
+        }
+        queries["load_deleted_rows"] = partial(dm.load_deleted_rows, since)
+        stale = {
+            name: query for name, query in reference_queries(dm).items()
+            if self._reference_is_stale(name, fingerprint)
+        }
+        results = run_queries(report, {**queries, **stale}, self.workers)
+        reference = {**self._reference, **{name: results[name] for name in stale}}
+
+        with report.stage("apply_changes") as stage:
+            deleted = results["load_deleted_rows"]
+            tables = dict(self._tables)
+            changed = {}
+            for table, (key, _) in SYNC_TABLES.items():
+                rows = results[f"load_changed_{table}"]
+                deleted_ids = deleted.loc[deleted["table_name"] == table, "row_id"]
+                changed[table] = changed_keys(self._tables[table], key, rows, deleted_ids)
+                if len(changed[table]):
+                    tables[table] = apply_changes(
+                        self._tables[table],
+                        key,
+                        rows[rows[key].isin(changed[table]).to_numpy()],
+                        deleted_ids[deleted_ids.isin(changed[table]).to_numpy()],
+                    )
+            stage["rows"] = sum(len(results[name]) for name in queries)
+            stage["changed_rows"] = sum(len(keys) for keys in changed.values())
+
+        reference_changed = {
+            name for name in stale if not reference[name].equals(self._reference[name])
+        }
+        if not any(len(keys) for keys in changed.values()) and not reference_changed:
+            self._watermark = watermark
+            self._fingerprint = fingerprint
+            self._data = self._data._replace(load_report=report.to_dict())
+            return self._data
+
+        mapped = self._mapped_version(watermark, fingerprint)
+        if "load_exercises" in reference_changed:
+            data = self._build(report, tables, reference, mapped)
+        else:
+            data = patch_loaded_data(
+                report, self._data, self._tables, tables, changed, reference, new_dataset_version(), mapped
+            )
+        return self._commit(data, tables, reference, watermark, fingerprint)
+
+    def _reference_is_stale(self, name: str, fingerprint: Dict[str, list]) -> bool:
+        """Whether reference query ``name`` must be re-read.
+
+        That is when the fingerprint of one of its tables changed, or when
+        this process wrote to the database since the last refresh (in-place
+        edits do not change a fingerprint).
+        """
+        if name not in self._reference or self._fingerprint is None:
+            return True
+        if self._synced_writes != current_version():
+            return True
+        tables = _REFERENCE_TABLES.get(name)
+        return tables is None or any(
+            fingerprint.get(table) != self._fingerprint.get(table) for table in tables
+        )
+
+    def _prune_tombstones(self, dm: Any, report: PerformanceReport, before: Any) -> None:
+        try:
+            with report.stage("prune_deleted_rows") as stage:
+                stage["rows"] = dm.prune_deleted_rows(before)
+        except Exception:
+            logger.warning("Could not prune deletion tombstones", exc_info=True)
+
+    def _build(
+        self,
+        report: PerformanceReport,
+        tables: Dict[str, pd.DataFrame],
+        reference: Dict[str, pd.DataFrame],
+        mapped: MappedVersion | None,
+    ) -> LoadedData:
+        """Dataset (with a new version) from per-table and reference frames."""
+        with report.stage("join_training_rows") as stage:
+            rows = join_training_tables(tables, reference["load_exercises"])
+            stage["rows"] = len(rows)
+        with report.stage("split_training_rows") as stage:
+            training = split_training_rows(rows)
+            stage["rows"] = len(training.sets_raw)
+        return assemble_loaded_data(report, training, reference, new_dataset_version(), mapped)
+
+    def _mapped_version(self, watermark: Any, fingerprint: Dict[str, list] | None) -> MappedVersion | None:
+        """Mapped version of the dataset read at ``watermark``, if columns are shared."""
+        if self.mapped is None:
+            return None
+        return self.mapped.version(dataset_key(watermark, fingerprint))
+
+    def _commit(
+        self,
+        data: LoadedData,
+        tables: Dict[str, pd.DataFrame],
+        reference: Dict[str, pd.DataFrame],
+        watermark: Any,
+        fingerprint: Dict[str, list] | None,
+        save: bool = True,
+    ) -> LoadedData:
+        self._data = data
+        self._tables = tables
+        self._reference = reference
+        self._watermark = watermark
+        self._fingerprint = fingerprint
+        if save and self.snapshot is not None:
+            try:
+                self.snapshot.save(Snapshot(tables, reference, watermark, fingerprint))
+            except Exception:
+                logger.warning("Could not write the dataset snapshot", exc_info=True)
+        return data
+
+
+class RollupSync(DatasetSync):
+    """``DatasetSync`` serving ``RollupData`` (see ``data_loader.load_rollup_data``).
+
+    For the ``AGGREGATION_MODE=sql`` pages that only read rollups: ``serve``
+    refreshes on the same tokens, local writes and ``max_age``, but every
+    refresh re-reads the rollups, which scale with sessions, instead of
+    syncing sets. A refresh that finds the same rollups keeps the version.
+    """
+
+    def _sync(self) -> RollupData:
+        data = load_rollup_data(self.workers, self.manager_factory())
+        previous = self._data
+        if (
+            previous is not None
+            and data.exercises == previous.exercises
+            and data.exercise_muscle_targets == previous.exercise_muscle_targets
+            and all(new.equals(old) for new, old in zip(data.partitions.rollups, previous.partitions.rollups))
+        ):
+            data = data._replace(version=previous.version)
+        self._data = data
+        return data
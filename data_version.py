@@ -0,0 +1,72 @@
+"""
+Dataset version.
+
+Process-wide counter of writes made through ``DataManager``. Every
+successful write bumps the counter and notifies subscribers, so caches keyed
+by the dataset version can drop their entries exactly when the data changes.
+Each load of the dataset is stamped with a ``DatasetVersion``: the write
+counter observed before the load plus a load sequence number, so a reload
+without a local write (a changed ``ChangeWatcher`` token, or data older
+than ``max_age`` in ``DatasetSync.serve``) also gets a fresh version.
+"""
+
+from __future__ import annotations
+
+import itertools
+import logging
+from threading import Lock
+from typing import Callable, NamedTuple
+
+logger = logging.getLogger(__name__)
+
+_lock = Lock()
+_writes = 0
+_loads = itertools.count(1)
+_subscribers: list[Callable[[int], None]] = []
+
+
+class DatasetVersion(NamedTuple):
+    """Version of one loaded dataset."""
+
+    writes: int
+    load: int
+
+
+def current_version() -> int:
+    """Number of writes made through ``DataManager`` in this process."""
+    return _writes
+
+
+def new_dataset_version() -> DatasetVersion:
+    """Stamp a dataset that is about to be loaded."""
+    with _lock:
+        return DatasetVersion(writes=_writes, load=next(_loads))
+
+
+def bump_version() -> int:
+    """Record a write and notify subscribers; returns the new write count."""
+    global _writes
+    with _lock:
+        _writes += 1
+        version = _writes
+        subscribers = list(_subscribers)
+
+    for callback in subscribers:
+        try:
+            callback(version)
+        except Exception:
+            logger.exception("Data version subscriber failed")
+    return version
+
+
+def subscribe(callback: Callable[[int], None]) -> None:
+    """Call ``callback(new_version)`` after every write (registered once)."""
+    with _lock:
+        if callback not in _subscribers:
+            _subscribers.append(callback)
+
+
+def unsubscribe(callback: Callable[[int], None]) -> None:
+    with _lock:
+        if callback in _subscribers:
+            _subscribers.remove(callback)
@@ -0,0 +1,103 @@
+"""
+Check that the app's lookups can use the indexes from ``db.migrate``.
+
+Runs ``EXPLAIN`` for each access path in ``plan_checks()`` and reports
+whether the plan reads the expected index. On PostgreSQL sequential scans
+are disabled for the check, so a small table still shows whether a query
+*can* use its index (a non-sargable condition falls back to a sequential
+scan anyway); SQLite plans are checked as they are.
+
+Run with ``python -m db.check_query_plans``; exits with 1 if a plan does not
+use its index.
+"""
+
+from __future__ import annotations
+
+import sys
+from datetime import date
+from typing import NamedTuple
+
+from sqlalchemy import text
+
+from db.connection import get_engine
+from db.queries import _SESSION_ON_DATE, _day_bounds, _session_date_filter
+
+
+class PlanCheck(NamedTuple):
+    name: str
+    index: str
+    query: str
+    params: dict
+
+
+class PlanResult(NamedTuple):
+    check: PlanCheck
+    uses_index: bool
+    plan: str
+
+
+def plan_checks() -> tuple[PlanCheck, ...]:
+    """The app's index-backed access paths, with sample parameters."""
+    today = date.today()
+    period_filter, period_params = _session_date_filter(date(today.year, 1, 1), today)
+    return (
+        PlanCheck(
+            "session on a date (workout import)",
+            "workout_sessions_session_date_idx",
+            _SESSION_ON_DATE,
+            _day_bounds(today),
+        ),
+        PlanCheck(
+            "sessions in a period (SQL rollups)",
+            "workout_sessions_session_date_idx",
+            f"SELECT ws.session_id FROM workout_sessions ws {period_filter}",
+            period_params,
+        ),
+        PlanCheck(
+            "exercises of a session",
+            "workout_exercises_session_id_idx",
+            "SELECT workout_exercise_id, exercise_id FROM workout_exercises WHERE session_id = :session_id",
+            {"session_id": 1},
+        ),
+        PlanCheck(
+            "sets of a workout exercise in order",
+            "workout_sets_workout_exercise_id_set_number_idx",
+            "SELECT set_number, repetitions, weight, rir FROM workout_sets "
+            "WHERE workout_exercise_id = :workout_exercise_id ORDER BY set_number",
+            {"workout_exercise_id": 1},
+        ),
+    )
+
+
+def explain(conn, query: str, params: dict) -> str:
+    """The query plan of ``query`` as text."""
+    if conn.dialect.name == "sqlite":
+        rows = conn.execute(text(f"EXPLAIN QUERY PLAN {query}"), params).all()
+        return "\n".join(row[-1] for row in rows)
+    rows = conn.execute(text(f"EXPLAIN {query}"), params).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def check_query_plans(engine, checks: tuple[PlanCheck, ...] | None = None) -> list[PlanResult]:
+    results = []
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for check in checks or plan_checks():
+            plan = explain(conn, check.query, check.params)
+            results.append(PlanResult(check, check.index in plan, plan))
+    return results
+
+
+def main() -> int:
+    results = check_query_plans(get_engine())
+    for result in results:
+        status = "ok" if result.uses_index else "NO INDEX"
+        print(f"[{status}] {result.check.name}: {result.check.index}")
+        if not result.uses_index:
+            print("    " + result.plan.replace("\n", "\n    "))
+    return 0 if all(result.uses_index for result in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,311 @@
+"""
+Versioned schema migrations.
+
+``MIGRATIONS`` is the ordered schema history. ``migrate`` applies the ones
+not yet recorded in ``schema_migrations``, each in its own transaction
+together with its record, so a failed migration leaves nothing behind and a
+re-run continues where it stopped. Every migration is also written to be
+safe on databases where the change was already made by hand or by the old
+seed scripts.
+
+Run with ``python -m db.migrate`` (``--list`` shows applied and pending
+migrations).
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from typing import Callable, Iterable
+
+from sqlalchemy import text
+
+from db.connection import get_engine
+from db.queries import SYNC_TABLES
+
+# Serializes concurrent ``migrate`` runs on PostgreSQL.
+_ADVISORY_LOCK_KEY = 720_301
+
+# Indexes for the app's access paths: sessions by date, exercises of a
+# session, sets of a workout exercise in order.
+PERFORMANCE_INDEXES = {
+    "workout_sessions_session_date_idx": ("workout_sessions", ("session_date",)),
+    "workout_exercises_session_id_idx": ("workout_exercises", ("session_id",)),
+    "workout_sets_workout_exercise_id_set_number_idx": ("workout_sets", ("workout_exercise_id", "set_number")),
+}
+
+# Channel and tables of the change notifications ``change_watch`` listens
+# for: every table the loaded dataset is built from.
+CHANGE_CHANNEL = "dataset_changed"
+CHANGE_NOTIFY_TABLES = (
+    "workout_sessions",
+    "workout_exercises",
+    "workout_sets",
+    "exercises",
+    "exercise_muscle_map",
+    "body_measurements",
+    "body_composition",
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change; ``apply`` runs inside the migration's transaction."""
+
+    version: int
+    name: str
+    apply: Callable
+
+
+def _create_exercise_muscle_map(conn) -> None:
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS exercise_muscle_map (
+                id BIGSERIAL PRIMARY KEY,
+                exercise_id INTEGER NOT NULL REFERENCES exercises(exercise_id) ON DELETE CASCADE,
+                muscle_group TEXT NOT NULL,
+                muscle_name TEXT NOT NULL,
+                role TEXT NOT NULL CHECK (role IN ('primary', 'secondary', 'stabilizer')),
+                set_factor NUMERIC(4, 2) NOT NULL CHECK (set_factor > 0 AND set_factor <= 1),
+                source_note TEXT,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                UNIQUE (exercise_id, muscle_group)
+            )
+            """
+        )
+    )
+
+
+def _add_set_duration(conn) -> None:
+    conn.execute(text("ALTER TABLE workout_sets ADD COLUMN IF NOT EXISTS duration_seconds INTEGER"))
+    conn.execute(
+        text("ALTER TABLE workout_sets DROP CONSTRAINT IF EXISTS workout_sets_duration_seconds_positive")
+    )
+    conn.execute(
+        text(
+            """
+            ALTER TABLE workout_sets
+            ADD CONSTRAINT workout_sets_duration_seconds_positive
+            CHECK (duration_seconds IS NULL OR duration_seconds > 0)
+            """
+        )
+    )
+
+
+def _exercise_id_sequence(conn) -> None:
+    """Draw exercise ids from a sequence aligned past the highest existing id."""
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('exercises', 'exercise_id')")).scalar()
+    if sequence is None:
+        conn.execute(text("CREATE SEQUENCE IF NOT EXISTS exercises_exercise_id_seq"))
+        conn.execute(text("ALTER SEQUENCE exercises_exercise_id_seq OWNED BY exercises.exercise_id"))
+        conn.execute(
+            text(
+                "ALTER TABLE exercises "
+                "ALTER COLUMN exercise_id SET DEFAULT nextval('exercises_exercise_id_seq')"
+            )
+        )
+    conn.execute(
+        text(
+            """
+            SELECT setval(
+                pg_get_serial_sequence('exercises', 'exercise_id'),
+                COALESCE(MAX(exercise_id), 0) + 1,
+                false
+            )
+            FROM exercises
+            """
+        )
+    )
+
+
+def create_performance_indexes(conn) -> None:
+    for name, (table, columns) in PERFORMANCE_INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+
+def _change_notifications(conn) -> None:
+    """Statement-level triggers sending ``CHANGE_CHANNEL`` notifications on every write."""
+    conn.execute(
+        text(
+            f"""
+            CREATE OR REPLACE FUNCTION notify_dataset_change() RETURNS trigger AS $$
+            BEGIN
+                PERFORM pg_notify('{CHANGE_CHANNEL}', TG_TABLE_NAME);
+                RETURN NULL;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    for table in CHANGE_NOTIFY_TABLES:
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_notify_change ON {table}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE TRIGGER {table}_notify_change
+                AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+                FOR EACH STATEMENT EXECUTE FUNCTION notify_dataset_change()
+                """
+            )
+        )
+
+
+def _sync_tracking(conn) -> None:
+    """Change tracking read by incremental sync (``data_sync``).
+
+    Every table in ``SYNC_TABLES`` gets an ``updated_at`` column (set on
+    insert by its default, refreshed on update by a trigger) with an index,
+    and a delete trigger that records the primary key of removed rows in
+    ``sync_deletions``.
+    """
+    conn.execute(
+        text(
+            """
+            CREATE TABLE IF NOT EXISTS sync_deletions (
+                table_name TEXT NOT NULL,
+                row_id BIGINT NOT NULL,
+                deleted_at TIMESTAMPTZ NOT NULL DEFAULT now()
+            )
+            """
+        )
+    )
+    conn.execute(
+        text("CREATE INDEX IF NOT EXISTS sync_deletions_deleted_at_idx ON sync_deletions (deleted_at)")
+    )
+    conn.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION sync_touch_updated_at() RETURNS trigger AS $$
+            BEGIN
+                NEW.updated_at := now();
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    conn.execute(
+        text(
+            """
+            CREATE OR REPLACE FUNCTION sync_record_deletion() RETURNS trigger AS $$
+            BEGIN
+                INSERT INTO sync_deletions (table_name, row_id)
+                VALUES (TG_TABLE_NAME, (to_jsonb(OLD) ->> TG_ARGV[0])::BIGINT);
+                RETURN OLD;
+            END;
+            $$ LANGUAGE plpgsql
+            """
+        )
+    )
+    for table, (key, _) in SYNC_TABLES.items():
+        conn.execute(
+            text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now()")
+        )
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {table}_updated_at_idx ON {table} (updated_at)"))
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_touch_updated_at ON {table}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE TRIGGER {table}_touch_updated_at
+                BEFORE UPDATE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION sync_touch_updated_at()
+                """
+            )
+        )
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_record_deletion ON {table}"))
+        conn.execute(
+            text(
+                f"""
+                CREATE TRIGGER {table}_record_deletion
+                AFTER DELETE ON {table}
+                FOR EACH ROW EXECUTE FUNCTION sync_record_deletion('{key}')
+                """
+            )
+        )
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "exercise_muscle_map", _create_exercise_muscle_map),
+    Migration(2, "workout_set_duration", _add_set_duration),
+    Migration(3, "exercise_id_sequence", _exercise_id_sequence),
+    Migration(4, "performance_indexes", create_performance_indexes),
+    Migration(5, "change_notifications", _change_notifications),
+    Migration(6, "sync_tracking", _sync_tracking),
+)
+
+
+def _ensure_history(engine) -> None:
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                CREATE TABLE IF NOT EXISTS schema_migrations (
+                    version INTEGER PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+                """
+            )
+        )
+
+
+def _applied_versions(conn) -> set[int]:
+    return set(conn.execute(text("SELECT version FROM schema_migrations")).scalars())
+
+
+def applied_migrations(engine) -> set[int]:
+    """Versions recorded in ``schema_migrations``."""
+    _ensure_history(engine)
+    with engine.connect() as conn:
+        return _applied_versions(conn)
+
+
+def migrate(engine, migrations: Iterable[Migration] = MIGRATIONS) -> list[Migration]:
+    """Apply pending ``migrations`` in version order; returns the ones applied.
+
+    Stops at the first failing migration (its transaction is rolled back)
+    and re-raises.
+    """
+    _ensure_history(engine)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _ADVISORY_LOCK_KEY})
+            if migration.version in _applied_versions(conn):
+                continue
+            migration.apply(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, name) VALUES (:version, :name)"),
+                {"version": migration.version, "name": migration.name},
+            )
+        applied.append(migration)
+    return applied
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Apply pending schema migrations.")
+    parser.add_argument("--list", action="store_true", help="show applied and pending migrations only")
+    args = parser.parse_args(argv)
+
+    engine = get_engine()
+    if args.list:
+        applied = applied_migrations(engine)
+        for migration in MIGRATIONS:
+            status = "applied" if migration.version in applied else "pending"
+            print(f"{migration.version:>4}  {migration.name:<24} {status}")
+        return 0
+
+    applied = migrate(engine)
+    for migration in applied:
+        print(f"Applied {migration.version}: {migration.name}")
+    if not applied:
+        print("Schema is up to date.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
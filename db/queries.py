@@ -1,6 +1,12 @@
+import csv
+import io
 import logging
+from collections import Counter
+from datetime import timedelta
+from typing import Any, NamedTuple
+
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 
 from db.exercise_muscle_resolver import MuscleTarget, resolve_exercise
 
@@ -18,6 +24,28 @@ def get_workout_sessions(engine) -> pd.DataFrame:
     df["session_date"] = pd.to_datetime(df["session_date"])
     return df
 
+
+def get_session_sets(engine) -> pd.DataFrame:
+    """Every session with the exercise and values of each of its sets.
+
+    One row per set; sessions without sets have one row with NULL set
+    columns. Used to recognise workouts that were already imported.
+    """
+    query = text("""
+        SELECT ws.session_id, ws.session_date, ws.start_time, we.exercise_id,
+               s.repetitions, s.weight, s.duration_seconds, s.rir
+        FROM workout_sessions ws
+        LEFT JOIN workout_exercises we ON we.session_id = ws.session_id
+        LEFT JOIN workout_sets s ON s.workout_exercise_id = we.workout_exercise_id
+        ORDER BY ws.session_id;
+    """)
+
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+
+    df["session_date"] = pd.to_datetime(df["session_date"])
+    return df
+
 def get_exercises(engine) -> pd.DataFrame:
     """Retrieve all exercises from the database with their associated body part and category.
 
@@ -64,6 +92,253 @@ def get_all_sets(engine) -> pd.DataFrame:
         df = pd.read_sql(query, conn)
     return df
 
+def get_training_rows(engine) -> pd.DataFrame:
+    """Retrieve sessions, workout exercises and sets in one set-level join.
+
+    Every session appears at least once (sessions without exercises and
+    exercises without sets yield rows with NULL set columns), so the result
+    holds everything needed for both the UI sets frame and the metrics input.
+    Rows are ordered like ``get_all_sets``.
+    """
+    query = text(
+        """
+        SELECT
+            ws.session_id,
+            ws.session_date,
+            ws.start_time,
+            ws.end_time,
+            we.workout_exercise_id,
+            we.exercise_id,
+            e.exercise_name,
+            e.body_part,
+            ws2.set_id,
+            ws2.set_number,
+            ws2.repetitions,
+            ws2.weight,
+            ws2.duration_seconds,
+            (ws2.repetitions * ws2.weight) AS volume,
+            ws2.rir
+        FROM workout_sessions ws
+        LEFT JOIN workout_exercises we
+            ON we.session_id = ws.session_id
+        LEFT JOIN workout_sets ws2
+            ON ws2.workout_exercise_id = we.workout_exercise_id
+        LEFT JOIN exercises e
+            ON we.exercise_id = e.exercise_id
+        ORDER BY ws.session_date DESC, e.exercise_name, ws2.set_number;
+    """
+    )
+    with engine.connect() as conn:
+        df = pd.read_sql(query, conn)
+    return df
+
+# Per-set expressions shared by the rollup queries; they follow
+# metrics.utils.set_values: missing numbers count as zero and duration sets
+# have no reps, volume or estimated 1RM.
+_IS_DURATION_SET = "COALESCE(ws2.duration_seconds, 0) > 0"
+_STRENGTH_SET = f"ws2.set_id IS NOT NULL AND NOT ({_IS_DURATION_SET})"
+_SET_ROLLUP_COLUMNS = f"""
+            COUNT(ws2.set_id) AS total_sets,
+            SUM(CASE WHEN {_STRENGTH_SET} THEN COALESCE(ws2.repetitions, 0) ELSE 0 END) AS total_reps,
+            CAST(SUM(CASE WHEN {_STRENGTH_SET}
+                THEN COALESCE(ws2.repetitions, 0) * COALESCE(ws2.weight, 0) ELSE 0 END)
+                AS DOUBLE PRECISION) AS total_volume,
+            SUM(CASE WHEN {_IS_DURATION_SET} THEN ws2.duration_seconds ELSE 0 END) AS total_duration_seconds,
+            CAST(SUM(CASE WHEN ws2.set_id IS NULL THEN 0
+                WHEN COALESCE(ws2.duration_seconds, 0) <> 0 THEN ws2.duration_seconds / 30.0
+                ELSE 1 END) AS DOUBLE PRECISION) AS effective_sets,
+            COUNT(CASE WHEN {_STRENGTH_SET} THEN 1 END) AS e1rm_count,
+            CAST(AVG(CASE WHEN {_STRENGTH_SET}
+                THEN COALESCE(ws2.weight, 0) * (1 + COALESCE(ws2.repetitions, 0) / 30.0) END)
+                AS DOUBLE PRECISION) AS avg_e1rm,
+            CAST(MAX(CASE WHEN {_STRENGTH_SET}
+                THEN COALESCE(ws2.weight, 0) * (1 + COALESCE(ws2.repetitions, 0) / 30.0) END)
+                AS DOUBLE PRECISION) AS max_e1rm,
+            CAST(AVG(ws2.rir) AS DOUBLE PRECISION) AS avg_rir,
+            MIN(ws2.rir) AS min_rir,
+            MAX(ws2.rir) AS max_rir,
+            SUM(CASE WHEN ws2.rir = 0 THEN 1 ELSE 0 END) AS sets_to_failure"""
+
+
+def _session_date_filter(start=None, end=None) -> tuple[str, dict]:
+    """WHERE clause restricting ``ws.session_date`` to inclusive date bounds, and its parameters.
+
+    The end bound is applied as ``< end + 1 day`` on the bare column, so the
+    condition can use an index on ``session_date`` whatever its type.
+    """
+    conditions, params = [], {}
+    if start is not None:
+        conditions.append("ws.session_date >= :start")
+        params["start"] = start
+    if end is not None:
+        conditions.append("ws.session_date < :end_exclusive")
+        params["end_exclusive"] = end + timedelta(days=1)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), params
+
+
+# Half-open range on the bare column, so the lookup can use the session_date
+# index whether the column is a DATE or a TIMESTAMP.
+_SESSION_ON_DATE = (
+    "SELECT session_id FROM workout_sessions WHERE session_date >= :day AND session_date < :next_day"
+)
+
+
+def _day_bounds(session_date) -> dict:
+    day = pd.Timestamp(session_date).date()
+    return {"day": day, "next_day": day + timedelta(days=1)}
+
+
+def get_session_rollups(engine, start=None, end=None) -> pd.DataFrame:
+    """Per-session set aggregates computed with GROUP BY, one row per session.
+
+    Sessions without sets are included with zero counts. ``start`` and
+    ``end`` optionally restrict sessions to an inclusive date range. Besides
+    the set aggregates, ``exercises_count`` counts workout exercises with at
+    least one set.
+    """
+    where, params = _session_date_filter(start, end)
+    query = text(
+        f"""
+        SELECT
+            ws.session_id,
+            ws.session_date,
+            ws.start_time,
+            ws.end_time,
+            COUNT(DISTINCT ws2.workout_exercise_id) AS exercises_count,{_SET_ROLLUP_COLUMNS}
+        FROM workout_sessions ws
+        LEFT JOIN workout_exercises we
+            ON we.session_id = ws.session_id
+        LEFT JOIN workout_sets ws2
+            ON ws2.workout_exercise_id = we.workout_exercise_id
+        {where}
+        GROUP BY ws.session_id, ws.session_date, ws.start_time, ws.end_time
+        ORDER BY ws.session_date, ws.session_id;
+    """
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+
+def get_exercise_session_rollups(engine, start=None, end=None) -> pd.DataFrame:
+    """Per-exercise, per-session set aggregates, one row per (session, exercise).
+
+    Workout exercises without sets are included with zero counts. ``start``
+    and ``end`` work as in ``get_session_rollups``.
+    """
+    where, params = _session_date_filter(start, end)
+    query = text(
+        f"""
+        SELECT
+            ws.session_id,
+            ws.session_date,
+            we.exercise_id,{_SET_ROLLUP_COLUMNS}
+        FROM workout_sessions ws
+        JOIN workout_exercises we
+            ON we.session_id = ws.session_id
+        LEFT JOIN workout_sets ws2
+            ON ws2.workout_exercise_id = we.workout_exercise_id
+        {where}
+        GROUP BY ws.session_id, ws.session_date, we.exercise_id
+        ORDER BY ws.session_date, ws.session_id, we.exercise_id;
+    """
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, params=params)
+
+# Training tables tracked by incremental sync (see the sync_tracking migration in db/migrate.py):
+# table -> (primary key, columns read into the in-memory dataset).
+SYNC_TABLES = {
+    "workout_sessions": ("session_id", ("session_id", "session_date", "start_time", "end_time")),
+    "workout_exercises": ("workout_exercise_id", ("workout_exercise_id", "session_id", "exercise_id")),
+    "workout_sets": (
+        "set_id",
+        (
+            "set_id",
+            "workout_exercise_id",
+            "set_number",
+            "repetitions",
+            "weight",
+            "duration_seconds",
+            "rir",
+        ),
+    ),
+}
+
+
+def get_database_time(engine):
+    """Current timestamp of the database server (the clock ``updated_at`` uses)."""
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()
+
+
+# Cheap change probe: row count and largest key (or date) of every table the
+# dataset is loaded from.
+_FINGERPRINT_TABLES = {
+    "workout_sessions": "session_id",
+    "workout_exercises": "workout_exercise_id",
+    "workout_sets": "set_id",
+    "exercises": "exercise_id",
+    "exercise_muscle_map": "exercise_id",
+    "body_measurements": "measurement_date",
+    "body_composition": "measurement_date",
+}
+
+
+def get_dataset_fingerprint(engine) -> pd.DataFrame:
+    """Row count and maximum key per loaded table, in one round trip.
+
+    Detects inserted and deleted rows without reading them; in-place
+    updates are only seen by the incremental sync.
+    """
+    query = text(
+        " UNION ALL ".join(
+            f"SELECT '{table}' AS table_name, COUNT(*) AS row_count, "
+            f"CAST(MAX({column}) AS TEXT) AS max_key FROM {table}"
+            for table, column in _FINGERPRINT_TABLES.items()
+        )
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn)
+
+
+def get_rows_changed_since(engine, table: str, since) -> pd.DataFrame:
+    """Rows of a sync-tracked table inserted or updated after ``since``."""
+    key, columns = SYNC_TABLES[table]
+    query = text(
+        f"""
+        SELECT {", ".join(columns)}
+        FROM {table}
+        WHERE updated_at > :since
+        ORDER BY {key};
+    """
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, params={"since": since})
+
+
+def get_deleted_rows_since(engine, since) -> pd.DataFrame:
+    """Primary keys of sync-tracked rows deleted after ``since``."""
+    query = text(
+        """
+        SELECT table_name, row_id
+        FROM sync_deletions
+        WHERE deleted_at > :since
+        ORDER BY deleted_at;
+    """
+    )
+    with engine.connect() as conn:
+        return pd.read_sql(query, conn, params={"since": since})
+
+
+def prune_deleted_rows(engine, before) -> int:
+    """Remove ``sync_deletions`` tombstones recorded before ``before``; returns how many."""
+    with engine.begin() as conn:
+        result = conn.execute(
+            text("DELETE FROM sync_deletions WHERE deleted_at < :before"),
+            {"before": before},
+        )
+        return result.rowcount
+
 def get_body_measurements(engine) -> pd.DataFrame:
     """Retrieve body measurements records from the database.
 
@@ -98,6 +373,15 @@ def get_body_composition(engine) -> pd.DataFrame:
         df = pd.read_sql(query, conn)
     return df
 
+class NewExercise(NamedTuple):
+    """An exercise to create; unset fields are resolved from the exercise name."""
+
+    name: str
+    category: str | None = None
+    body_part: str | None = None
+    muscle_targets: list[MuscleTarget] | None = None
+
+
 def insert_exercise(
     engine,
     name: str,
@@ -109,45 +393,109 @@ def insert_exercise(
 
     Returns True on successful insert, otherwise False.
     """
-    resolution = resolve_exercise(name, allow_web=True)
+    exercise = _resolve_new_exercise(NewExercise(name, category, body_part, muscle_targets))
+    try:
+        insert_exercises(engine, [exercise])
+        return True
+    except Exception as e:
+        logger = logging.getLogger(__name__)
+        logger.exception("SQL error when adding exercise: %s", e)
+        return False
+
+
+def insert_exercises(engine, exercises: list[NewExercise]) -> list[int]:
+    """Create many exercises with their muscle targets in one transaction.
+
+    Returns the new exercise ids in input order. Raises ValueError if a name
+    occurs twice in the batch or the muscle targets of an exercise cannot be
+    resolved; database errors propagate and nothing is written.
+    """
+    _reject_duplicate_names(exercises)
+    exercises = [_resolve_new_exercise(exercise) for exercise in exercises]
+    with engine.begin() as conn:
+        return write_exercises(conn, exercises)
+
+
+def write_exercises(conn, exercises: list[NewExercise]) -> list[int]:
+    """Insert ``exercises`` and upsert their muscle targets on an open connection.
+
+    Exercise ids come from the ``exercise_id`` sequence (see the
+    ``exercise_id_sequence`` migration in ``db.migrate``), so concurrent
+    writers never wait on each other for an id. The new rows are matched to
+    their ids by name, so names must be unique within the batch.
+    """
+    if not exercises:
+        return []
+    _reject_duplicate_names(exercises)
+    exercises = [_resolve_new_exercise(exercise) for exercise in exercises]
+    exercise_ids = {
+        name: exercise_id
+        for exercise_id, name in _insert_rows(
+            conn,
+            "exercises",
+            [
+                {"exercise_name": e.name, "category": e.category, "body_part": e.body_part}
+                for e in exercises
+            ],
+            returning="exercise_id, exercise_name",
+        )
+    }
+    _upsert_muscle_target_rows(
+        conn,
+        [
+            _muscle_target_row(exercise_ids[exercise.name], target)
+            for exercise in exercises
+            for target in exercise.muscle_targets
+        ],
+    )
+    return [exercise_ids[exercise.name] for exercise in exercises]
+
+
+def _reject_duplicate_names(exercises: list[NewExercise]) -> None:
+    duplicates = [name for name, count in Counter(e.name for e in exercises).items() if count > 1]
+    if duplicates:
+        raise ValueError(f"Duplicate exercise names in batch: {', '.join(sorted(duplicates))}")
+
+
+def _resolve_new_exercise(exercise: NewExercise) -> NewExercise:
+    """Fill in category, body part and muscle targets that were not given."""
+    if exercise.muscle_targets is not None and exercise.category is not None and exercise.body_part is not None:
+        return exercise
+
+    resolution = resolve_exercise(exercise.name, allow_web=True)
+    muscle_targets = exercise.muscle_targets
     if muscle_targets is None:
         if resolution is None:
-            raise ValueError(f"Could not resolve muscle targets for exercise: {name}")
+            raise ValueError(f"Could not resolve muscle targets for exercise: {exercise.name}")
         muscle_targets = resolution.targets
+    category = exercise.category
     if category is None:
         category = resolution.category if resolution else "Pull"
+    body_part = exercise.body_part
     if body_part is None:
         body_part = resolution.body_part if resolution else muscle_targets[0].muscle_group
+    return NewExercise(exercise.name, category, body_part, muscle_targets)
 
-    exercise_query = text(
-        """
-        INSERT INTO exercises (exercise_id, exercise_name, category, body_part)
-        VALUES (
-            (SELECT COALESCE(MAX(exercise_id), 0) + 1 FROM exercises),
-            :name,
-            :category,
-            :body_part
-        )
-        RETURNING exercise_id
-    """
+
+def upsert_exercise_muscle_targets(conn, exercise_id: int, muscle_targets: list[MuscleTarget]) -> None:
+    _upsert_muscle_target_rows(
+        conn, [_muscle_target_row(exercise_id, target) for target in muscle_targets]
     )
-    try:
-        with engine.begin() as conn:
-            conn.execute(text("LOCK TABLE exercises IN EXCLUSIVE MODE"))
-            exercise_id = conn.execute(
-                exercise_query,
-                {"name": name, "category": category, "body_part": body_part},
-            ).scalar()
-            upsert_exercise_muscle_targets(conn, exercise_id, muscle_targets)
-        return True
-    except Exception as e:
-        logger = logging.getLogger(__name__)
-        logger.exception("SQL error when adding exercise: %s", e)
-        return False
 
 
-def upsert_exercise_muscle_targets(conn, exercise_id: int, muscle_targets: list[MuscleTarget]) -> None:
-    if not muscle_targets:
+def _muscle_target_row(exercise_id: int, target: MuscleTarget) -> dict[str, Any]:
+    return {
+        "exercise_id": exercise_id,
+        "muscle_group": target.muscle_group,
+        "muscle_name": target.muscle_name,
+        "role": target.role,
+        "set_factor": target.set_factor,
+        "source_note": target.source_note,
+    }
+
+
+def _upsert_muscle_target_rows(conn, rows: list[dict[str, Any]]) -> None:
+    if not rows:
         return
 
     muscle_query = text(
@@ -177,20 +525,7 @@ def upsert_exercise_muscle_targets(conn, exercise_id: int, muscle_targets: list[
             updated_at = now()
     """
     )
-    conn.execute(
-        muscle_query,
-        [
-            {
-                "exercise_id": exercise_id,
-                "muscle_group": target.muscle_group,
-                "muscle_name": target.muscle_name,
-                "role": target.role,
-                "set_factor": target.set_factor,
-                "source_note": target.source_note,
-            }
-            for target in muscle_targets
-        ],
-    )
+    conn.execute(muscle_query, rows)
 
 def insert_body_measurements(engine, data):
     """Insert a body measurements record into the body_measurements table.
@@ -223,6 +558,223 @@ def insert_body_composition(engine, data):
     with engine.begin() as conn:
         conn.execute(query, data)
 
+# Rows per multi-row INSERT; keeps statements well below bind parameter limits.
+_INSERT_BATCH_ROWS = 500
+
+
+class ImportedWorkout(NamedTuple):
+    """Ids written by ``insert_workout``."""
+
+    session_id: int
+    workout_exercise_ids: list[int]
+    set_ids: list[list[int]]
+
+
+def insert_workout(
+    engine,
+    session_date,
+    exercises: list[dict[str, Any]],
+    session_start=None,
+    session_end=None,
+    notes: str | None = None,
+) -> ImportedWorkout:
+    """Insert a whole workout (session, exercises and sets) in one transaction.
+
+    ``exercises`` holds one ``{"name": ..., "sets": [...]}`` entry per
+    performed exercise, in order; each set is a mapping with ``reps``,
+    ``weight``, ``rir`` and optionally ``duration_seconds``, and sets are
+    numbered from 1 per exercise. An existing session on ``session_date`` is
+    reused. Exercise names are resolved with one query, workout exercises and
+    sets are written with multi-row inserts, so the round trips do not grow
+    with the number of sets. Nothing is written if any exercise is unknown or
+    any statement fails.
+
+    Returns the session id, the new workout exercise ids (in ``exercises``
+    order) and the new set ids per workout exercise.
+    """
+    with engine.begin() as conn:
+        return write_workout(conn, session_date, exercises, session_start, session_end, notes)
+
+
+def write_workout(
+    conn,
+    session_date,
+    exercises: list[dict[str, Any]],
+    session_start=None,
+    session_end=None,
+    notes: str | None = None,
+    new_session: bool = False,
+) -> ImportedWorkout:
+    """``insert_workout`` on an open connection, inside the caller's transaction.
+
+    With ``new_session`` the workout always gets a session of its own, even
+    if ``session_date`` already has one.
+    """
+    names = list(dict.fromkeys(exercise["name"] for exercise in exercises))
+    exercise_ids = dict(
+        conn.execute(
+            text(
+                "SELECT exercise_name, exercise_id FROM exercises WHERE exercise_name IN :names"
+            ).bindparams(bindparam("names", expanding=True)),
+            {"names": names},
+        ).all()
+    )
+    missing = [name for name in names if name not in exercise_ids]
+    if missing:
+        raise ValueError(f"Exercise not found: {', '.join(missing)}")
+
+    row = None if new_session else conn.execute(text(_SESSION_ON_DATE), _day_bounds(session_date)).fetchone()
+    if row:
+        session_id = row[0]
+    else:
+        session_id = conn.execute(
+            text(
+                """
+                INSERT INTO workout_sessions (session_date, notes, start_time, end_time)
+                VALUES (:date, :notes, :start_time, :end_time)
+                RETURNING session_id
+            """
+            ),
+            {"date": session_date, "notes": notes, "start_time": session_start, "end_time": session_end},
+        ).scalar()
+
+    # Ids from one multi-row INSERT are assigned in VALUES order.
+    workout_exercise_ids = sorted(
+        workout_exercise_id
+        for (workout_exercise_id,) in _insert_rows(
+            conn,
+            "workout_exercises",
+            [
+                {"session_id": session_id, "exercise_id": exercise_ids[exercise["name"]]}
+                for exercise in exercises
+            ],
+            returning="workout_exercise_id",
+        )
+    )
+
+    set_rows = [
+        {
+            "workout_exercise_id": workout_exercise_id,
+            "set_number": number,
+            "repetitions": workout_set["reps"],
+            "weight": workout_set["weight"],
+            "duration_seconds": workout_set.get("duration_seconds"),
+            "rir": workout_set["rir"],
+        }
+        for workout_exercise_id, exercise in zip(workout_exercise_ids, exercises)
+        for number, workout_set in enumerate(exercise["sets"], start=1)
+    ]
+    set_ids = {
+        (workout_exercise_id, set_number): set_id
+        for workout_exercise_id, set_number, set_id in _insert_rows(
+            conn,
+            "workout_sets",
+            set_rows,
+            returning="workout_exercise_id, set_number, set_id",
+        )
+    }
+
+    return ImportedWorkout(
+        session_id=session_id,
+        workout_exercise_ids=workout_exercise_ids,
+        set_ids=[
+            [set_ids[(workout_exercise_id, number)] for number in range(1, len(exercise["sets"]) + 1)]
+            for workout_exercise_id, exercise in zip(workout_exercise_ids, exercises)
+        ],
+    )
+
+
+def copy_workouts(conn, workouts: list[dict[str, Any]]) -> None:
+    """Write new workouts with PostgreSQL ``COPY``, inside the caller's transaction.
+
+    Each workout is a mapping with ``session_date``, ``start_time``,
+    ``end_time``, ``notes`` and ``exercises`` (``{"exercise_id": ...,
+    "sets": [...]}`` entries as in ``insert_workout``). Ids are reserved from
+    the tables' sequences up front, so all rows of a batch are streamed with
+    three ``COPY`` statements and no per-row round trips.
+    """
+    workout_exercise_count = sum(len(workout["exercises"]) for workout in workouts)
+    set_count = sum(len(exercise["sets"]) for workout in workouts for exercise in workout["exercises"])
+    session_ids = iter(_reserve_ids(conn, "workout_sessions", "session_id", len(workouts)))
+    workout_exercise_ids = iter(
+        _reserve_ids(conn, "workout_exercises", "workout_exercise_id", workout_exercise_count)
+    )
+    set_ids = iter(_reserve_ids(conn, "workout_sets", "set_id", set_count))
+
+    sessions, workout_exercises, sets = [], [], []
+    for workout in workouts:
+        session_id = next(session_ids)
+        sessions.append(
+            (session_id, workout["session_date"], workout["notes"], workout["start_time"], workout["end_time"])
+        )
+        for exercise in workout["exercises"]:
+            workout_exercise_id = next(workout_exercise_ids)
+            workout_exercises.append((workout_exercise_id, session_id, exercise["exercise_id"]))
+            for number, workout_set in enumerate(exercise["sets"], start=1):
+                sets.append(
+                    (
+                        next(set_ids),
+                        workout_exercise_id,
+                        number,
+                        workout_set["reps"],
+                        workout_set["weight"],
+                        workout_set.get("duration_seconds"),
+                        workout_set["rir"],
+                    )
+                )
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        _copy_rows(cursor, "workout_sessions", ("session_id", "session_date", "notes", "start_time", "end_time"), sessions)
+        _copy_rows(cursor, "workout_exercises", ("workout_exercise_id", "session_id", "exercise_id"), workout_exercises)
+        _copy_rows(
+            cursor,
+            "workout_sets",
+            ("set_id", "workout_exercise_id", "set_number", "repetitions", "weight", "duration_seconds", "rir"),
+            sets,
+        )
+    finally:
+        cursor.close()
+
+
+def _reserve_ids(conn, table: str, column: str, count: int) -> list[int]:
+    """Take ``count`` values from the sequence behind ``table.column``."""
+    if not count:
+        return []
+    return list(
+        conn.execute(
+            text("SELECT nextval(pg_get_serial_sequence(:table, :column)) FROM generate_series(1, :count)"),
+            {"table": table, "column": column, "count": count},
+        ).scalars()
+    )
+
+
+def _copy_rows(cursor, table: str, columns: tuple[str, ...], rows: list[tuple]) -> None:
+    """Stream ``rows`` into ``table`` as CSV (empty unquoted fields are NULL)."""
+    if not rows:
+        return
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerows(
+        ["" if value is None else value for value in row] for row in rows
+    )
+    buffer.seek(0)
+    cursor.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer)
+
+
+def _insert_rows(conn, table: str, rows: list[dict[str, Any]], returning: str) -> list[tuple]:
+    """Insert ``rows`` (all with the same keys) with multi-row INSERTs; RETURNING rows of every batch."""
+    returned = []
+    for offset in range(0, len(rows), _INSERT_BATCH_ROWS):
+        batch = rows[offset:offset + _INSERT_BATCH_ROWS]
+        columns = list(batch[0])
+        values = ", ".join(
+            "(" + ", ".join(f":{column}_{i}" for column in columns) + ")" for i in range(len(batch))
+        )
+        params = {f"{column}_{i}": row[column] for i, row in enumerate(batch) for column in columns}
+        query = text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {values} RETURNING {returning}")
+        returned.extend(tuple(row) for row in conn.execute(query, params))
+    return returned
+
 def get_sets_raw(engine) -> pd.DataFrame:
     query = text(
         """
@@ -3,6 +3,7 @@ from __future__ import annotations
 from sqlalchemy import text
 
 from db.connection import get_engine
+from db.migrate import migrate
 
 
 ROLE_FACTOR = {
@@ -291,32 +292,13 @@ MAPPINGS: dict[str, list[tuple[str, str, str, float | None, str]]] = {
 
 def main() -> None:
     engine = get_engine()
+    migrate(engine)
     with engine.begin() as conn:
         conn.execute(
             text(
                 """
-                CREATE TABLE IF NOT EXISTS exercise_muscle_map (
-                    id BIGSERIAL PRIMARY KEY,
-                    exercise_id INTEGER NOT NULL REFERENCES exercises(exercise_id) ON DELETE CASCADE,
-                    muscle_group TEXT NOT NULL,
-                    muscle_name TEXT NOT NULL,
-                    role TEXT NOT NULL CHECK (role IN ('primary', 'secondary', 'stabilizer')),
-                    set_factor NUMERIC(4, 2) NOT NULL CHECK (set_factor > 0 AND set_factor <= 1),
-                    source_note TEXT,
-                    created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                    updated_at TIMESTAMPTZ NOT NULL DEFAULT now(),
-                    UNIQUE (exercise_id, muscle_group)
-                )
-                """
-            )
-        )
-
-        conn.execute(
-            text(
-                """
-                INSERT INTO exercises (exercise_id, exercise_name, category, body_part)
+                INSERT INTO exercises (exercise_name, category, body_part)
                 SELECT
-                    (SELECT COALESCE(MAX(exercise_id), 0) + 1 FROM exercises),
                     'Plank',
                     'Push',
                     'Abs'
@@ -4,6 +4,8 @@ from sqlalchemy import text
 
 from db.connection import get_engine
 from db.exercise_muscle_resolver import resolve_exercise
+from db.migrate import migrate
+from db.queries import NewExercise, upsert_exercise_muscle_targets, write_exercises
 
 
 def main() -> None:
@@ -12,31 +14,8 @@ def main() -> None:
         raise RuntimeError("Could not resolve Plank muscle targets.")
 
     engine = get_engine()
+    migrate(engine)
     with engine.begin() as conn:
-        conn.execute(
-            text("ALTER TABLE workout_sets ADD COLUMN IF NOT EXISTS duration_seconds INTEGER")
-        )
-
-        duration_constraint_exists = conn.execute(
-            text(
-                """
-                SELECT 1
-                FROM pg_constraint
-                WHERE conname = 'workout_sets_duration_seconds_positive'
-                """
-            )
-        ).scalar()
-        if not duration_constraint_exists:
-            conn.execute(
-                text(
-                    """
-                    ALTER TABLE workout_sets
-                    ADD CONSTRAINT workout_sets_duration_seconds_positive
-                    CHECK (duration_seconds IS NULL OR duration_seconds > 0)
-                    """
-                )
-            )
-
         exercise_id = conn.execute(
             text(
                 """
@@ -49,53 +28,12 @@ def main() -> None:
         ).scalar()
 
         if exercise_id is None:
-            conn.execute(text("LOCK TABLE exercises IN EXCLUSIVE MODE"))
-            exercise_id = conn.execute(
-                text(
-                    """
-                    INSERT INTO exercises (exercise_id, exercise_name, category, body_part)
-                    VALUES (
-                        (SELECT COALESCE(MAX(exercise_id), 0) + 1 FROM exercises),
-                        :name,
-                        :category,
-                        :body_part
-                    )
-                    RETURNING exercise_id
-                    """
-                ),
-                {
-                    "name": "Plank",
-                    "category": resolution.category,
-                    "body_part": resolution.body_part,
-                },
-            ).scalar_one()
-
-        for target in resolution.targets:
-            conn.execute(
-                text(
-                    """
-                    INSERT INTO exercise_muscle_map
-                        (exercise_id, muscle_group, muscle_name, role, set_factor, source_note)
-                    VALUES
-                        (:exercise_id, :muscle_group, :muscle_name, :role, :set_factor, :source_note)
-                    ON CONFLICT (exercise_id, muscle_group) DO UPDATE
-                    SET
-                        muscle_name = EXCLUDED.muscle_name,
-                        role = EXCLUDED.role,
-                        set_factor = EXCLUDED.set_factor,
-                        source_note = EXCLUDED.source_note,
-                        updated_at = now()
-                    """
-                ),
-                {
-                    "exercise_id": exercise_id,
-                    "muscle_group": target.muscle_group,
-                    "muscle_name": target.muscle_name,
-                    "role": target.role,
-                    "set_factor": target.set_factor,
-                    "source_note": target.source_note,
-                },
+            [exercise_id] = write_exercises(
+                conn,
+                [NewExercise("Plank", resolution.category, resolution.body_part, resolution.targets)],
             )
+        else:
+            upsert_exercise_muscle_targets(conn, exercise_id, resolution.targets)
 
     print(f"Seeded Plank exercise with duration support as exercise_id={exercise_id}.")
 
@@ -0,0 +1,398 @@
+"""
+Bulk historical workout import.
+
+Streams workout logs into the database in batches:
+
+    python -m import_history PATH [PATH ...] [--dry-run] [--batch-size N]
+
+A PATH is a TXT workout log, a directory searched recursively for ``*.txt``
+and ``*.csv`` files, or a CSV export. TXT logs are parsed with the grammar
+of the sidebar import (``SidebarUpload``); the workout date is taken from
+the file name (e.g. ``2024-03-18 push.txt``) or, failing that, from the
+first ISO date in the text. CSV exports have one row per set with the
+columns of the app's sets table: ``session_date``, ``exercise_name``,
+``repetitions``, ``weight``, ``rir`` and optionally ``duration_seconds``,
+``set_number``, ``start_time`` and ``end_time``; consecutive rows with the
+same date and start time form one workout.
+
+Re-runs are idempotent: a workout is identified by its date, start time and
+the exercises and values of its sets, and one that is already in the
+database (or earlier in the same run) is skipped. Other workouts on a date
+that already has a session, such as a morning and an evening session, are
+imported as sessions of their own and reported as warnings. Workouts with exercises
+that are not in the database are reported and skipped; add the exercises and
+run the import again. On PostgreSQL every batch is written in one
+transaction with ``COPY``; other databases use multi-row inserts.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import hashlib
+import re
+import sys
+import time as timer
+from dataclasses import dataclass, field
+from datetime import date, time
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from db.connection import get_engine
+from db.queries import copy_workouts, get_exercises, get_session_sets, write_workout
+from ui.sidebar_upload import SidebarUpload
+from ui.utils.exercise_matcher import normalize
+
+DEFAULT_BATCH_SIZE = 200
+
+_ISO_DATE = re.compile(r"(\d{4})[-_.](\d{2})[-_.](\d{2})")
+
+
+@dataclass
+class ParsedWorkout:
+    """One workout read from a log file or export."""
+
+    source: str
+    session_date: date
+    exercises: list[dict[str, Any]]
+    start_time: time | None = None
+    end_time: time | None = None
+
+
+@dataclass
+class ImportReport:
+    """Counts and problems of one import run."""
+
+    workouts: int = 0
+    imported: int = 0
+    sets: int = 0
+    skipped_existing: int = 0
+    failed: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def summary(self, dry_run: bool = False) -> str:
+        verb = "would import" if dry_run else "imported"
+        return (
+            f"{self.workouts} workouts read: {verb} {self.imported} ({self.sets} sets), "
+            f"{self.skipped_existing} already present, {len(self.failed)} failed "
+            f"in {self.elapsed_seconds:.1f}s"
+        )
+
+
+class _LogParser(SidebarUpload):
+    """The sidebar's TXT grammar without Streamlit or a database connection."""
+
+    def __init__(self) -> None:
+        self.warnings: list[str] = []
+
+    def _warn(self, message: str) -> None:
+        self.warnings.append(message)
+
+
+def read_workouts(paths: Iterable[str | Path], report: ImportReport) -> Iterator[ParsedWorkout]:
+    """Workouts of every log and export under ``paths``, one file at a time.
+
+    Files that cannot be parsed are recorded in ``report.failed``.
+    """
+    for path in map(Path, paths):
+        files = sorted(
+            p for p in path.rglob("*") if p.suffix.lower() in (".txt", ".csv")
+        ) if path.is_dir() else [path]
+        for file in files:
+            try:
+                if file.suffix.lower() == ".csv":
+                    yield from read_csv_export(file)
+                else:
+                    workout = read_txt_log(file, report)
+                    if workout is not None:
+                        yield workout
+            except (OSError, UnicodeDecodeError, ValueError, KeyError) as exc:
+                report.failed.append(f"{file}: {exc}")
+
+
+def read_txt_log(path: Path, report: ImportReport) -> ParsedWorkout | None:
+    """Parse one TXT workout log; None (with the reason in ``report``) if it has no workout."""
+    content = path.read_text(encoding="utf-8")
+    match = _ISO_DATE.search(path.stem) or _ISO_DATE.search(content)
+    if match is None:
+        report.failed.append(f"{path}: no workout date in the file name or text")
+        return None
+
+    parser = _LogParser()
+    exercises = parser._parse_txt(content)
+    report.warnings.extend(f"{path}: {message}" for message in parser.warnings)
+    if not exercises:
+        report.failed.append(f"{path}: no exercises with valid sets")
+        return None
+
+    start_time, end_time = parser._parse_time_range(content)
+    return ParsedWorkout(
+        source=str(path),
+        session_date=date(*map(int, match.groups())),
+        exercises=exercises,
+        start_time=start_time,
+        end_time=end_time,
+    )
+
+
+def read_csv_export(path: Path) -> Iterator[ParsedWorkout]:
+    """Stream workouts from a CSV export with one row per set."""
+    with path.open(newline="", encoding="utf-8") as file:
+        rows = csv.DictReader(file)
+        for (session_date, _), workout_rows in groupby(
+            rows, key=lambda row: (row["session_date"][:10], row.get("start_time"))
+        ):
+            workout_rows = list(workout_rows)
+            exercises = []
+            for name, set_rows in groupby(workout_rows, key=lambda row: row["exercise_name"]):
+                set_rows = list(set_rows)
+                if set_rows[0].get("set_number"):
+                    set_rows.sort(key=lambda row: int(float(row["set_number"])))
+                exercises.append({"name": name, "sets": [_csv_set(row) for row in set_rows]})
+
+            first = workout_rows[0]
+            yield ParsedWorkout(
+                source=f"{path}:{session_date}",
+                session_date=date.fromisoformat(session_date),
+                exercises=exercises,
+                start_time=_optional_time(first.get("start_time")),
+                end_time=_optional_time(first.get("end_time")),
+            )
+
+
+class HistoryImporter:
+    """Writes parsed workouts to the database in batches.
+
+    Parameters
+    ----------
+    engine : sqlalchemy.engine.Engine
+        Target database.
+    batch_size : int
+        Workouts per transaction.
+    dry_run : bool
+        Resolve and check everything, but write nothing.
+    progress : callable, optional
+        Called with the running ``ImportReport`` after every batch.
+    """
+
+    def __init__(
+        self,
+        engine,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        dry_run: bool = False,
+        progress: Callable[[ImportReport], None] | None = None,
+    ) -> None:
+        self.engine = engine
+        self.batch_size = max(int(batch_size), 1)
+        self.dry_run = dry_run
+        self.progress = progress
+
+    def run(self, workouts: Iterable[ParsedWorkout], report: ImportReport | None = None) -> ImportReport:
+        report = report or ImportReport()
+        started = timer.perf_counter()
+        exercises = get_exercises(self.engine)
+        exercise_by_name = {
+            normalize(name): (name, int(exercise_id))
+            for name, exercise_id in zip(exercises["exercise_name"], exercises["exercise_id"])
+        }
+        seen = _existing_workouts(self.engine)
+        seen_dates = {session_date for session_date, _, _ in seen}
+
+        batch: list[dict[str, Any]] = []
+        for workout in workouts:
+            report.workouts += 1
+            unknown = [
+                exercise["name"] for exercise in workout.exercises
+                if normalize(exercise["name"]) not in exercise_by_name
+            ]
+            if unknown:
+                report.failed.append(f"{workout.source}: unknown exercises: {', '.join(unknown)}")
+                continue
+
+            resolved = _resolved(workout, exercise_by_name)
+            identity = _workout_identity(
+                workout.session_date,
+                workout.start_time,
+                (
+                    _set_key(exercise["exercise_id"], workout_set.get("reps"), workout_set.get("weight"),
+                             workout_set.get("rir"), workout_set.get("duration_seconds"))
+                    for exercise in resolved["exercises"]
+                    for workout_set in exercise["sets"]
+                ),
+            )
+            if identity in seen:
+                report.skipped_existing += 1
+                continue
+            if workout.session_date in seen_dates:
+                report.warnings.append(
+                    f"{workout.source}: {workout.session_date} already has a session; "
+                    "imported as a separate session"
+                )
+
+            seen.add(identity)
+            seen_dates.add(workout.session_date)
+            batch.append(resolved)
+            if len(batch) >= self.batch_size:
+                self._flush(batch, report, started)
+                batch = []
+
+        if batch:
+            self._flush(batch, report, started)
+        report.elapsed_seconds = timer.perf_counter() - started
+        return report
+
+    def _flush(self, batch: list[dict[str, Any]], report: ImportReport, started: float) -> None:
+        try:
+            if not self.dry_run:
+                self._write(batch)
+        except Exception as exc:
+            report.failed.extend(f"{workout['source']}: batch not written: {exc}" for workout in batch)
+        else:
+            report.imported += len(batch)
+            report.sets += sum(
+                len(exercise["sets"]) for workout in batch for exercise in workout["exercises"]
+            )
+        report.elapsed_seconds = timer.perf_counter() - started
+        if self.progress is not None:
+            self.progress(report)
+
+    def _write(self, batch: list[dict[str, Any]]) -> None:
+        """Write one batch in one transaction."""
+        with self.engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                copy_workouts(conn, batch)
+                return
+            for workout in batch:
+                write_workout(
+                    conn,
+                    workout["session_date"],
+                    workout["exercises"],
+                    workout["start_time"],
+                    workout["end_time"],
+                    workout["notes"],
+                    new_session=True,
+                )
+
+
+def _resolved(workout: ParsedWorkout, exercise_by_name: dict[str, tuple[str, int]]) -> dict[str, Any]:
+    """Workout mapping for ``copy_workouts``/``write_workout`` with database exercise names and ids."""
+    exercises = []
+    for exercise in workout.exercises:
+        name, exercise_id = exercise_by_name[normalize(exercise["name"])]
+        exercises.append({"name": name, "exercise_id": exercise_id, "sets": exercise["sets"]})
+    return {
+        "source": workout.source,
+        "session_date": workout.session_date,
+        "start_time": workout.start_time,
+        "end_time": workout.end_time,
+        "notes": "Imported",
+        "exercises": exercises,
+    }
+
+
+def _existing_workouts(engine) -> set[tuple]:
+    """Identities of the sessions already in the database."""
+    rows = get_session_sets(engine)
+    identities = set()
+    for _, session in rows.groupby("session_id", sort=False):
+        first = session.iloc[0]
+        sets = session.dropna(subset=["exercise_id", "repetitions"])
+        identities.add(_workout_identity(
+            first["session_date"].date(),
+            first["start_time"],
+            (
+                _set_key(*values)
+                for values in zip(
+                    sets["exercise_id"], sets["repetitions"], sets["weight"], sets["rir"],
+                    sets["duration_seconds"],
+                )
+            ),
+        ))
+    return identities
+
+
+def _workout_identity(session_date: date, start_time: Any, set_keys: Iterable[tuple]) -> tuple:
+    """Date, start time and a digest of the sets (in any order) of one workout."""
+    digest = hashlib.sha1(repr(sorted(set_keys)).encode()).hexdigest()
+    return session_date, _time_text(start_time), digest
+
+
+def _set_key(exercise_id, reps, weight, rir, duration_seconds) -> tuple[int, int, float, int, int]:
+    """Comparable values of one set; a missing RIR is -1 and a missing duration 0."""
+    return (
+        int(exercise_id),
+        int(_present(reps) or 0),
+        round(float(_present(weight) or 0.0), 3),
+        -1 if _present(rir) is None else int(rir),
+        int(_present(duration_seconds) or 0),
+    )
+
+
+def _present(value: Any) -> Any:
+    """``value``, or None for NULL/NaN database values."""
+    return None if value is None or value != value else value
+
+
+def _time_text(value: Any) -> str | None:
+    """``HH:MM:SS`` of a time of day given as ``time``, datetime or ISO text."""
+    value = _present(value)
+    if isinstance(value, str):
+        value = time.fromisoformat(value.strip()) if value.strip() else None
+    if value is None:
+        return None
+    if hasattr(value, "time"):
+        value = value.time()
+    return value.replace(microsecond=0).isoformat()
+
+
+def _csv_set(row: dict[str, str]) -> dict[str, Any]:
+    duration = _optional_number(row.get("duration_seconds"))
+    rir = _optional_number(row.get("rir"))
+    return {
+        "reps": int(_optional_number(row.get("repetitions")) or 0),
+        "weight": float(_optional_number(row.get("weight")) or 0.0),
+        "rir": None if rir is None else int(rir),
+        **({"duration_seconds": int(duration)} if duration else {}),
+    }
+
+
+def _optional_number(value: str | None) -> float | None:
+    if value is None or not value.strip() or value.strip().lower() in ("nan", "none", "null"):
+        return None
+    return float(value)
+
+
+def _optional_time(value: str | None) -> time | None:
+    if not value or not value.strip():
+        return None
+    return time.fromisoformat(value.strip())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("paths", nargs="+", help="TXT logs, CSV exports or directories of them")
+    parser.add_argument("--dry-run", action="store_true", help="parse and check, but write nothing")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="workouts per transaction")
+    args = parser.parse_args(argv)
+
+    report = ImportReport()
+    importer = HistoryImporter(
+        get_engine(),
+        batch_size=args.batch_size,
+        dry_run=args.dry_run,
+        progress=lambda current: print(current.summary(args.dry_run), file=sys.stderr),
+    )
+    importer.run(read_workouts(args.paths, report), report)
+
+    for message in report.warnings:
+        print(f"warning: {message}", file=sys.stderr)
+    for message in report.failed:
+        print(f"failed: {message}", file=sys.stderr)
+    print(report.summary(args.dry_run))
+    return 1 if report.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Stage instrumentation.
+
+Collects wall time, CPU time and input cardinalities for the stages of a
+pipeline (data loading, metric computation). Every finished stage is logged
+as a structured record on the ``instrumentation`` logger, with the numbers in
+``record.perf`` for log handlers that ship structured fields, and kept in a
+``PerformanceReport`` whose ``to_dict()`` output the UI can render.
+
+CPU time is measured per thread (``time.thread_time``) so concurrent
+Streamlit sessions do not inflate each other's numbers.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StageTiming:
+    """Measured cost of one pipeline stage."""
+
+    stage: str
+    wall_ms: float
+    cpu_ms: float
+    cardinalities: Dict[str, int] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stage": self.stage,
+            "wall_ms": round(self.wall_ms, 3),
+            "cpu_ms": round(self.cpu_ms, 3),
+            **self.cardinalities,
+        }
+
+
+class PerformanceReport:
+    """Ordered collection of ``StageTiming`` records for one pipeline run.
+
+    Parameters
+    ----------
+    name : str
+        Pipeline name used as the prefix of logged stage names.
+    cardinalities : dict, optional
+        Input sizes attached to every stage recorded in this report.
+    """
+
+    def __init__(self, name: str, cardinalities: Dict[str, int] | None = None) -> None:
+        self.name = name
+        self.cardinalities = dict(cardinalities or {})
+        self._stages: list[StageTiming] = []
+        self._lock = Lock()
+
+    @property
+    def stages(self) -> list[StageTiming]:
+        with self._lock:
+            return list(self._stages)
+
+    @contextmanager
+    def stage(self, name: str, **cardinalities: int) -> Iterator[Dict[str, int]]:
+        """
+        Time the enclosed block as stage ``name``.
+
+        Yields a dict the block may fill with output cardinalities
+        (e.g. ``rows``); they are recorded with the stage.
+        """
+        extra: Dict[str, int] = dict(cardinalities)
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            yield extra
+        finally:
+            self.record(
+                name,
+                wall_seconds=time.perf_counter() - wall_start,
+                cpu_seconds=time.thread_time() - cpu_start,
+                **extra,
+            )
+
+    def record(self, name: str, wall_seconds: float, cpu_seconds: float, **cardinalities: int) -> StageTiming:
+        """Add an externally measured stage (e.g. one timed in a worker process)."""
+        timing = StageTiming(
+            stage=name,
+            wall_ms=wall_seconds * 1000,
+            cpu_ms=cpu_seconds * 1000,
+            cardinalities={**self.cardinalities, **cardinalities},
+        )
+        with self._lock:
+            self._stages.append(timing)
+        _log_stage(self.name, timing)
+        return timing
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain-dict summary with per-stage rows and totals."""
+        stages = self.stages
+        return {
+            "name": self.name,
+            "cardinalities": dict(self.cardinalities),
+            "total_wall_ms": round(sum(s.wall_ms for s in stages), 3),
+            "total_cpu_ms": round(sum(s.cpu_ms for s in stages), 3),
+            "stages": [s.to_dict() for s in stages],
+        }
+
+
+def input_cardinalities(metrics_input: Any) -> Dict[str, int]:
+    """Sessions, sets, exercises and body records in a (columnar) ``MetricsInput``.
+
+    Columnar inputs are counted from their arrays, so no domain objects are
+    materialized.
+    """
+    if hasattr(metrics_input, "set_columns"):
+        sessions = len(metrics_input.session_columns)
+        sets = len(metrics_input.set_columns)
+    else:
+        sessions = len(metrics_input.sessions)
+        sets = len(metrics_input.sets)
+    return {
+        "sessions": sessions,
+        "sets": sets,
+        "exercises": len(metrics_input.exercises),
+        "body_records": len(metrics_input.body_measurements) + len(metrics_input.body_composition),
+    }
+
+
+def _log_stage(pipeline: str, timing: StageTiming) -> None:
+    record = {"pipeline": pipeline, **timing.to_dict()}
+    logger.info(
+        "stage=%s.%s wall_ms=%.1f cpu_ms=%.1f %s",
+        pipeline,
+        timing.stage,
+        timing.wall_ms,
+        timing.cpu_ms,
+        " ".join(f"{key}={value}" for key, value in timing.cardinalities.items()),
+        extra={"perf": record},
+    )
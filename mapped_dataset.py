@@ -0,0 +1,219 @@
+"""
+Memory-mapped dataset columns shared across processes.
+
+Several Streamlit worker processes serving the same database would each
+hold their own copy of the dataset's NumPy columns. ``MappedDataset``
+writes the set, session and workout exercise columns (and the month and
+date orders ``MonthPartitions`` derives from them) once per data version as
+``.npy`` files, and every process maps those files read-only instead: the
+arrays are views of the operating system's page cache, so adding a worker
+does not add another private copy, and a worker that starts on a dataset
+another worker already published maps it without writing anything.
+
+Versions are keyed by the database state they were read at: the directory
+name is a hash of the sync watermark and dataset fingerprint (see
+``dataset_key``), which ``DatasetSync`` knows before it builds anything. A
+worker that restores the snapshot another worker saved with a dataset
+therefore finds that dataset's version by name and maps its published
+columns (``MappedVersion.published_input``) instead of building them. Within
+a version every group of arrays (e.g. ``set_columns``) is a
+subdirectory with one ``<field>.npy`` per dataclass field and
+``manifest.json``; it is written under a temporary name and renamed into
+place, so readers never map a half-written group. Only the newest ``keep``
+versions are kept on disk; mappings of a removed version stay valid until
+the process drops them.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import uuid
+from dataclasses import fields
+from pathlib import Path
+from typing import Any, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from metrics.columnar import ColumnarMetricsInput, SessionColumns, SetColumns, WorkoutExerciseColumns
+
+logger = logging.getLogger(__name__)
+
+MAPPED_FORMAT = 1
+DEFAULT_MAPPED_DIR = Path(__file__).resolve().parent / ".cache" / "mapped_dataset"
+
+_MANIFEST = "manifest.json"
+_INPUT_GROUPS = {
+    "session_columns": SessionColumns,
+    "workout_exercise_columns": WorkoutExerciseColumns,
+    "set_columns": SetColumns,
+}
+
+T = TypeVar("T")
+
+
+def _arrays(columns: Any) -> dict[str, np.ndarray]:
+    return {field.name: getattr(columns, field.name) for field in fields(columns)}
+
+
+def dataset_key(watermark: Any, fingerprint: dict[str, list] | None) -> str:
+    """Version key of the dataset read at ``watermark`` with database ``fingerprint``.
+
+    Both are taken before any data is read and saved with the snapshot, so
+    the key is the same in the process that loaded the dataset and in every
+    process that restores it, without hashing its columns.
+    """
+    state = {
+        "format": MAPPED_FORMAT,
+        "watermark": pd.Timestamp(watermark).isoformat(),
+        "fingerprint": fingerprint,
+    }
+    return hashlib.sha256(json.dumps(state, sort_keys=True).encode()).hexdigest()[:24]
+
+
+class MappedVersion:
+    """The mapped arrays of one data version.
+
+    Parameters
+    ----------
+    directory : Path
+        Version directory, one subdirectory per group.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.written = 0
+        self._groups: dict[str, Any] = {}
+
+    @property
+    def key(self) -> str:
+        return self.directory.name
+
+    def share(self, group: str, arrays: T) -> T:
+        """``arrays`` (a dataclass of NumPy arrays) backed by the read-only mapped files.
+
+        The group is written first if no process has published it yet. If
+        the files cannot be written or read, ``arrays`` is returned as is.
+        Each group is mapped once per ``MappedVersion``.
+        """
+        if group in self._groups:
+            return self._groups[group]
+        path = self.directory / group
+        try:
+            if not (path / _MANIFEST).exists():
+                self._write(path, _arrays(arrays))
+            mapped = type(arrays)(**self._map(path, type(arrays)))
+        except (OSError, ValueError):
+            logger.warning("Could not map dataset arrays %s, keeping them in memory", path, exc_info=True)
+            return arrays
+        self._groups[group] = mapped
+        return mapped
+
+    def share_input(self, metrics_input: ColumnarMetricsInput) -> ColumnarMetricsInput:
+        """``metrics_input`` with its set, session and workout exercise columns mapped."""
+        return ColumnarMetricsInput(
+            **{group: self.share(group, getattr(metrics_input, group)) for group in _INPUT_GROUPS},
+            exercises=metrics_input.exercises,
+            exercise_muscle_targets=metrics_input.exercise_muscle_targets,
+            muscle_groups=metrics_input.muscle_groups,
+            body_measurements=metrics_input.body_measurements,
+            body_composition=metrics_input.body_composition,
+        )
+
+    def published_input(self, **reference: Any) -> ColumnarMetricsInput | None:
+        """Input mapped from the published column groups, or None if one is missing.
+
+        ``reference`` holds the remaining ``ColumnarMetricsInput`` fields
+        (exercises, muscle map, body data), which are not mapped.
+        """
+        groups = {}
+        for group, columns in _INPUT_GROUPS.items():
+            if group not in self._groups:
+                path = self.directory / group
+                if not (path / _MANIFEST).exists():
+                    return None
+                try:
+                    self._groups[group] = columns(**self._map(path, columns))
+                except (OSError, ValueError):
+                    logger.warning("Could not map published arrays %s, building them", path, exc_info=True)
+                    return None
+            groups[group] = self._groups[group]
+        return ColumnarMetricsInput(**groups, **reference)
+
+    def _write(self, path: Path, arrays: dict[str, np.ndarray]) -> None:
+        temporary = path.with_name(f"{path.name}.{uuid.uuid4().hex[:12]}.tmp")
+        temporary.mkdir(parents=True)
+        try:
+            entries = {}
+            for name, array in arrays.items():
+                np.save(temporary / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+                entries[name] = {"dtype": array.dtype.str, "shape": list(array.shape)}
+            manifest = {"format": MAPPED_FORMAT, "arrays": entries}
+            (temporary / _MANIFEST).write_text(json.dumps(manifest, indent=2))
+            os.rename(temporary, path)
+            self.written += 1
+        except OSError:
+            if not (path / _MANIFEST).exists():
+                raise
+            # Another process published the same group first.
+        finally:
+            shutil.rmtree(temporary, ignore_errors=True)
+
+    @staticmethod
+    def _map(path: Path, columns: type) -> dict[str, np.ndarray]:
+        manifest = json.loads((path / _MANIFEST).read_text())
+        entries = manifest.get("arrays", {})
+        names = [field.name for field in fields(columns)]
+        if manifest.get("format") != MAPPED_FORMAT or sorted(entries) != sorted(names):
+            raise ValueError(f"Mapped arrays in {path} do not match {columns.__name__}")
+
+        mapped = {}
+        for name in names:
+            array = np.load(path / f"{name}.npy", mmap_mode="r")
+            if array.dtype.str != entries[name]["dtype"] or list(array.shape) != entries[name]["shape"]:
+                raise ValueError(f"Mapped array {path / name} does not match its manifest")
+            # A plain read-only ndarray view of the mapping, not an np.memmap.
+            mapped[name] = array.view(np.ndarray)
+        return mapped
+
+
+class MappedDataset:
+    """Directory of memory-mapped data versions.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Where the versions live; created on first use. Every process that
+        should share the arrays must use the same directory.
+    keep : int
+        Number of versions kept on disk, newest first.
+    """
+
+    def __init__(self, directory: str | Path, keep: int = 2) -> None:
+        self.directory = Path(directory)
+        self.keep = keep
+
+    def version(self, key: str) -> MappedVersion:
+        """Version ``key`` (see ``dataset_key``), created (and older versions pruned) if it is new."""
+        directory = self.directory / key
+        if not directory.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            self._prune(current=directory)
+        return MappedVersion(directory)
+
+    def clear(self) -> None:
+        """Delete every version."""
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _prune(self, current: Path) -> None:
+        versions = sorted(
+            (path for path in self.directory.iterdir() if path.is_dir() and path != current),
+            key=lambda path: path.stat().st_mtime,
+            reverse=True,
+        )
+        for path in versions[max(self.keep - 1, 0):]:
+            shutil.rmtree(path, ignore_errors=True)
@@ -1,3 +1,17 @@
+"""
+Row and frame mappers from query results to domain models.
+
+``map_<model>(row)`` converts one record dict. The plural ``map_<models>(df)``
+bulk mappers convert a whole result frame: each column is extracted once
+(``Series.tolist()``, which yields the same native values as
+``to_dict("records")``) and the models are built by zipping the columns, so
+no per-row dict is materialized. Both produce equal results.
+"""
+
+from typing import Any
+
+import pandas as pd
+
 from models import (
     BodyComposition,
     BodyMeasurement,
@@ -86,3 +100,123 @@ def map_body_composition(row: dict) -> BodyComposition:
         fat_percentage=row["body_fat_percentage"],
         method=row["method"],
     )
+
+
+def _column(df: pd.DataFrame, name: str, optional: bool = False, dtype: type | None = None) -> list[Any]:
+    """Values of column ``name`` as native Python objects, cast to ``dtype`` if given.
+
+    Optional columns missing from ``df`` read as None, like ``row.get``; an
+    empty frame needs no columns at all.
+    """
+    if name not in df and (optional or df.empty):
+        return [None] * len(df)
+    column = df[name]
+    return (column if dtype is None else column.astype(dtype)).tolist()
+
+
+def map_workout_sessions(df: pd.DataFrame) -> list[WorkoutSession]:
+    return [
+        WorkoutSession(session_id=session_id, session_date=session_date, start_time=start, end_time=end)
+        for session_id, session_date, start, end in zip(
+            _column(df, "session_id"),
+            _column(df, "session_date"),
+            _column(df, "start_time", optional=True),
+            _column(df, "end_time", optional=True),
+        )
+    ]
+
+
+def map_workout_exercises(df: pd.DataFrame) -> list[WorkoutExercise]:
+    return [
+        WorkoutExercise(workout_exercise_id=we_id, session_id=session_id, exercise_id=exercise_id)
+        for we_id, session_id, exercise_id in zip(
+            _column(df, "workout_exercise_id"),
+            _column(df, "session_id"),
+            _column(df, "exercise_id"),
+        )
+    ]
+
+
+def map_workout_sets(df: pd.DataFrame) -> list[WorkoutSet]:
+    return [
+        WorkoutSet(
+            workout_exercise_id=we_id,
+            set_number=set_number,
+            repetitions=repetitions,
+            weight=weight,
+            rir=rir,
+            duration_seconds=duration,
+        )
+        for we_id, set_number, repetitions, weight, rir, duration in zip(
+            _column(df, "workout_exercise_id"),
+            _column(df, "set_number"),
+            _column(df, "repetitions"),
+            _column(df, "weight"),
+            _column(df, "rir", optional=True),
+            _column(df, "duration_seconds", optional=True),
+        )
+    ]
+
+
+def map_exercises(df: pd.DataFrame) -> list[Exercise]:
+    return [
+        Exercise(exercise_id=exercise_id, name=name, primary_muscle_group_id=None, body_part=body_part)
+        for exercise_id, name, body_part in zip(
+            _column(df, "exercise_id"),
+            _column(df, "exercise_name"),
+            _column(df, "body_part", optional=True),
+        )
+    ]
+
+
+def map_exercise_muscle_targets(df: pd.DataFrame) -> list[ExerciseMuscleTarget]:
+    return [
+        ExerciseMuscleTarget(
+            exercise_id=exercise_id,
+            muscle_group=muscle_group,
+            muscle_name=muscle_name,
+            role=role,
+            set_factor=set_factor,
+        )
+        for exercise_id, muscle_group, muscle_name, role, set_factor in zip(
+            _column(df, "exercise_id"),
+            _column(df, "muscle_group"),
+            _column(df, "muscle_name"),
+            _column(df, "role"),
+            _column(df, "set_factor", dtype=float),
+        )
+    ]
+
+
+def map_body_measurements(df: pd.DataFrame) -> list[BodyMeasurement]:
+    """Flatten every wide measurement row; same order as ``map_body_measurement`` per row."""
+    columns = [_column(df, col, optional=True) for col in MEASUREMENT_COLUMNS]
+    return [
+        BodyMeasurement(date=date, measurement_type=col, value=value)
+        for date, *values in zip(_column(df, "measurement_date"), *columns)
+        for col, value in zip(MEASUREMENT_COLUMNS, values)
+        if value is not None
+    ]
+
+
+def map_body_compositions(df: pd.DataFrame) -> list[BodyComposition]:
+    return [
+        BodyComposition(
+            date=date,
+            weight=weight,
+            muscle_mass=muscle_mass,
+            fat_mass=fat_mass,
+            water_mass=water_mass,
+            fat_percentage=fat_percentage,
+            method=method,
+        )
+        for date, weight, muscle_mass, fat_mass, water_mass, fat_percentage, method in zip(
+            _column(df, "measurement_date"),
+            _column(df, "weight"),
+            _column(df, "muscle_mass"),
+            _column(df, "fat_mass"),
+            _column(df, "water_mass"),
+            _column(df, "body_fat_percentage"),
+            _column(df, "method"),
+        )
+    ]
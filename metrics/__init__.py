@@ -1,12 +1,21 @@
 __all__ = [
     "body_metrics",
+    "body_part_metrics",
+    "cache",
+    "columnar",
+    "date_filter",
     "exercise_metrics",
     "fatigue_metrics",
     "frequency_metrics",
+    "index",
     "input",
     "metrics_engine",
+    "parallel",
+    "partitions",
     "progress_metrics",
     "registry",
+    "rollups",
+    "scheduler",
     "session_metrics",
     "set_metrics",
 ]
@@ -3,6 +3,7 @@ from datetime import date, datetime
 from statistics import mean
 from typing import Any
 
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
 
 
@@ -124,7 +125,12 @@ def _calculate_metric_deltas(timeline: list[dict], column: str) -> float | None:
     return round(values[-1] - values[0], 2)
 
 
-def compute_body_metrics(input: MetricsInput) -> dict:
+def compute_body_metrics(input: MetricsInput, index: MetricsIndex | None = None) -> dict:
+    """Compute body composition and measurement trends.
+
+    ``index`` is unused (body data has no training joins); it is accepted so
+    every registered metric has the same signature.
+    """
     if not input.body_composition or len(input.body_composition) < 2:
         return _empty_body_metrics()
 
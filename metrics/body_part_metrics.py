@@ -0,0 +1,138 @@
+"""
+Body-part training metrics.
+
+Aggregates per-exercise metrics onto the muscle groups each exercise
+targets, weighting sets and volume by the target's ``set_factor``. This is a
+derived metric: it consumes the ``exercises`` result instead of re-reading
+set data.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Any, Dict
+
+import pandas as pd
+
+from metrics.exercise_metrics import compute_exercise_metrics
+from metrics.index import MetricsIndex
+from metrics.input import MetricsInput
+
+
+def compute_body_part_metrics(
+    input: MetricsInput,
+    index: MetricsIndex | None = None,
+    exercises: dict | None = None,
+) -> Dict[str, Any]:
+    """
+    Compute per-body-part sets, volume, sessions and weighted 1RM.
+
+    ``exercises`` is the output of ``compute_exercise_metrics``; the registry
+    passes the shared result, and it is computed here when the function is
+    called directly.
+
+    Returns
+    -------
+    dict
+        - "per_body_part": list of rows with body_part, total_sets,
+          total_volume, avg_1rm and sessions, sorted by volume descending
+        - "first_date" / "last_date": range of session dates with an
+          estimated 1RM, or None
+    """
+    if exercises is None:
+        exercises = compute_exercise_metrics(input, index)
+    return summarize_body_parts(exercises.get("per_exercise", {}))
+
+
+def summarize_body_parts(per_exercise: Dict[int, Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate a ``per_exercise`` mapping by targeted body part."""
+    rows = []
+    session_dates_by_part: dict[str, set] = defaultdict(set)
+    metric_dates = set()
+
+    for row in per_exercise.values():
+        muscle_targets = row.get("muscle_targets") or []
+        if not muscle_targets and row.get("body_part"):
+            muscle_targets = [
+                {
+                    "muscle_group": row["body_part"],
+                    "muscle_name": row["body_part"],
+                    "role": "primary",
+                    "set_factor": 1.0,
+                }
+            ]
+
+        for target in muscle_targets:
+            body_part = target.get("muscle_group")
+            if not body_part:
+                continue
+            factor = float(target.get("set_factor", 1.0))
+            set_exposure = float(row.get("effective_sets") or row["total_sets"])
+            rows.append(
+                {
+                    "body_part": str(body_part),
+                    "total_sets": set_exposure * factor,
+                    "total_volume": float(row["total_volume"]) * factor,
+                    "avg_1rm": row.get("estimated_1rm_avg"),
+                    "weight": max(set_exposure * factor, 0.0),
+                }
+            )
+
+        for point in row.get("per_session_1rm", []):
+            if point.get("date") is not None:
+                metric_dates.add(pd.to_datetime(point["date"]).date())
+
+        session_points = [
+            *row.get("per_session_1rm", []),
+            *row.get("per_session_duration", []),
+        ]
+        for point in session_points:
+            date = point.get("date")
+            if date is not None:
+                for target in muscle_targets:
+                    body_part = target.get("muscle_group")
+                    if body_part:
+                        session_dates_by_part[str(body_part)].add(pd.to_datetime(date).date())
+
+    period = {
+        "first_date": min(metric_dates) if metric_dates else None,
+        "last_date": max(metric_dates) if metric_dates else None,
+    }
+    if not rows:
+        return {"per_body_part": [], **period}
+
+    df = pd.DataFrame(rows)
+    weighted_1rm = (
+        df.dropna(subset=["avg_1rm"])
+        .assign(weighted_1rm=lambda x: x["avg_1rm"] * x["weight"])
+        .groupby("body_part", dropna=True)
+        .agg(weighted_1rm=("weighted_1rm", "sum"), weight=("weight", "sum"))
+    )
+
+    body_df = (
+        df.groupby("body_part", dropna=True)
+        .agg(
+            total_sets=("total_sets", "sum"),
+            total_volume=("total_volume", "sum"),
+            avg_1rm=("avg_1rm", "mean"),
+        )
+        .reset_index()
+    )
+    if not weighted_1rm.empty:
+        body_df = body_df.drop(columns=["avg_1rm"]).merge(
+            weighted_1rm.reset_index(),
+            on="body_part",
+            how="left",
+        )
+        body_df["avg_1rm"] = body_df.apply(
+            lambda row: row["weighted_1rm"] / row["weight"] if row["weight"] else None,
+            axis=1,
+        )
+        body_df = body_df.drop(columns=["weighted_1rm", "weight"])
+
+    body_df["sessions"] = body_df["body_part"].map(
+        lambda part: len(session_dates_by_part.get(str(part), set()))
+    )
+
+    body_df = body_df.sort_values("total_volume", ascending=False).reset_index(drop=True)
+    return {"per_body_part": body_df.to_dict("records"), **period}
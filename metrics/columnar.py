@@ -0,0 +1,389 @@
+"""
+Columnar metrics input.
+
+Struct-of-arrays variant of :class:`metrics.input.MetricsInput` for long
+training histories. Sets, sessions and workout exercises are stored as typed
+NumPy arrays instead of lists of frozen dataclasses, which keeps load time,
+memory and pickling cost proportional to the raw numbers rather than to the
+number of Python objects.
+
+``ColumnarMetricsInput`` exposes the same attributes as ``MetricsInput``.
+The metric functions read the columns directly; the ``sessions``,
+``workout_exercises`` and ``sets`` lists are only built on request, for
+callers that still iterate domain objects, and are never cached on the
+input, which may be shared by every session of the app.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass, fields
+from datetime import time
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from metrics.input import MetricsInput
+from models.body_composition import BodyComposition
+from models.body_measurement import BodyMeasurement
+from models.exercise import Exercise
+from models.exercise_muscle_target import ExerciseMuscleTarget
+from models.workout_exercise import WorkoutExercise
+from models.workout_session import WorkoutSession
+from models.workout_set import WorkoutSet
+
+logger = logging.getLogger(__name__)
+
+
+def _int_column(values: Any) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values), errors="coerce").fillna(0).to_numpy(dtype=np.int64)
+
+
+def _id_column(values: Any) -> np.ndarray:
+    """Store key columns as int64; rows with missing ids are dropped by ``_with_ids``."""
+    return pd.to_numeric(pd.Series(values)).to_numpy(dtype=np.int64)
+
+
+def _with_ids(df: pd.DataFrame, columns: tuple[str, ...]) -> pd.DataFrame:
+    """Rows of ``df`` whose id ``columns`` are all present and numeric.
+
+    Other rows are dropped with a warning instead of being filled with 0,
+    which would silently become a sentinel id in every join downstream.
+    """
+    ids = df[list(columns)].apply(pd.to_numeric, errors="coerce")
+    valid = ids.notna().all(axis=1).to_numpy()
+    if valid.all():
+        return df
+    logger.warning(
+        "Skipping %d of %d rows with a missing or non-numeric %s",
+        int((~valid).sum()),
+        len(df),
+        "/".join(columns),
+    )
+    return df[valid]
+
+
+def _float_column(values: Any) -> np.ndarray:
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _date_column(values: Any) -> np.ndarray:
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[D]")
+
+
+def _time_column(values: Any) -> np.ndarray:
+    """Store times of day as seconds since midnight (NaT for missing)."""
+    seconds = [
+        value.hour * 3600 + value.minute * 60 + value.second
+        if isinstance(value, time)
+        else None
+        for value in values
+    ]
+    return pd.to_timedelta(pd.Series(seconds, dtype="float64"), unit="s").to_numpy(
+        dtype="timedelta64[s]"
+    )
+
+
+def _optional_int(value: float) -> int | None:
+    return None if np.isnan(value) else int(value)
+
+
+def _to_time(value: np.timedelta64) -> time | None:
+    if np.isnat(value):
+        return None
+    seconds = int(value.astype(np.int64))
+    return time(seconds // 3600, (seconds % 3600) // 60, seconds % 60)
+
+
+@dataclass(frozen=True, eq=False)
+class SetColumns:
+    """Struct-of-arrays storage for workout sets.
+
+    ``rir`` and ``duration_seconds`` are float arrays where NaN means missing.
+    """
+
+    workout_exercise_id: np.ndarray
+    set_number: np.ndarray
+    repetitions: np.ndarray
+    weight: np.ndarray
+    rir: np.ndarray
+    duration_seconds: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.workout_exercise_id)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SetColumns":
+        df = _with_ids(df, ("workout_exercise_id",))
+        return cls(
+            workout_exercise_id=_id_column(df["workout_exercise_id"]),
+            set_number=_int_column(df["set_number"]),
+            repetitions=_int_column(df["repetitions"]),
+            weight=_float_column(df["weight"]),
+            rir=_float_column(df["rir"] if "rir" in df else np.full(len(df), np.nan)),
+            duration_seconds=_float_column(
+                df["duration_seconds"] if "duration_seconds" in df else np.full(len(df), np.nan)
+            ),
+        )
+
+    @classmethod
+    def from_models(cls, sets: list[WorkoutSet]) -> "SetColumns":
+        return cls.from_frame(
+            pd.DataFrame(
+                {
+                    "workout_exercise_id": [s.workout_exercise_id for s in sets],
+                    "set_number": [s.set_number for s in sets],
+                    "repetitions": [s.repetitions for s in sets],
+                    "weight": [s.weight for s in sets],
+                    "rir": [s.rir for s in sets],
+                    "duration_seconds": [s.duration_seconds for s in sets],
+                }
+            )
+        )
+
+    def to_models(self) -> list[WorkoutSet]:
+        return [
+            WorkoutSet(
+                workout_exercise_id=int(we_id),
+                set_number=int(number),
+                repetitions=int(reps),
+                weight=float(weight),
+                rir=_optional_int(rir),
+                duration_seconds=_optional_int(duration),
+            )
+            for we_id, number, reps, weight, rir, duration in zip(
+                self.workout_exercise_id,
+                self.set_number,
+                self.repetitions,
+                self.weight,
+                self.rir,
+                self.duration_seconds,
+            )
+        ]
+
+
+@dataclass(frozen=True, eq=False)
+class SessionColumns:
+    """Struct-of-arrays storage for workout sessions.
+
+    Dates are ``datetime64[D]``; start and end times are ``timedelta64[s]``
+    offsets from midnight with NaT for missing values.
+    """
+
+    session_id: np.ndarray
+    session_date: np.ndarray
+    start_time: np.ndarray
+    end_time: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.session_id)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SessionColumns":
+        df = _with_ids(df, ("session_id",))
+        missing = [None] * len(df)
+        return cls(
+            session_id=_id_column(df["session_id"]),
+            session_date=_date_column(df["session_date"]),
+            start_time=_time_column(df["start_time"] if "start_time" in df else missing),
+            end_time=_time_column(df["end_time"] if "end_time" in df else missing),
+        )
+
+    @classmethod
+    def from_models(cls, sessions: list[WorkoutSession]) -> "SessionColumns":
+        return cls.from_frame(
+            pd.DataFrame(
+                {
+                    "session_id": [s.session_id for s in sessions],
+                    "session_date": [s.session_date for s in sessions],
+                    "start_time": [s.start_time for s in sessions],
+                    "end_time": [s.end_time for s in sessions],
+                }
+            )
+        )
+
+    def to_models(self) -> list[WorkoutSession]:
+        dates = self.session_date.astype(object)
+        return [
+            WorkoutSession(
+                session_id=int(session_id),
+                session_date=session_date,
+                start_time=_to_time(start),
+                end_time=_to_time(end),
+            )
+            for session_id, session_date, start, end in zip(
+                self.session_id, dates, self.start_time, self.end_time
+            )
+        ]
+
+
+@dataclass(frozen=True, eq=False)
+class WorkoutExerciseColumns:
+    """Struct-of-arrays storage for the session/exercise join table."""
+
+    workout_exercise_id: np.ndarray
+    session_id: np.ndarray
+    exercise_id: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.workout_exercise_id)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "WorkoutExerciseColumns":
+        df = _with_ids(df, ("workout_exercise_id", "session_id", "exercise_id"))
+        return cls(
+            workout_exercise_id=_id_column(df["workout_exercise_id"]),
+            session_id=_id_column(df["session_id"]),
+            exercise_id=_id_column(df["exercise_id"]),
+        )
+
+    @classmethod
+    def from_models(cls, workout_exercises: list[WorkoutExercise]) -> "WorkoutExerciseColumns":
+        return cls(
+            workout_exercise_id=np.array(
+                [we.workout_exercise_id for we in workout_exercises], dtype=np.int64
+            ),
+            session_id=np.array([we.session_id for we in workout_exercises], dtype=np.int64),
+            exercise_id=np.array([we.exercise_id for we in workout_exercises], dtype=np.int64),
+        )
+
+    def to_models(self) -> list[WorkoutExercise]:
+        return [
+            WorkoutExercise(
+                workout_exercise_id=int(we_id),
+                session_id=int(session_id),
+                exercise_id=int(exercise_id),
+            )
+            for we_id, session_id, exercise_id in zip(
+                self.workout_exercise_id, self.session_id, self.exercise_id
+            )
+        ]
+
+
+@dataclass(frozen=True, eq=False)
+class ColumnarMetricsInput:
+    """
+    Columnar, NumPy-backed counterpart of ``MetricsInput``.
+
+    Training data lives in typed arrays; the small reference collections
+    (exercises, muscle targets, body data) stay as domain objects.
+    """
+
+    session_columns: SessionColumns
+    workout_exercise_columns: WorkoutExerciseColumns
+    set_columns: SetColumns
+
+    exercises: list[Exercise]
+    exercise_muscle_targets: list[ExerciseMuscleTarget]
+    muscle_groups: list[str]
+
+    body_measurements: list[BodyMeasurement]
+    body_composition: list[BodyComposition]
+
+    @property
+    def sessions(self) -> list[WorkoutSession]:
+        """Sessions as domain objects, built on every access."""
+        return self.session_columns.to_models()
+
+    @property
+    def workout_exercises(self) -> list[WorkoutExercise]:
+        """Workout exercises as domain objects, built on every access."""
+        return self.workout_exercise_columns.to_models()
+
+    @property
+    def sets(self) -> list[WorkoutSet]:
+        """Sets as domain objects, built on every access."""
+        return self.set_columns.to_models()
+
+    @classmethod
+    def from_frames(
+        cls,
+        sessions_df: pd.DataFrame,
+        workout_exercises_df: pd.DataFrame,
+        sets_df: pd.DataFrame,
+        exercises: list[Exercise],
+        exercise_muscle_targets: list[ExerciseMuscleTarget],
+        muscle_groups: list[str],
+        body_measurements: list[BodyMeasurement],
+        body_composition: list[BodyComposition],
+    ) -> "ColumnarMetricsInput":
+        """Build the columnar input straight from query result frames."""
+        return cls(
+            session_columns=SessionColumns.from_frame(sessions_df),
+            workout_exercise_columns=WorkoutExerciseColumns.from_frame(workout_exercises_df),
+            set_columns=SetColumns.from_frame(sets_df),
+            exercises=exercises,
+            exercise_muscle_targets=exercise_muscle_targets,
+            muscle_groups=muscle_groups,
+            body_measurements=body_measurements,
+            body_composition=body_composition,
+        )
+
+    @classmethod
+    def from_metrics_input(cls, metrics_input: MetricsInput) -> "ColumnarMetricsInput":
+        """Convert a list-based ``MetricsInput`` to columnar storage."""
+        return cls(
+            session_columns=SessionColumns.from_models(metrics_input.sessions),
+            workout_exercise_columns=WorkoutExerciseColumns.from_models(
+                metrics_input.workout_exercises
+            ),
+            set_columns=SetColumns.from_models(metrics_input.sets),
+            exercises=metrics_input.exercises,
+            exercise_muscle_targets=metrics_input.exercise_muscle_targets,
+            muscle_groups=metrics_input.muscle_groups,
+            body_measurements=metrics_input.body_measurements,
+            body_composition=metrics_input.body_composition,
+        )
+
+    def freeze(self) -> "ColumnarMetricsInput":
+        """Make every column array read-only; returns ``self``.
+
+        For a dataset shared by all sessions of the app: in-place writes to
+        the shared arrays raise instead of leaking into other sessions.
+        """
+        for columns in (self.session_columns, self.workout_exercise_columns, self.set_columns):
+            for field in fields(columns):
+                value = getattr(columns, field.name)
+                if isinstance(value, np.ndarray):
+                    value.flags.writeable = False
+        return self
+
+    def to_metrics_input(self) -> MetricsInput:
+        """Materialize a list-based ``MetricsInput`` with the same content."""
+        return MetricsInput(
+            sessions=self.sessions,
+            workout_exercises=self.workout_exercises,
+            sets=self.sets,
+            exercises=self.exercises,
+            exercise_muscle_targets=self.exercise_muscle_targets,
+            muscle_groups=self.muscle_groups,
+            body_measurements=self.body_measurements,
+            body_composition=self.body_composition,
+        )
+
+
+def read_only_frame(frame: pd.DataFrame) -> pd.DataFrame:
+    """``frame`` over read-only views of its NumPy columns.
+
+    The frame counterpart of ``ColumnarMetricsInput.freeze`` for frames
+    shared by every session: in-place writes raise instead of leaking into
+    other sessions, without switching pandas options for the whole process.
+    Extension-typed columns are kept as they are.
+    """
+    columns = {}
+    for name, column in frame.items():
+        if isinstance(column.dtype, np.dtype):
+            values = column.to_numpy(copy=False)
+            values.flags.writeable = False
+        else:
+            values = column.array
+        columns[name] = values
+    return pd.DataFrame(columns, index=frame.index, columns=frame.columns, copy=False)
+
+
+def to_columnar(metrics_input: MetricsInput | ColumnarMetricsInput) -> ColumnarMetricsInput:
+    """Return ``metrics_input`` as a ``ColumnarMetricsInput`` (no-op if it already is)."""
+    if isinstance(metrics_input, ColumnarMetricsInput):
+        return metrics_input
+    return ColumnarMetricsInput.from_metrics_input(metrics_input)
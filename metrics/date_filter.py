@@ -0,0 +1,123 @@
+"""
+Date filters.
+
+``DateFilter`` describes which part of the training history is analysed:
+all time, one calendar month, a custom start/end range, or a rolling window
+of the last N weeks. Filters are immutable and hashable, so they can be part
+of cache keys. ``bounds()`` resolves a filter to inclusive start/end dates
+(rolling windows relative to ``today``), and ``period_weeks()`` gives the
+period length used to normalise weekly training targets.
+"""
+
+from __future__ import annotations
+
+from calendar import monthrange
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+ALL_TIME = "All time"
+ROLLING_WEEKS = (4, 8, 12)
+
+
+@dataclass(frozen=True)
+class DateFilter:
+    """Selected analysis period.
+
+    ``kind`` is one of "all", "month", "range" or "rolling"; the other
+    fields are set according to it.
+    """
+
+    kind: str = "all"
+    month: str | None = None
+    start: date | None = None
+    end: date | None = None
+    weeks: int | None = None
+
+    @classmethod
+    def all_time(cls) -> "DateFilter":
+        return cls()
+
+    @classmethod
+    def for_month(cls, month: str) -> "DateFilter":
+        """Calendar month in YYYY-MM format."""
+        year, month_num = map(int, month.split("-"))
+        return cls(kind="month", month=f"{year:04d}-{month_num:02d}")
+
+    @classmethod
+    def between(cls, start: date, end: date) -> "DateFilter":
+        """Inclusive date range; swapped bounds are reordered."""
+        if start > end:
+            start, end = end, start
+        return cls(kind="range", start=start, end=end)
+
+    @classmethod
+    def last_weeks(cls, weeks: int) -> "DateFilter":
+        """Rolling window of the last ``weeks`` weeks, ending today."""
+        if weeks < 1:
+            raise ValueError("weeks must be at least 1")
+        return cls(kind="rolling", weeks=int(weeks))
+
+    @classmethod
+    def parse(cls, value: "DateFilter | str | None") -> "DateFilter":
+        """Accept a filter, a YYYY-MM month string, "All time" or None."""
+        if isinstance(value, DateFilter):
+            return value
+        if value is None or value == ALL_TIME:
+            return cls.all_time()
+        return cls.for_month(value)
+
+    @property
+    def is_all_time(self) -> bool:
+        return self.kind == "all"
+
+    @property
+    def label(self) -> str:
+        if self.kind == "month":
+            return self.month
+        if self.kind == "range":
+            return f"{self.start:%Y-%m-%d} - {self.end:%Y-%m-%d}"
+        if self.kind == "rolling":
+            return f"Last {self.weeks} weeks"
+        return ALL_TIME
+
+    @property
+    def key(self) -> str:
+        """Compact identifier for widget and chart keys."""
+        if self.kind == "month":
+            return f"month_{self.month}"
+        if self.kind == "range":
+            return f"range_{self.start:%Y%m%d}_{self.end:%Y%m%d}"
+        if self.kind == "rolling":
+            return f"rolling_{self.weeks}"
+        return "all"
+
+    def bounds(self, today: date | None = None) -> tuple[date, date] | None:
+        """Inclusive (start, end) dates, or None for all time."""
+        if self.kind == "month":
+            year, month_num = map(int, self.month.split("-"))
+            return date(year, month_num, 1), date(year, month_num, monthrange(year, month_num)[1])
+        if self.kind == "range":
+            return self.start, self.end
+        if self.kind == "rolling":
+            today = today or date.today()
+            return today - timedelta(days=self.weeks * 7 - 1), today
+        return None
+
+    def period_weeks(self, today: date | None = None) -> float | None:
+        """
+        Length of the period in weeks (at least 1), or None for all time.
+
+        A period that contains today is counted only up to today.
+        """
+        bounds = self.bounds(today)
+        if bounds is None:
+            return None
+        if self.kind == "rolling":
+            return float(self.weeks)
+
+        start, end = bounds
+        today = today or date.today()
+        if start <= today < end:
+            end = today
+        days = max((end - start).days + 1, 1)
+        return max(days / 7, 1.0)
@@ -6,33 +6,37 @@ intensity, and progress for each exercise across all sessions.
 """
 
 from collections import defaultdict
-from datetime import date
-from statistics import mean
 from typing import Any, Dict, List
 
+import numpy as np
+import pandas as pd
+
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.utils import (
-    is_duration_set,
-    set_duration_seconds,
-    set_effective_sets,
-    set_estimated_1rm,
-    set_reps,
-    set_volume,
-    set_weight,
-)
-
-
-def compute_exercise_metrics(input: MetricsInput) -> Dict[str, Any]:
+from metrics.utils import exact_mean, ordered_sum
+
+
+def compute_exercise_metrics(
+    input: MetricsInput,
+    index: MetricsIndex | None = None,
+) -> Dict[str, Any]:
     """
     Compute exercise-level training metrics.
 
     Metrics are aggregated per exercise_id and include volume,
     intensity, estimated strength, progression, and consistency.
 
+    All per-set values and per-exercise aggregates are computed with
+    grouped NumPy/pandas operations over the columnar set data; Python
+    loops only run once per exercise and per exercise-session. Averages are
+    exact (see ``metrics.utils.exact_mean``), so they match ``statistics.mean``.
+
     Parameters
     ----------
     input : MetricsInput
         Normalized training data loaded from the database.
+    index : MetricsIndex, optional
+        Shared join index; built from ``input`` when omitted.
 
     Returns
     -------
@@ -42,16 +46,9 @@ def compute_exercise_metrics(input: MetricsInput) -> Dict[str, Any]:
         - "global": dict[str, Any]
     """
 
-    workout_to_exercise = {
-        we.workout_exercise_id: we.exercise_id
-        for we in input.workout_exercises
-    }
-    session_id_to_date = {s.session_id: s.session_date for s in input.sessions}
-    workout_to_date = {
-        we.workout_exercise_id: session_id_to_date.get(we.session_id)
-        for we in input.workout_exercises
-    }
-    sets_by_exercise: Dict[int, List] = defaultdict(list)
+    index = index or MetricsIndex(input)
+    frame = index.set_frame
+
     exercise_id_to_name = {e.exercise_id: e.name for e in input.exercises}
     exercise_id_to_bodypart = {e.exercise_id: e.body_part for e in input.exercises}
     targets_by_exercise: Dict[int, List[dict[str, Any]]] = defaultdict(list)
@@ -65,140 +62,56 @@ def compute_exercise_metrics(input: MetricsInput) -> Dict[str, Any]:
             }
         )
 
-    for workout_set in input.sets:
-        exercise_id = workout_to_exercise.get(workout_set.workout_exercise_id)
-        if exercise_id is None:
-            continue
-
-        sets_by_exercise[exercise_id].append(workout_set)
-
     per_exercise: Dict[int, Dict[str, Any]] = {}
 
-    for exercise_id, sets in sets_by_exercise.items():
-        total_sets = len(sets)
-        strength_sets = [s for s in sets if not is_duration_set(s)]
-        duration_sets = [s for s in sets if is_duration_set(s)]
-        total_reps = sum(set_reps(s) for s in strength_sets)
-        total_volume = sum(set_volume(s) for s in sets)
-        total_duration_seconds = sum(set_duration_seconds(s) for s in duration_sets)
-        best_duration_seconds = (
-            max(set_duration_seconds(s) for s in duration_sets)
-            if duration_sets
-            else None
-        )
-        effective_sets = sum(set_effective_sets(s) for s in sets)
-
-        weights = [set_weight(s) for s in strength_sets]
-        avg_weight = mean(weights) if weights else None
-        max_weight = max(weights) if weights else None
-
-        rirs = [s.rir for s in sets if s.rir is not None]
-        avg_rir = mean(rirs) if rirs else None
-        sets_to_failure = sum(1 for s in sets if s.rir == 0)
-
-        one_rms = [
-            estimated_1rm
-            for s in strength_sets
-            if (estimated_1rm := set_estimated_1rm(s)) is not None
-        ]
-
-        estimated_1rm_max = max(one_rms) if one_rms else None
-        estimated_1rm_avg = mean(one_rms) if one_rms else None
-
-        sets_sorted = sorted(
-            sets,
-            key=lambda s: workout_to_date.get(s.workout_exercise_id) or date.max,
-        )
-
-        first_volume = set_volume(sets_sorted[0])
-        last_volume = set_volume(sets_sorted[-1])
-        volume_trend = last_volume - first_volume
-
-        strength_sets_sorted = [s for s in sets_sorted if not is_duration_set(s)]
-        if strength_sets_sorted:
-            first_1rm = set_estimated_1rm(strength_sets_sorted[0])
-            last_1rm = set_estimated_1rm(strength_sets_sorted[-1])
-            strength_trend_1rm = (
-                last_1rm - first_1rm
-                if first_1rm is not None and last_1rm is not None
-                else None
+    if not frame.empty:
+        totals = _exercise_totals(frame)
+        trends = _exercise_trends(frame)
+        series = _per_session_series(frame, index.set_join.date_values)
+        set_positions = frame.groupby("exercise_id", sort=False).indices
+        volumes = frame["volume"].to_numpy()
+        effective_sets = frame["effective_sets"].to_numpy()
+        weights = frame["weight"].to_numpy()
+        rirs = frame["rir"].to_numpy()
+        one_rms = frame["estimated_1rm"].to_numpy()
+
+        for exercise_id, row in totals.iterrows():
+            exercise_id = int(exercise_id)
+            total_sets = int(row["total_sets"])
+            sessions_count = int(row["sessions_count"])
+            per_session_1rm, per_session_volume, per_session_duration = series.get(
+                exercise_id, ([], [], [])
             )
-        else:
-            strength_trend_1rm = None
-
-        duration_sets_sorted = [s for s in sets_sorted if is_duration_set(s)]
-        if duration_sets_sorted:
-            duration_trend_seconds = (
-                set_duration_seconds(duration_sets_sorted[-1])
-                - set_duration_seconds(duration_sets_sorted[0])
-            )
-        else:
-            duration_trend_seconds = None
-
-        sessions_count = len(
-            {
-                workout_to_date.get(s.workout_exercise_id)
-                for s in sets
-                if workout_to_date.get(s.workout_exercise_id) is not None
+            positions = set_positions[exercise_id]
+            body_part = exercise_id_to_bodypart.get(exercise_id)
+            muscle_targets = targets_by_exercise.get(exercise_id) or _fallback_muscle_targets(body_part)
+
+            per_exercise[exercise_id] = {
+                "exercise_name": exercise_id_to_name.get(exercise_id, f"Exercise {exercise_id}"),
+                "body_part": body_part,
+                "muscle_targets": muscle_targets,
+                "muscle_target_summary": _muscle_target_summary(muscle_targets),
+                "total_sets": total_sets,
+                "effective_sets": ordered_sum(effective_sets[positions]),
+                "total_reps": int(row["total_reps"]),
+                "total_volume": ordered_sum(volumes[positions]),
+                "total_duration_seconds": int(row["total_duration_seconds"]),
+                "best_duration_seconds": _optional_int(row["best_duration_seconds"]),
+                "avg_weight": exact_mean(weights[positions]),
+                "max_weight": _optional_float(row["max_weight"]),
+                "estimated_1rm_max": _optional_float(row["estimated_1rm_max"]),
+                "estimated_1rm_avg": exact_mean(one_rms[positions]),
+                "avg_rir": exact_mean(rirs[positions], integer=True),
+                "sets_to_failure": int(row["sets_to_failure"]),
+                "volume_trend": float(trends["volume_trend"].get(exercise_id)),
+                "strength_trend_1rm": _optional_float(trends["strength_trend_1rm"].get(exercise_id)),
+                "duration_trend_seconds": _optional_int(trends["duration_trend_seconds"].get(exercise_id)),
+                "sessions_count": sessions_count,
+                "avg_sets_per_session": total_sets / sessions_count if sessions_count else None,
+                "per_session_1rm": per_session_1rm,
+                "per_session_volume": per_session_volume,
+                "per_session_duration": per_session_duration,
             }
-        )
-        avg_sets_per_session = total_sets / sessions_count if sessions_count else None
-
-        per_session_map = defaultdict(list)
-        per_session_volume = defaultdict(int)
-        per_session_duration = defaultdict(int)
-        for s in sets:
-            date = workout_to_date.get(s.workout_exercise_id)
-            if date is None:
-                continue
-            estimated_1rm = set_estimated_1rm(s)
-            if estimated_1rm is not None:
-                per_session_map[date].append(estimated_1rm)
-            per_session_volume[date] += set_volume(s)
-            per_session_duration[date] += set_duration_seconds(s)
-
-        per_session_1rm = [
-            {"date": d, "estimated_1rm": round(mean(vals), 2)}
-            for d, vals in sorted(per_session_map.items())
-        ]
-
-        per_session_volume_series = [
-            {"date": d, "volume": v} for d, v in sorted(per_session_volume.items())
-        ]
-        per_session_duration_series = [
-            {"date": d, "duration_seconds": v}
-            for d, v in sorted(per_session_duration.items())
-            if v
-        ]
-        body_part = exercise_id_to_bodypart.get(exercise_id)
-        muscle_targets = targets_by_exercise.get(exercise_id) or _fallback_muscle_targets(body_part)
-
-        per_exercise[exercise_id] = {
-            "exercise_name": exercise_id_to_name.get(exercise_id, f"Exercise {exercise_id}"),
-            "body_part": body_part,
-            "muscle_targets": muscle_targets,
-            "muscle_target_summary": _muscle_target_summary(muscle_targets),
-            "total_sets": total_sets,
-            "effective_sets": effective_sets,
-            "total_reps": total_reps,
-            "total_volume": total_volume,
-            "total_duration_seconds": total_duration_seconds,
-            "best_duration_seconds": best_duration_seconds,
-            "avg_weight": avg_weight,
-            "max_weight": max_weight,
-            "estimated_1rm_max": estimated_1rm_max,
-            "estimated_1rm_avg": estimated_1rm_avg,
-            "avg_rir": avg_rir,
-            "sets_to_failure": sets_to_failure,
-            "volume_trend": volume_trend,
-            "strength_trend_1rm": strength_trend_1rm,
-            "duration_trend_seconds": duration_trend_seconds,
-            "sessions_count": sessions_count,
-            "avg_sets_per_session": avg_sets_per_session,
-            "per_session_1rm": per_session_1rm,
-            "per_session_volume": per_session_volume_series,
-            "per_session_duration": per_session_duration_series,
-        }
 
     global_metrics = {}
 
@@ -229,6 +142,136 @@ def compute_exercise_metrics(input: MetricsInput) -> Dict[str, Any]:
     }
 
 
+def compute_exercise_series(
+    input: MetricsInput,
+    index: MetricsIndex | None = None,
+) -> Dict[str, Any]:
+    """
+    Build per-exercise, date-ordered series of per-set values.
+
+    Only sets with a known exercise and session date are included. Sets are
+    ordered by session date, keeping logged order within a date. This is an
+    intermediate result shared by metrics that analyse progression
+    (see ``metrics.registry``).
+
+    Returns
+    -------
+    dict
+        ``{"per_exercise": {exercise_id: {"estimated_1rm": list[float],
+        "duration_seconds": list[int], "exposure_count": int}}}``
+        where ``estimated_1rm`` covers strength sets and ``duration_seconds``
+        covers timed sets.
+    """
+    index = index or MetricsIndex(input)
+    frame = index.set_frame
+    frame = frame[(frame["rank"] >= 0) & (frame["exercise_id"] != 0)]
+    ordered = frame.iloc[np.argsort(frame["rank"].to_numpy(), kind="stable")]
+
+    strength = ordered[~ordered["is_duration"]].groupby("exercise_id", sort=False)["estimated_1rm"]
+    timed = ordered[ordered["is_duration"]].groupby("exercise_id", sort=False)["duration"]
+    one_rms = {int(k): v.tolist() for k, v in strength}
+    durations = {int(k): v.tolist() for k, v in timed}
+    exposure_counts = ordered.groupby("exercise_id", sort=False).size()
+
+    return {
+        "per_exercise": {
+            int(exercise_id): {
+                "estimated_1rm": one_rms.get(int(exercise_id), []),
+                "duration_seconds": durations.get(int(exercise_id), []),
+                "exposure_count": int(exposure_counts[exercise_id]),
+            }
+            for exercise_id in pd.unique(frame["exercise_id"])
+        }
+    }
+
+
+def _exercise_totals(frame: pd.DataFrame) -> pd.DataFrame:
+    """Per-exercise totals, in order of each exercise's first logged set."""
+    totals = frame.groupby("exercise_id", sort=False).agg(
+        total_sets=("volume", "size"),
+        total_reps=("reps", "sum"),
+        total_duration_seconds=("timed_duration", "sum"),
+        best_duration_seconds=("best_duration", "max"),
+        max_weight=("weight", "max"),
+        sets_to_failure=("failure", "sum"),
+        estimated_1rm_max=("estimated_1rm", "max"),
+    )
+    sessions_count = (
+        frame[frame["rank"] >= 0].groupby("exercise_id")["rank"].nunique()
+    )
+    totals["sessions_count"] = sessions_count.reindex(totals.index, fill_value=0)
+    return totals
+
+
+def _exercise_trends(frame: pd.DataFrame) -> dict[str, pd.Series]:
+    """Last-minus-first changes with sets ordered by session date.
+
+    Sets without a date sort last and ties keep their logged order.
+    """
+    sort_key = np.where(frame["rank"] >= 0, frame["rank"], np.iinfo(np.int64).max)
+    ordered = frame.iloc[np.argsort(sort_key, kind="stable")]
+
+    def _last_minus_first(rows: pd.DataFrame, column: str) -> pd.Series:
+        grouped = rows.groupby("exercise_id", sort=False)[column]
+        return grouped.last() - grouped.first()
+
+    return {
+        "volume_trend": _last_minus_first(ordered, "volume"),
+        "strength_trend_1rm": _last_minus_first(ordered[~ordered["is_duration"]], "estimated_1rm"),
+        "duration_trend_seconds": _last_minus_first(ordered[ordered["is_duration"]], "duration"),
+    }
+
+
+def _per_session_series(
+    frame: pd.DataFrame,
+    date_values: list,
+) -> dict[int, tuple[list[dict], list[dict], list[dict]]]:
+    """Per-exercise 1RM, volume and duration series, one point per session date."""
+    dated = frame[frame["rank"] >= 0]
+    grouped = dated.groupby(["exercise_id", "rank"], sort=True)
+    per_session = grouped.agg(
+        estimated_1rm_count=("estimated_1rm", "count"),
+        duration=("duration", "sum"),
+    )
+    one_rms = dated["estimated_1rm"].to_numpy()
+    volumes = dated["volume"].to_numpy()
+    positions = grouped.indices
+
+    series: dict[int, tuple[list[dict], list[dict], list[dict]]] = {}
+    keys = per_session.index
+    for exercise_id, rank, estimated_1rm_count, duration in zip(
+        keys.get_level_values(0),
+        keys.get_level_values(1),
+        per_session["estimated_1rm_count"].to_numpy(),
+        per_session["duration"].to_numpy(),
+    ):
+        one_rm_points, volume_points, duration_points = series.setdefault(
+            int(exercise_id), ([], [], [])
+        )
+        session_date = date_values[rank]
+        session_positions = positions[(exercise_id, rank)]
+        if estimated_1rm_count:
+            estimated_1rm = exact_mean(one_rms[session_positions])
+            one_rm_points.append({"date": session_date, "estimated_1rm": round(estimated_1rm, 2)})
+        volume_points.append({"date": session_date, "volume": ordered_sum(volumes[session_positions])})
+        if duration:
+            duration_points.append({"date": session_date, "duration_seconds": int(duration)})
+
+    return series
+
+
+def _optional_float(value: Any) -> float | None:
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
+
+
+def _optional_int(value: Any) -> int | None:
+    if value is None or pd.isna(value):
+        return None
+    return int(value)
+
+
 def _fallback_muscle_targets(body_part: str | None) -> list[dict[str, Any]]:
     if not body_part:
         return []
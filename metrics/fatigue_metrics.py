@@ -1,11 +1,13 @@
-from collections import defaultdict
 from statistics import mean
 
+import numpy as np
+
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.utils import set_duration_seconds, set_intensity, set_volume
+from metrics.utils import exact_mean, ordered_sum
 
 
-def compute_fatigue_metrics(input: MetricsInput) -> dict:
+def compute_fatigue_metrics(input: MetricsInput, index: MetricsIndex | None = None) -> dict:
     """
     Compute fatigue-related metrics based on training data.
 
@@ -16,46 +18,35 @@ def compute_fatigue_metrics(input: MetricsInput) -> dict:
     - Intensity load
 
     Returns per-session fatigue indicators and global fatigue trends.
+    ``index`` is the shared join index; it is built from ``input`` when omitted.
     """
 
-    if not input.sessions or not input.sets:
+    index = index or MetricsIndex(input)
+    columnar = index.columnar
+    if not len(columnar.session_columns) or not len(columnar.set_columns):
         return {}
 
-    we_to_session = {
-        we.workout_exercise_id: we.session_id
-        for we in input.workout_exercises
-    }
-
-    sets_by_session = defaultdict(list)
-    for s in input.sets:
-        session_id = we_to_session.get(s.workout_exercise_id)
-        if session_id is not None:
-            sets_by_session[session_id].append(s)
+    sets_by_session = index.sets_by_session
+    arrays = index.set_arrays
 
     per_session = {}
 
     fatigue_scores = []
     high_fatigue_flags = []
 
-    for session in input.sessions:
-        sets = sets_by_session.get(session.session_id, [])
-        if not sets:
+    for session_pos, session_id in enumerate(columnar.session_columns.session_id.tolist()):
+        positions = sets_by_session.get(session_pos)
+        if positions is None:
             continue
 
-        total_sets = len(sets)
-        rir_values = [s.rir for s in sets if s.rir is not None]
-        avg_rir = mean(rir_values) if rir_values else None
-        sets_to_failure = sum(1 for s in sets if s.rir == 0)
+        total_sets = len(positions)
+        rir_values = arrays.rir[positions]
+        avg_rir = exact_mean(rir_values, integer=True)
+        sets_to_failure = int((rir_values == 0).sum())
         sets_to_failure_ratio = sets_to_failure / total_sets
-        volume_load = sum(set_volume(s) for s in sets)
-        duration_load = sum(set_duration_seconds(s) for s in sets)
-
-        intensities = [
-            intensity
-            for s in sets
-            if (intensity := set_intensity(s)) is not None
-        ]
-        intensity_load = mean(intensities) if intensities else None
+        volume_load = ordered_sum(arrays.volume[positions])
+        duration_load = int(arrays.duration_seconds[positions].sum())
+        intensity_load = exact_mean(arrays.intensity[positions])
 
         fatigue_score = 0
 
@@ -69,7 +60,7 @@ def compute_fatigue_metrics(input: MetricsInput) -> dict:
         fatigue_scores.append(fatigue_score)
         high_fatigue_flags.append(fatigue_score >= 0.7)
 
-        per_session[session.session_id] = {
+        per_session[session_id] = {
             "avg_rir": round(avg_rir, 2) if avg_rir is not None else None,
             "sets_to_failure_ratio": round(sets_to_failure_ratio, 2),
             "volume_load": round(volume_load, 2),
@@ -1,10 +1,15 @@
 from collections import defaultdict
 from statistics import mean
+from typing import Any, Iterable, Sequence
 
+import numpy as np
+
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
+from models.exercise import Exercise
 
 
-def compute_frequency_metrics(input: MetricsInput) -> dict:
+def compute_frequency_metrics(input: MetricsInput, index: MetricsIndex | None = None) -> dict:
     """
     Compute training frequency metrics.
 
@@ -13,22 +18,45 @@ def compute_frequency_metrics(input: MetricsInput) -> dict:
     - Per-exercise session frequency
     - Per-muscle group session frequency
 
-    Frequency is calculated using ISO calendar weeks.
+    Frequency is calculated using ISO calendar weeks. ``index`` is the shared
+    join index; it is built from ``input`` when omitted.
     """
 
-    if not input.sessions:
+    index = index or MetricsIndex(input)
+    if not len(index.columnar.session_columns):
         return {}
 
-    sessions = sorted(input.sessions, key=lambda s: s.session_date)
-
-    workout_exercises_by_session = defaultdict(list)
-    for we in input.workout_exercises:
-        workout_exercises_by_session[we.session_id].append(we)
+    dates = index.session_dates
+    by_date = index.sessions_by_date
+    session_dates = [dates[pos] for pos in by_date.tolist()]
+
+    # Workout exercises in session-date order, then in their own order.
+    we_sessions = index.workout_exercise_session_positions
+    date_order = np.empty(len(by_date), dtype=np.int64)
+    date_order[by_date] = np.arange(len(by_date))
+    known = np.flatnonzero(we_sessions >= 0)
+    ordered = known[np.argsort(date_order[we_sessions[known]], kind="stable")]
+    exercise_dates = zip(
+        index.columnar.workout_exercise_columns.exercise_id[ordered].tolist(),
+        [dates[pos] for pos in we_sessions[ordered].tolist()],
+    )
+    return summarize_frequency(session_dates, exercise_dates, input.exercises)
+
+
+def summarize_frequency(
+    session_dates: Sequence[Any],
+    exercise_dates: Iterable[tuple[int, Any]],
+    exercises: Iterable[Exercise],
+) -> dict:
+    """
+    Frequency metrics from session dates and (exercise_id, session date) pairs.
 
-    exercise_id_to_name = {e.exercise_id: e.name for e in input.exercises}
-    exercise_id_to_bodypart = {e.exercise_id: e.body_part for e in input.exercises if e.body_part}
+    ``session_dates`` covers every session of the period in ascending order;
+    ``exercise_dates`` holds one pair per workout exercise, in session order.
+    """
+    exercise_id_to_name = {e.exercise_id: e.name for e in exercises}
+    exercise_id_to_bodypart = {e.exercise_id: e.body_part for e in exercises if e.body_part}
 
-    session_dates = [s.session_date for s in sessions]
     iso_weeks = set(d.isocalendar()[:2] for d in session_dates)
     sessions_per_week = len(session_dates) / len(iso_weeks) if iso_weeks else None
     day_gaps = [(session_dates[i] - session_dates[i - 1]).days for i in range(1, len(session_dates))]
@@ -42,10 +70,13 @@ def compute_frequency_metrics(input: MetricsInput) -> dict:
     }
 
     exercise_sessions = defaultdict(set)
+    muscle_sessions = defaultdict(set)
 
-    for session in sessions:
-        for we in workout_exercises_by_session.get(session.session_id, []):
-            exercise_sessions[we.exercise_id].add(session.session_date)
+    for exercise_id, session_date in exercise_dates:
+        exercise_sessions[exercise_id].add(session_date)
+        bodypart = exercise_id_to_bodypart.get(exercise_id)
+        if bodypart:
+            muscle_sessions[bodypart].add(session_date)
 
     per_exercise = {}
 
@@ -65,14 +96,6 @@ def compute_frequency_metrics(input: MetricsInput) -> dict:
             "total_sessions": len(dates),
         }
 
-    muscle_sessions = defaultdict(set)
-
-    for session in sessions:
-        for we in workout_exercises_by_session.get(session.session_id, []):
-            bodypart = exercise_id_to_bodypart.get(we.exercise_id)
-            if bodypart:
-                muscle_sessions[bodypart].add(session.session_date)
-
     per_muscle = {}
 
     for muscle, dates in muscle_sessions.items():
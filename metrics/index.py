@@ -0,0 +1,218 @@
+"""
+Shared join index for metric computation.
+
+Every metric group needs the same joins between sets, workout exercises and
+sessions. ``MetricsIndex`` builds them once per ``MetricsInput`` and hands the
+same maps and groupings to every registered metric. Each piece is computed
+lazily on first access, so a caller that only needs one join does not pay for
+the others.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from metrics.columnar import ColumnarMetricsInput, to_columnar
+from metrics.input import MetricsInput
+from metrics.utils import SetArrays, compute_set_arrays
+
+
+@dataclass(frozen=True, eq=False)
+class SetJoin:
+    """Columnar set -> exercise/date join used by vectorized metrics.
+
+    ``has_exercise`` masks sets whose workout exercise is known;
+    ``exercise_ids`` and ``date_ranks`` hold one entry per masked set.
+    ``date_ranks`` index into ``date_values`` (sorted session dates) and are
+    -1 when the session or its date is unknown.
+    """
+
+    has_exercise: np.ndarray
+    exercise_ids: np.ndarray
+    date_ranks: np.ndarray
+    date_values: list[Any]
+
+
+class MetricsIndex:
+    """Precomputed joins and groupings for one ``MetricsInput``.
+
+    Everything is derived from the column arrays of ``columnar``: groupings
+    hold positions into ``set_columns`` and ``session_columns`` rather than
+    domain objects, so a columnar input is never materialized as lists.
+    """
+
+    def __init__(self, metrics_input: MetricsInput | ColumnarMetricsInput) -> None:
+        self.input = metrics_input
+
+    @cached_property
+    def columnar(self) -> ColumnarMetricsInput:
+        return to_columnar(self.input)
+
+    @cached_property
+    def set_arrays(self) -> SetArrays:
+        return compute_set_arrays(self.columnar.set_columns)
+
+    @cached_property
+    def session_dates(self) -> list[Any]:
+        """Date of every session, in ``session_columns`` order.
+
+        List-based input keeps its original date objects so metric results
+        report the dates of the input exactly.
+        """
+        if isinstance(self.input, ColumnarMetricsInput):
+            return self.input.session_columns.session_date.astype(object).tolist()
+        return [s.session_date for s in self.input.sessions]
+
+    @cached_property
+    def sessions_by_date(self) -> np.ndarray:
+        """Session positions in ascending date order (stable for equal dates, undated first)."""
+        ranks, _ = self._session_date_ranks
+        return np.argsort(ranks, kind="stable")
+
+    @cached_property
+    def workout_exercise_session_positions(self) -> np.ndarray:
+        """Position of each workout exercise's session (-1 if unknown)."""
+        columnar = self.columnar
+        return _positions(
+            columnar.workout_exercise_columns.session_id,
+            columnar.session_columns.session_id,
+        )
+
+    @cached_property
+    def set_workout_exercise_positions(self) -> np.ndarray:
+        """Position of each set's workout exercise (-1 if unknown)."""
+        columnar = self.columnar
+        return _positions(
+            columnar.set_columns.workout_exercise_id,
+            columnar.workout_exercise_columns.workout_exercise_id,
+        )
+
+    @cached_property
+    def set_session_positions(self) -> np.ndarray:
+        """Position of each set's session (-1 if its workout exercise or session is unknown)."""
+        we_pos = self.set_workout_exercise_positions
+        session_pos = np.full(len(we_pos), -1, dtype=np.int64)
+        known = we_pos >= 0
+        session_pos[known] = self.workout_exercise_session_positions[we_pos[known]]
+        return session_pos
+
+    @cached_property
+    def sets_by_session(self) -> dict[int, np.ndarray]:
+        """Set positions grouped by session position, in logged order.
+
+        Sessions appear in order of their first logged set; sets without a
+        known session are dropped.
+        """
+        session_pos = self.set_session_positions
+        return _group_positions(session_pos, session_pos >= 0)
+
+    @cached_property
+    def sets_by_exercise(self) -> dict[int, np.ndarray]:
+        """Set positions grouped by exercise_id, in logged order; unknown exercises are dropped."""
+        we_pos = self.set_workout_exercise_positions
+        exercise_ids = self.columnar.workout_exercise_columns.exercise_id[np.maximum(we_pos, 0)]
+        return _group_positions(exercise_ids, we_pos >= 0)
+
+    @cached_property
+    def set_join(self) -> SetJoin:
+        """Resolve every set to its exercise_id and session-date rank with array lookups."""
+        workout_exercises = self.columnar.workout_exercise_columns
+        session_ranks, date_values = self._session_date_ranks
+
+        we_pos = self.set_workout_exercise_positions
+        session_pos = self.workout_exercise_session_positions
+        we_ranks = np.full(len(session_pos), -1, dtype=np.int64)
+        has_session = session_pos >= 0
+        we_ranks[has_session] = session_ranks[session_pos[has_session]]
+
+        has_exercise = we_pos >= 0
+        known_pos = we_pos[has_exercise]
+        return SetJoin(
+            has_exercise=has_exercise,
+            exercise_ids=workout_exercises.exercise_id[known_pos],
+            date_ranks=we_ranks[known_pos],
+            date_values=date_values,
+        )
+
+    @cached_property
+    def set_frame(self) -> pd.DataFrame:
+        """One row per set with a known exercise, holding every derived set value.
+
+        ``rank`` is the session-date rank from ``set_join`` (-1 when unknown).
+        """
+        set_join = self.set_join
+        arrays = self.set_arrays
+        has_exercise = set_join.has_exercise
+        is_duration = arrays.is_duration[has_exercise]
+        duration = arrays.duration_seconds[has_exercise]
+
+        return pd.DataFrame(
+            {
+                "exercise_id": set_join.exercise_ids,
+                "rank": set_join.date_ranks,
+                "is_duration": is_duration,
+                "reps": np.where(is_duration, 0, arrays.reps[has_exercise]),
+                "weight": np.where(is_duration, np.nan, arrays.weight[has_exercise]),
+                "volume": arrays.volume[has_exercise],
+                "duration": duration,
+                "timed_duration": np.where(is_duration, duration, 0),
+                "best_duration": np.where(is_duration, duration, np.nan),
+                "effective_sets": arrays.effective_sets[has_exercise],
+                "rir": arrays.rir[has_exercise],
+                "failure": arrays.rir[has_exercise] == 0,
+                "estimated_1rm": arrays.estimated_1rm[has_exercise],
+            }
+        )
+
+    @cached_property
+    def _session_date_ranks(self) -> tuple[np.ndarray, list[Any]]:
+        """Rank sessions by date (-1 without a date) and return the sorted dates.
+
+        List-based input keeps its original date objects so grouping, ordering
+        and the dates reported in metric series match the input exactly.
+        """
+        if isinstance(self.input, ColumnarMetricsInput):
+            dates = self.input.session_columns.session_date
+            valid = ~np.isnat(dates)
+            unique, inverse = np.unique(dates[valid], return_inverse=True)
+            ranks = np.full(len(dates), -1, dtype=np.int64)
+            ranks[valid] = inverse
+            return ranks, list(unique.astype(object))
+
+        session_dates = self.session_dates
+        date_values = sorted({d for d in session_dates if d is not None})
+        rank_by_date = {d: rank for rank, d in enumerate(date_values)}
+        ranks = np.array(
+            [rank_by_date[d] if d is not None else -1 for d in session_dates],
+            dtype=np.int64,
+        )
+        return ranks, date_values
+
+
+def _group_positions(keys: np.ndarray, valid: np.ndarray) -> dict[int, np.ndarray]:
+    """Positions of the ``valid`` entries of ``keys`` grouped by key.
+
+    Keys appear in order of their first position; positions stay ascending.
+    """
+    positions = np.flatnonzero(valid)
+    if not len(positions):
+        return {}
+    codes, uniques = pd.factorize(keys[positions])
+    order = np.argsort(codes, kind="stable")
+    bounds = np.cumsum(np.bincount(codes))[:-1]
+    return dict(zip(uniques.tolist(), np.split(positions[order], bounds)))
+
+
+def _positions(keys: np.ndarray, lookup_keys: np.ndarray) -> np.ndarray:
+    """Position of each key in ``lookup_keys`` (-1 if absent, last duplicate wins)."""
+    if not len(lookup_keys):
+        return np.full(len(keys), -1, dtype=np.int64)
+    keep = ~pd.Series(lookup_keys).duplicated(keep="last").to_numpy()
+    positions = np.flatnonzero(keep)
+    found = pd.Index(lookup_keys[keep]).get_indexer(keys)
+    return np.where(found >= 0, positions[found], -1)
@@ -1,9 +1,12 @@
 from metrics.input import MetricsInput
 
-from mapper import map_body_composition, map_body_measurement
-from models.workout_session import WorkoutSession
-from models.workout_exercise import WorkoutExercise
-from models.workout_set import WorkoutSet
+from mapper import (
+    map_body_compositions,
+    map_body_measurements,
+    map_workout_exercises,
+    map_workout_sessions,
+    map_workout_sets,
+)
 from models.exercise import Exercise
 
 
@@ -22,36 +25,11 @@ class MetricsInputBuilder:
         body_composition_df,
     ) -> MetricsInput:
 
-        sessions = [
-            WorkoutSession(
-                session_id=row.session_id,
-                session_date=row.session_date,
-                start_time=getattr(row, "start_time", None),
-                end_time=getattr(row, "end_time", None),
-            )
-            for row in sessions_df.itertuples()
-        ]
+        sessions = map_workout_sessions(sessions_df)
 
-        workout_exercises = [
-            WorkoutExercise(
-                workout_exercise_id=row.workout_exercise_id,
-                session_id=row.session_id,
-                exercise_id=row.exercise_id,
-            )
-            for row in sets_df.drop_duplicates("workout_exercise_id").itertuples()
-        ]
+        workout_exercises = map_workout_exercises(sets_df.drop_duplicates("workout_exercise_id"))
 
-        sets = [
-            WorkoutSet(
-                workout_exercise_id=row.workout_exercise_id,
-                set_number=row.set_number,
-                repetitions=row.repetitions,
-                weight=row.weight,
-                rir=getattr(row, "rir", None),
-                duration_seconds=getattr(row, "duration_seconds", None),
-            )
-            for row in sets_df.itertuples()
-        ]
+        sets = map_workout_sets(sets_df)
 
         exercises = [
             Exercise(
@@ -63,16 +41,8 @@ class MetricsInputBuilder:
             for row in exercises_df.itertuples()
         ]
 
-        body_measurements = [
-            measurement
-            for row in body_measurements_df.to_dict("records")
-            for measurement in map_body_measurement(row)
-        ]
-
-        body_composition = [
-            map_body_composition(row)
-            for row in body_composition_df.to_dict("records")
-        ]
+        body_measurements = map_body_measurements(body_measurements_df)
+        body_composition = map_body_compositions(body_composition_df)
 
         return MetricsInput(
             sessions=sessions,
@@ -1,27 +1,157 @@
 import logging
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from threading import Lock, RLock
 from typing import Dict
 
+from instrumentation import PerformanceReport, input_cardinalities
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.registry import METRIC_REGISTRY
+from metrics.parallel import ParallelMetricRunner
+from metrics.registry import METRIC_REGISTRY, public_metrics
+from metrics.scheduler import MetricScheduler
 
 logger = logging.getLogger(__name__)
 
+_parallel_runners: Dict[int, ParallelMetricRunner] = {}
+_runners_lock = Lock()
 
-def compute_all_metrics(metrics_input: MetricsInput) -> Dict[str, dict]:
+
+def _parallel_runner(workers: int) -> ParallelMetricRunner:
+    """Process-wide runner per pool size, so worker processes are reused across calls."""
+    with _runners_lock:
+        runner = _parallel_runners.get(workers)
+        if runner is None or runner.scheduler.registry is not METRIC_REGISTRY:
+            runner = ParallelMetricRunner(max_workers=workers, registry=METRIC_REGISTRY)
+            _parallel_runners[workers] = runner
+        return runner
+
+
+class LazyMetrics(Mapping):
     """
-    Compute all registered metrics using a shared MetricsInput.
+    Read-only mapping of metric group name -> result, computed on demand.
+
+    A group is computed the first time it is looked up and memoized for the
+    lifetime of this object, so a view only pays for the groups it reads.
+    All groups share one ``MetricsIndex``, and dependencies declared in the
+    registry are computed once and reused by every dependent group. Failure
+    in one metric only affects the groups depending on it; the failed group
+    maps to ``{"error": ...}``.
+
+    Every computed group is recorded as a stage in ``report`` (wall time,
+    CPU time and input cardinalities).
 
-    Each metric group is executed independently. Failure in one metric
-    does not affect others.
+    ``sources`` maps group names to zero-argument functions that produce the
+    group's result some other way (e.g. from SQL rollups, see
+    ``metrics.rollups``). They replace the registry computation for those
+    groups; if a source fails, the group is computed from the input instead.
     """
 
-    results: Dict[str, dict] = {}
+    def __init__(
+        self,
+        metrics_input: MetricsInput,
+        sources: Mapping[str, Callable[[], dict]] | None = None,
+    ) -> None:
+        self.metrics_input = metrics_input
+        self.sources = dict(sources or {})
+        self.index = MetricsIndex(metrics_input)
+        self.report = PerformanceReport("metrics", input_cardinalities(metrics_input))
+        self._results: Dict[str, dict] = {}
+        self._lock = RLock()
+
+    def __getitem__(self, name: str) -> dict:
+        node = METRIC_REGISTRY.get(name)
+        if node is None or not node.public:
+            raise KeyError(name)
+        with self._lock:
+            if name not in self._results and name in self.sources:
+                self._run_source(name)
+            if name not in self._results:
+                self._scheduler().run(
+                    self.metrics_input, [name], self.index, self._results, self.report
+                )
+            return self._results[name]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(public_metrics(METRIC_REGISTRY))
+
+    def __len__(self) -> int:
+        return len(public_metrics(METRIC_REGISTRY))
+
+    @property
+    def computed(self) -> tuple[str, ...]:
+        """Names of the metric groups computed so far, dependencies included."""
+        return tuple(self._results)
+
+    def prefetch(self, names: Iterable[str], workers: int | None = None) -> "LazyMetrics":
+        """
+        Compute ``names`` now; returns ``self`` for chaining.
 
-    for name, fn in METRIC_REGISTRY.items():
+        With ``workers`` > 1, independent groups are computed in a process
+        pool of that size (see ``metrics.parallel``).
+        """
+        names = list(names)
+        if workers is None or workers <= 1:
+            for name in names:
+                self[name]
+            return self
+
+        for name in names:
+            node = METRIC_REGISTRY.get(name)
+            if node is None or not node.public:
+                raise KeyError(name)
+        with self._lock:
+            for name in names:
+                if name in self.sources and name not in self._results:
+                    self._run_source(name)
+            names = [name for name in names if name not in self._results]
+            _parallel_runner(workers).run(
+                self.metrics_input, names, self.index, self._results, self.report
+            )
+        return self
+
+    def _run_source(self, name: str) -> None:
         try:
-            results[name] = fn(metrics_input) or {}
-        except Exception as exc:
-            logger.exception("Metric '%s' failed: %s", name, exc)
-            results[name] = {"error": str(exc),}
+            with self.report.stage(f"{name}_source"):
+                self._results[name] = self.sources[name]()
+        except Exception:
+            logger.warning("Metric source %s failed, computing it from the input", name, exc_info=True)
+
+    def _scheduler(self) -> MetricScheduler:
+        return MetricScheduler(METRIC_REGISTRY)
+
+
+def compute_all_metrics(
+    metrics_input: MetricsInput,
+    names: Iterable[str] | None = None,
+    workers: int | None = None,
+    report: Dict | None = None,
+) -> Dict[str, dict]:
+    """
+    Compute registered metrics using a shared MetricsInput.
+
+    The join index shared by all metric groups is built once and handed
+    to every registered metric. Groups run in dependency order and each
+    group is computed once. Failure in one metric only affects the groups
+    that depend on it.
+
+    Parameters
+    ----------
+    metrics_input : MetricsInput
+        Normalized training data.
+    names : iterable of str, optional
+        Metric groups to compute. Defaults to every public registered group.
+    workers : int, optional
+        Opt-in parallel mode: compute independent groups in a pool of this
+        many worker processes sharing the input arrays. ``None`` or 1 runs
+        sequentially in the calling thread.
+    report : dict, optional
+        Filled with the per-stage timing summary
+        (``PerformanceReport.to_dict()``) of this computation.
+    """
 
-    return results
+    metrics = LazyMetrics(metrics_input)
+    names = public_metrics(METRIC_REGISTRY) if names is None else list(names)
+    metrics.prefetch(names, workers=workers)
+    if report is not None:
+        report.update(metrics.report.to_dict())
+    return {name: metrics[name] for name in names}
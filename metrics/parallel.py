@@ -0,0 +1,322 @@
+"""
+Process-parallel metric execution.
+
+``ParallelMetricRunner`` computes independent metric groups in a pool of
+worker processes, which keeps a cold compute over a long history off the
+Streamlit process's GIL. The set, session and workout-exercise arrays are
+copied into one shared-memory block per run; workers map them read-only
+instead of receiving a pickled copy per task. The small reference
+collections (exercises, muscle targets, body data) are pickled once per
+worker.
+
+Nodes are submitted as soon as their dependencies are done, and dependency
+results are sent along with the task. Error isolation matches
+``MetricScheduler``: a failing node maps to ``{"error": ...}`` and only its
+dependents are skipped. If the pool itself breaks, the affected nodes are
+recomputed in-process. One runner may serve several threads (e.g. Streamlit
+sessions); a broken pool is replaced, and nodes whose futures it cancelled
+are recomputed in-process too.
+"""
+
+from __future__ import annotations
+
+import gc
+import logging
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, CancelledError, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+from graphlib import TopologicalSorter
+from multiprocessing import shared_memory
+from threading import Lock
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+from instrumentation import PerformanceReport
+from metrics.columnar import (
+    ColumnarMetricsInput,
+    SessionColumns,
+    SetColumns,
+    WorkoutExerciseColumns,
+    to_columnar,
+)
+from metrics.index import MetricsIndex
+from metrics.input import MetricsInput
+from metrics.registry import METRIC_REGISTRY, MetricNode
+from metrics.scheduler import MetricScheduler, compute_node
+
+logger = logging.getLogger(__name__)
+
+_COLUMN_GROUPS = {
+    "session_columns": SessionColumns,
+    "workout_exercise_columns": WorkoutExerciseColumns,
+    "set_columns": SetColumns,
+}
+_ALIGNMENT = 64
+
+
+@dataclass(frozen=True)
+class SharedLayout:
+    """Location of every column inside one shared-memory block.
+
+    ``columns`` maps ``(group, field)`` to ``(offset, length, dtype)``.
+    ``reference`` holds the non-array fields of the input.
+    """
+
+    name: str
+    columns: dict[tuple[str, str], tuple[int, int, str]]
+    reference: dict[str, Any]
+
+
+class SharedInput:
+    """Owner of the shared-memory copy of a ``ColumnarMetricsInput``."""
+
+    def __init__(self, metrics_input: ColumnarMetricsInput) -> None:
+        arrays = {
+            (group, field.name): np.ascontiguousarray(getattr(getattr(metrics_input, group), field.name))
+            for group, cls in _COLUMN_GROUPS.items()
+            for field in fields(cls)
+        }
+
+        offsets = {}
+        size = 0
+        for key, array in arrays.items():
+            offsets[key] = size
+            size += -(-array.nbytes // _ALIGNMENT) * _ALIGNMENT
+
+        self._shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        for key, array in arrays.items():
+            target = np.ndarray(array.shape, array.dtype, buffer=self._shm.buf, offset=offsets[key])
+            target[...] = array
+
+        self.layout = SharedLayout(
+            name=self._shm.name,
+            columns={
+                key: (offsets[key], len(array), array.dtype.str)
+                for key, array in arrays.items()
+            },
+            reference={
+                "exercises": metrics_input.exercises,
+                "exercise_muscle_targets": metrics_input.exercise_muscle_targets,
+                "muscle_groups": metrics_input.muscle_groups,
+                "body_measurements": metrics_input.body_measurements,
+                "body_composition": metrics_input.body_composition,
+            },
+        )
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+    def __enter__(self) -> "SharedInput":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def attach_input(layout: SharedLayout) -> tuple[ColumnarMetricsInput, shared_memory.SharedMemory]:
+    """Rebuild a read-only ``ColumnarMetricsInput`` backed by the shared block.
+
+    The caller must keep the returned ``SharedMemory`` open while the input
+    is in use.
+    """
+    shm = shared_memory.SharedMemory(name=layout.name)
+    columns: dict[str, dict[str, np.ndarray]] = {group: {} for group in _COLUMN_GROUPS}
+    for (group, name), (offset, length, dtype) in layout.columns.items():
+        array = np.ndarray((length,), np.dtype(dtype), buffer=shm.buf, offset=offset)
+        array.flags.writeable = False
+        columns[group][name] = array
+
+    metrics_input = ColumnarMetricsInput(
+        **{group: cls(**columns[group]) for group, cls in _COLUMN_GROUPS.items()},
+        **layout.reference,
+    )
+    return metrics_input, shm
+
+
+# Worker-side cache: the input and index of the run being served, so every
+# node a worker computes for one run shares a single MetricsIndex.
+_worker_state: dict[str, Any] = {}
+
+
+def _worker_compute(
+    layout: SharedLayout,
+    node: MetricNode,
+    dependencies: Dict[str, dict],
+) -> tuple[dict, float, float]:
+    """Compute ``node`` in a worker; returns the result with wall and CPU seconds."""
+    wall_start = time.perf_counter()
+    cpu_start = time.thread_time()
+    if _worker_state.get("name") != layout.name:
+        _release_worker_state()
+        metrics_input, shm = attach_input(layout)
+        _worker_state.update(
+            name=layout.name,
+            shm=shm,
+            input=metrics_input,
+            index=MetricsIndex(metrics_input),
+        )
+
+    result = compute_node(node, _worker_state["input"], _worker_state["index"], dependencies)
+    return result, time.perf_counter() - wall_start, time.thread_time() - cpu_start
+
+
+def _release_worker_state() -> None:
+    shm = _worker_state.pop("shm", None)
+    # The cached input and index hold the only views into the buffer; they
+    # (and any reference cycles through them) must be gone before the
+    # mapping can be closed.
+    _worker_state.clear()
+    if shm is not None:
+        gc.collect()
+        shm.close()
+
+
+class ParallelMetricRunner:
+    """Compute metric groups across a process pool.
+
+    Parameters
+    ----------
+    max_workers : int, optional
+        Pool size; defaults to the number of CPUs.
+    registry : dict, optional
+        Node registry, defaults to ``METRIC_REGISTRY``. Nodes are pickled to
+        the workers, so compute functions must be module-level.
+    """
+
+    def __init__(self, max_workers: int | None = None, registry: Dict | None = None) -> None:
+        self.max_workers = max_workers
+        self.scheduler = MetricScheduler(METRIC_REGISTRY if registry is None else registry)
+        self._executor: ProcessPoolExecutor | None = None
+        self._lock = Lock()
+
+    def run(
+        self,
+        metrics_input: MetricsInput | ColumnarMetricsInput,
+        targets: Iterable[str],
+        index: MetricsIndex | None = None,
+        results: Dict[str, dict] | None = None,
+        report: PerformanceReport | None = None,
+    ) -> Dict[str, dict]:
+        """
+        Compute ``targets`` and their dependencies; same contract as ``MetricScheduler.run``.
+
+        Stages recorded in ``report`` carry the wall and CPU time measured
+        inside the worker process.
+        """
+        results = {} if results is None else results
+        plan = [name for name in self.scheduler.plan(targets) if name not in results]
+        if not plan:
+            return results
+
+        columnar = to_columnar(metrics_input)
+        graph = {
+            name: tuple(dep for dep in self.scheduler.registry[name].requires if dep not in results)
+            for name in plan
+        }
+        sorter = TopologicalSorter(graph)
+        sorter.prepare()
+
+        with SharedInput(columnar) as shared:
+            pending: dict[Future, tuple[str, ProcessPoolExecutor]] = {}
+            while sorter.is_active():
+                for name in sorter.get_ready():
+                    submitted = self._submit(shared.layout, name, results)
+                    if submitted is None:
+                        results[name] = self._run_local(columnar, name, index, results, report)
+                        sorter.done(name)
+                    else:
+                        future, pool = submitted
+                        pending[future] = (name, pool)
+
+                if not pending:
+                    continue
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name, pool = pending.pop(future)
+                    results[name] = self._collect(future, pool, columnar, name, index, results, report)
+                    sorter.done(name)
+        return results
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # spawn: forking a multi-threaded Streamlit server is unsafe.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._executor
+
+    def _discard(self, pool: ProcessPoolExecutor) -> None:
+        """Shut down a failed ``pool`` unless another thread already replaced it."""
+        with self._lock:
+            if self._executor is not pool:
+                return
+            self._executor = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(
+        self,
+        layout: SharedLayout,
+        name: str,
+        results: Dict[str, dict],
+    ) -> tuple[Future, ProcessPoolExecutor] | None:
+        node = self.scheduler.registry[name]
+        dependencies = {dep: results[dep] for dep in node.requires}
+        pool = self._pool()
+        try:
+            return pool.submit(_worker_compute, layout, node, dependencies), pool
+        except (BrokenProcessPool, RuntimeError) as exc:
+            logger.warning("Metric pool unavailable, computing '%s' in-process: %s", name, exc)
+            self._discard(pool)
+            return None
+
+    def _collect(
+        self,
+        future: Future,
+        pool: ProcessPoolExecutor,
+        columnar: ColumnarMetricsInput,
+        name: str,
+        index: MetricsIndex | None,
+        results: Dict[str, dict],
+        report: PerformanceReport | None,
+    ) -> dict:
+        try:
+            result, wall_seconds, cpu_seconds = future.result()
+        except BrokenProcessPool as exc:
+            logger.warning("Metric pool broke while computing '%s', retrying in-process: %s", name, exc)
+            self._discard(pool)
+            return self._run_local(columnar, name, index, results, report)
+        except CancelledError:
+            logger.warning("Metric '%s' was cancelled with its pool, computing it in-process", name)
+            return self._run_local(columnar, name, index, results, report)
+        except Exception as exc:
+            logger.exception("Metric '%s' failed: %s", name, exc)
+            return {"error": str(exc),}
+        if report is not None:
+            report.record(name, wall_seconds, cpu_seconds)
+        return result
+
+    def _run_local(
+        self,
+        columnar: ColumnarMetricsInput,
+        name: str,
+        index: MetricsIndex | None,
+        results: Dict[str, dict],
+        report: PerformanceReport | None,
+    ) -> dict:
+        index = MetricsIndex(columnar) if index is None else index
+        if report is None:
+            return self.scheduler.run_node(columnar, name, index, results)
+        with report.stage(name):
+            return self.scheduler.run_node(columnar, name, index, results)
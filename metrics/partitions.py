@@ -0,0 +1,309 @@
+"""
+Month partition index.
+
+Partitions a loaded dataset by calendar month (YYYY-MM) once, at load time.
+Sessions, workout exercises and sets are stably reordered by month into one
+copy of each column, so every month is a contiguous range: a month's
+``ColumnarMetricsInput`` holds array slices (views) of that copy, and its
+UI frame is a pre-sliced range of the month-ordered ``sets_df``. Selecting a
+month is then a dictionary lookup.
+
+Rows keep their original relative order inside a month, so a partition holds
+exactly what filtering the full data by year and month would return.
+Workout exercises and sets that cannot be joined to a dated session belong
+to no month; they are only part of the full dataset.
+
+The month-ordered and date-sorted arrays depend only on the input columns,
+so they can be shared between processes like the input itself (see
+``mapped_dataset``); the frames are always built per process.
+
+Custom date ranges and rolling windows (see ``metrics.date_filter``) are
+resolved by binary search over per-table date-sorted arrays, also built
+once. Only the rows inside the window are gathered (in their original
+order), so the cost follows the window size, not the history length.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, fields, replace
+from datetime import date
+from typing import Any, Callable, Collection
+
+import numpy as np
+import pandas as pd
+
+from metrics.columnar import (
+    ColumnarMetricsInput,
+    SessionColumns,
+    SetColumns,
+    WorkoutExerciseColumns,
+    read_only_frame,
+    to_columnar,
+)
+from metrics.date_filter import DateFilter
+from metrics.index import _positions
+from metrics.input import MetricsInput
+
+
+def _month_keys(months: np.ndarray) -> list[str]:
+    return [str(month) for month in np.datetime_as_string(months, unit="M")]
+
+
+def _join_dates(dates: np.ndarray, positions: np.ndarray) -> np.ndarray:
+    """``dates[positions]`` with NaT where the join found no row (-1)."""
+    joined = np.full(len(positions), np.datetime64("NaT"), dtype="datetime64[D]")
+    found = positions >= 0
+    joined[found] = dates[positions[found]]
+    return joined
+
+
+def _month_codes(dates: np.ndarray, months: np.ndarray) -> np.ndarray:
+    """Index of each date's month in the sorted ``months`` array (-1 for NaT)."""
+    month_values = dates.astype("datetime64[M]")
+    codes = np.full(len(dates), -1, dtype=np.int64)
+    valid = ~np.isnat(month_values)
+    codes[valid] = np.searchsorted(months, month_values[valid])
+    return codes
+
+
+@dataclass(frozen=True, eq=False)
+class _Ordered:
+    """Columns reordered by month code, with the row range of every month."""
+
+    columns: Any
+    starts: np.ndarray
+    stops: np.ndarray
+
+    @classmethod
+    def build(cls, columns: Any, codes: np.ndarray, month_count: int) -> "_Ordered":
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        month_ids = np.arange(month_count)
+        reordered = type(columns)(
+            **{field.name: getattr(columns, field.name)[order] for field in fields(columns)}
+        )
+        return cls(
+            columns=reordered,
+            starts=np.searchsorted(sorted_codes, month_ids, side="left"),
+            stops=np.searchsorted(sorted_codes, month_ids, side="right"),
+        )
+
+    def slice(self, code: int | None) -> Any:
+        """Columns of month ``code``; ``None`` gives empty columns."""
+        if code is None:
+            rows = slice(0, 0)
+        else:
+            rows = slice(int(self.starts[code]), int(self.stops[code]))
+        return type(self.columns)(
+            **{field.name: getattr(self.columns, field.name)[rows] for field in fields(self.columns)}
+        )
+
+
+@dataclass(frozen=True, eq=False)
+class _DateOrder:
+    """Positions of dated rows sorted by date, for range lookups."""
+
+    order: np.ndarray
+    sorted_dates: np.ndarray
+
+    @classmethod
+    def build(cls, dates: np.ndarray) -> "_DateOrder":
+        valid = np.flatnonzero(~np.isnat(dates))
+        order = valid[np.argsort(dates[valid], kind="stable")]
+        return cls(order=order, sorted_dates=dates[order])
+
+    def window(self, start: date, end: date) -> np.ndarray:
+        """Original positions of rows dated within [start, end], ascending."""
+        lo = np.searchsorted(self.sorted_dates, np.datetime64(start, "D"), side="left")
+        hi = np.searchsorted(self.sorted_dates, np.datetime64(end, "D"), side="right")
+        return np.sort(self.order[lo:hi])
+
+
+def _take(columns: Any, positions: np.ndarray) -> Any:
+    return type(columns)(
+        **{field.name: getattr(columns, field.name)[positions] for field in fields(columns)}
+    )
+
+
+class MonthPartitions:
+    """Per-month views and date-window lookups over one loaded dataset.
+
+    Parameters
+    ----------
+    metrics_input : MetricsInput or ColumnarMetricsInput
+        Full, unfiltered data.
+    sets_df : pd.DataFrame
+        Full UI sets frame with a ``session_date`` column.
+    share : callable, optional
+        ``share(name, arrays)`` returns an equivalent dataclass of arrays,
+        e.g. ``MappedVersion.share``; applied to every array group derived
+        from ``metrics_input``.
+    previous : MonthPartitions, optional
+        Partitions of an earlier version of the same dataset. Its month
+        frames are reused for every month not in ``changed_months``, whose
+        rows must be the same in ``sets_df``.
+    changed_months : collection of str
+        Months (YYYY-MM) whose rows differ from ``previous``.
+    """
+
+    def __init__(
+        self,
+        metrics_input: MetricsInput | ColumnarMetricsInput,
+        sets_df: pd.DataFrame,
+        share: Callable[[str, Any], Any] | None = None,
+        previous: MonthPartitions | None = None,
+        changed_months: Collection[str] = (),
+    ) -> None:
+        self.metrics_input = metrics_input
+        self.sets_df = sets_df
+
+        columnar = to_columnar(metrics_input)
+        sessions = columnar.session_columns
+        workout_exercises = columnar.workout_exercise_columns
+
+        session_months = sessions.session_date.astype("datetime64[M]")
+        self._month_values = np.unique(session_months[~np.isnat(session_months)])
+        self._codes = {key: code for code, key in enumerate(_month_keys(self._month_values))}
+
+        session_dates = sessions.session_date
+        we_session = _positions(workout_exercises.session_id, sessions.session_id)
+        we_dates = _join_dates(session_dates, we_session)
+        set_we = _positions(columnar.set_columns.workout_exercise_id, workout_exercises.workout_exercise_id)
+        set_dates = _join_dates(we_dates, set_we)
+
+        count = len(self._month_values)
+        self._reference = columnar
+        self._sessions = _Ordered.build(sessions, _month_codes(session_dates, self._month_values), count)
+        self._workout_exercises = _Ordered.build(
+            workout_exercises, _month_codes(we_dates, self._month_values), count
+        )
+        self._sets = _Ordered.build(
+            columnar.set_columns, _month_codes(set_dates, self._month_values), count
+        )
+        self._session_order = _DateOrder.build(session_dates)
+        self._we_order = _DateOrder.build(we_dates)
+        self._set_order = _DateOrder.build(set_dates)
+        if share is not None:
+            self._sessions = replace(self._sessions, columns=share("month_sessions", self._sessions.columns))
+            self._workout_exercises = replace(
+                self._workout_exercises,
+                columns=share("month_workout_exercises", self._workout_exercises.columns),
+            )
+            self._sets = replace(self._sets, columns=share("month_sets", self._sets.columns))
+            self._session_order = share("date_sessions", self._session_order)
+            self._we_order = share("date_workout_exercises", self._we_order)
+            self._set_order = share("date_sets", self._set_order)
+
+        reused = {}
+        if previous is not None:
+            reused = {
+                month: frame for month, frame in previous._frames.items() if month not in changed_months
+            }
+        self._frames, self._empty_frame, self._dated_frame = self._partition_frame(sets_df, reused)
+        self._frame_order = _DateOrder.build(
+            self._dated_frame["session_date"].to_numpy().astype("datetime64[D]")
+            if "session_date" in self._dated_frame
+            else np.array([], dtype="datetime64[D]")
+        )
+
+    @property
+    def months(self) -> list[str]:
+        """Months (YYYY-MM, ascending) that have at least one set in ``sets_df``."""
+        return list(self._frames)
+
+    @property
+    def date_span(self) -> tuple[date, date] | None:
+        """First and last session date, or None without dated sessions."""
+        dates = self._session_order.sorted_dates
+        if not len(dates):
+            return None
+        return dates[0].astype(object), dates[-1].astype(object)
+
+    def get(
+        self,
+        period: DateFilter | str | None,
+        today: date | None = None,
+    ) -> tuple[MetricsInput | ColumnarMetricsInput, pd.DataFrame]:
+        """
+        Data for ``period``: a ``DateFilter``, a YYYY-MM month, "All time" or None.
+
+        Months are served from the precomputed partitions (unknown months
+        return an empty partition); ranges and rolling windows (relative to
+        ``today``) via ``window``.
+        """
+        period = DateFilter.parse(period)
+        if period.is_all_time:
+            return self.metrics_input, self.sets_df
+        if period.kind != "month":
+            return self.window(*period.bounds(today))
+
+        code = self._codes.get(period.month)
+        frame = self._frames.get(period.month, self._empty_frame)
+
+        return self._input(
+            self._sessions.slice(code),
+            self._workout_exercises.slice(code),
+            self._sets.slice(code),
+        ), frame
+
+    def window(self, start: date, end: date) -> tuple[ColumnarMetricsInput, pd.DataFrame]:
+        """Rows whose session date lies within [start, end], in original order."""
+        columnar = self._reference
+        frame_positions = self._frame_order.window(start, end)
+        return self._input(
+            _take(columnar.session_columns, self._session_order.window(start, end)),
+            _take(columnar.workout_exercise_columns, self._we_order.window(start, end)),
+            _take(columnar.set_columns, self._set_order.window(start, end)),
+        ), read_only_frame(self._dated_frame.iloc[frame_positions].reset_index(drop=True))
+
+    def _input(
+        self,
+        sessions: SessionColumns,
+        workout_exercises: WorkoutExerciseColumns,
+        sets: SetColumns,
+    ) -> ColumnarMetricsInput:
+        reference = self._reference
+        return ColumnarMetricsInput(
+            session_columns=sessions,
+            workout_exercise_columns=workout_exercises,
+            set_columns=sets,
+            exercises=reference.exercises,
+            exercise_muscle_targets=reference.exercise_muscle_targets,
+            muscle_groups=reference.muscle_groups,
+            body_measurements=reference.body_measurements,
+            body_composition=reference.body_composition,
+        )
+
+    @staticmethod
+    def _partition_frame(
+        sets_df: pd.DataFrame,
+        reused: dict[str, pd.DataFrame] | None = None,
+    ) -> tuple[dict[str, pd.DataFrame], pd.DataFrame, pd.DataFrame]:
+        """Split ``sets_df`` into per-month frames, in ascending month order.
+
+        ``session_date`` is parsed to datetimes once here, as month filtering
+        always returned it. Frames in ``reused`` are taken as they are for
+        their months. Also returns the empty frame used for months without
+        sets and the full frame with parsed dates.
+        """
+        reused = reused or {}
+        if sets_df is None or "session_date" not in sets_df:
+            empty = pd.DataFrame(columns=getattr(sets_df, "columns", None))
+            return {}, empty, empty
+
+        session_dates = pd.to_datetime(sets_df["session_date"])
+        months = session_dates.to_numpy().astype("datetime64[M]")
+        valid = ~np.isnat(months)
+        month_values = np.unique(months[valid])
+        codes = _month_codes(months, month_values)
+        order = np.argsort(codes, kind="stable")
+        dated = sets_df.assign(session_date=session_dates)
+        starts = np.searchsorted(codes[order], np.arange(len(month_values)), side="left")
+        stops = np.searchsorted(codes[order], np.arange(len(month_values)), side="right")
+
+        frames = {
+            key: reused[key] if key in reused
+            else read_only_frame(dated.iloc[order[start:stop]].reset_index(drop=True))
+            for key, start, stop in zip(_month_keys(month_values), starts, stops)
+        }
+        return frames, read_only_frame(dated.iloc[0:0].reset_index(drop=True)), read_only_frame(dated)
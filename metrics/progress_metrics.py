@@ -1,42 +1,43 @@
-from collections import defaultdict
 from statistics import mean
 
+from metrics.exercise_metrics import compute_exercise_series
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.utils import is_duration_set, set_duration_seconds, set_estimated_1rm
 
 
-def compute_progress_metrics(input: MetricsInput) -> dict:
-    if not input.sets or not input.workout_exercises or not input.sessions:
+def compute_progress_metrics(
+    input: MetricsInput,
+    index: MetricsIndex | None = None,
+    exercise_series: dict | None = None,
+) -> dict:
+    """
+    Classify strength (or duration) progression per exercise.
+
+    Progress compares the mean of the first and last few per-set values of
+    each exercise in session-date order. ``exercise_series`` is the output of
+    ``compute_exercise_series``; the registry passes the shared result, and it
+    is computed here when the function is called directly.
+    """
+    index = index or MetricsIndex(input)
+    columnar = index.columnar
+    if not (
+        len(columnar.set_columns)
+        and len(columnar.workout_exercise_columns)
+        and len(columnar.session_columns)
+    ):
         return {}
 
-    we_to_exercise = {we.workout_exercise_id: we.exercise_id for we in input.workout_exercises}
-    session_dates = {s.session_id: s.session_date for s in input.sessions}
-    we_to_date = {we.workout_exercise_id: session_dates.get(we.session_id) for we in input.workout_exercises}
-    exercise_sets = defaultdict(list)
+    if exercise_series is None:
+        exercise_series = compute_exercise_series(input, index)
     exercise_name_map = {e.exercise_id: e.name for e in input.exercises}
 
-    for s in input.sets:
-        ex_id = we_to_exercise.get(s.workout_exercise_id)
-        date = we_to_date.get(s.workout_exercise_id)
-        if ex_id and date:
-            exercise_sets[ex_id].append((date, s))
-
     per_exercise = {}
     improving = stagnating = regressing = 0
     progress_values = []
 
-    for ex_id, entries in exercise_sets.items():
-        entries.sort(key=lambda x: x[0])
-        one_rms = [
-            estimated_1rm
-            for _, s in entries
-            if (estimated_1rm := set_estimated_1rm(s)) is not None
-        ]
-        durations = [
-            set_duration_seconds(s)
-            for _, s in entries
-            if is_duration_set(s)
-        ]
+    for ex_id, series in exercise_series.get("per_exercise", {}).items():
+        one_rms = series["estimated_1rm"]
+        durations = series["duration_seconds"]
         values = one_rms if one_rms else durations
         metric_type = "estimated_1rm" if one_rms else "duration_seconds"
 
@@ -61,7 +62,7 @@ def compute_progress_metrics(input: MetricsInput) -> dict:
             "exercise_name": exercise_name_map.get(ex_id, f"Exercise {ex_id}"),
             "metric_type": metric_type,
             "progress_pct": progress_pct,
-            "exposure_count": len(entries),
+            "exposure_count": series["exposure_count"],
         }
         if metric_type == "estimated_1rm":
             row["start_1rm"] = round(start, 2)
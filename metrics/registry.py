@@ -1,19 +1,57 @@
+"""
+Metric registry.
+
+Each metric group is a ``MetricNode``: a compute function plus the names of
+the groups whose results it consumes. Dependencies are passed to the compute
+function as keyword arguments named after the dependency, so a derived
+metric never recomputes its inputs. Nodes marked ``public=False`` are
+intermediate results shared by other nodes and are not exposed to views.
+"""
+
+from dataclasses import dataclass
+from typing import Callable
+
 from metrics.body_metrics import compute_body_metrics
-from metrics.exercise_metrics import compute_exercise_metrics
+from metrics.body_part_metrics import compute_body_part_metrics
+from metrics.exercise_metrics import compute_exercise_metrics, compute_exercise_series
 from metrics.fatigue_metrics import compute_fatigue_metrics
 from metrics.frequency_metrics import compute_frequency_metrics
 from metrics.progress_metrics import compute_progress_metrics
 from metrics.session_metrics import compute_session_metrics
 from metrics.set_metrics import compute_set_metrics
 
-METRIC_REGISTRY = {
-    "sessions": compute_session_metrics,
-    "exercises": compute_exercise_metrics,
-    "sets": compute_set_metrics,
-    "frequency": compute_frequency_metrics,
-    "fatigue": compute_fatigue_metrics,
-    "progress": compute_progress_metrics,
-    "body": compute_body_metrics,
-}
-
-__all__ = ["METRIC_REGISTRY"]
+
+@dataclass(frozen=True)
+class MetricNode:
+    """A registered metric group and the groups it depends on."""
+
+    name: str
+    compute: Callable[..., dict]
+    requires: tuple[str, ...] = ()
+    public: bool = True
+
+
+def _registry(*nodes: MetricNode) -> dict[str, MetricNode]:
+    return {node.name: node for node in nodes}
+
+
+METRIC_REGISTRY = _registry(
+    MetricNode("sessions", compute_session_metrics),
+    MetricNode("exercises", compute_exercise_metrics),
+    MetricNode("sets", compute_set_metrics),
+    MetricNode("frequency", compute_frequency_metrics),
+    MetricNode("fatigue", compute_fatigue_metrics),
+    MetricNode("progress", compute_progress_metrics, requires=("exercise_series",)),
+    MetricNode("body", compute_body_metrics),
+    MetricNode("body_parts", compute_body_part_metrics, requires=("exercises",)),
+    MetricNode("exercise_series", compute_exercise_series, public=False),
+)
+
+
+def public_metrics(registry: dict[str, MetricNode] | None = None) -> list[str]:
+    """Names of the metric groups exposed to views, in registration order."""
+    registry = METRIC_REGISTRY if registry is None else registry
+    return [name for name, node in registry.items() if node.public]
+
+
+__all__ = ["METRIC_REGISTRY", "MetricNode", "public_metrics"]
@@ -0,0 +1,223 @@
+"""
+Metrics from SQL rollups.
+
+Server-side aggregation mode: instead of transferring every set and
+aggregating in Python, the database groups sets per session and per
+exercise-session (see ``db.queries.get_session_rollups`` and
+``get_exercise_session_rollups``). The functions here turn those rollups
+into the same result shapes as the set-level ``sessions``, ``frequency`` and
+``body_parts`` metric groups, so Python work scales with sessions instead of
+sets.
+
+Per-set order is not part of a rollup, so groups that need it (exercise
+trends, progression, fatigue) stay on the set-level path.
+
+``RollupPartitions`` serves the rollups of any period from one all-time
+load, so every period of a dataset version reads the same rollups instead
+of querying the database again.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import date
+from functools import cache
+from typing import Any, Callable, Dict, Iterable, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from metrics.body_part_metrics import summarize_body_parts
+from metrics.columnar import SessionColumns
+from metrics.date_filter import DateFilter
+from metrics.frequency_metrics import summarize_frequency
+from metrics.session_metrics import session_durations_minutes, summarize_sessions
+from models.exercise import Exercise
+from models.exercise_muscle_target import ExerciseMuscleTarget
+
+ROLLUP_METRICS = ("sessions", "frequency", "body_parts")
+
+
+class TrainingRollups(NamedTuple):
+    """Per-session and per-exercise-session aggregates of one period."""
+
+    sessions: pd.DataFrame
+    exercise_sessions: pd.DataFrame
+
+
+class RollupPartitions:
+    """Period lookups over all-time rollups, the rollup counterpart of ``MonthPartitions``.
+
+    Parameters
+    ----------
+    rollups : TrainingRollups
+        Rollups of every session (no date bounds).
+    """
+
+    def __init__(self, rollups: TrainingRollups) -> None:
+        self.rollups = rollups
+        self._session_days = _days(rollups.sessions["session_date"])
+        self._exercise_session_days = _days(rollups.exercise_sessions["session_date"])
+
+    @property
+    def months(self) -> list[str]:
+        """Months (YYYY-MM, ascending) that have at least one set."""
+        trained = self._session_days[(self.rollups.sessions["total_sets"] > 0).to_numpy()]
+        months = np.unique(trained[~np.isnat(trained)].astype("datetime64[M]"))
+        return [str(month) for month in np.datetime_as_string(months, unit="M")]
+
+    @property
+    def date_span(self) -> tuple[date, date] | None:
+        """First and last session date, or None without dated sessions."""
+        dated = self._session_days[~np.isnat(self._session_days)]
+        if not len(dated):
+            return None
+        return dated.min().astype(object), dated.max().astype(object)
+
+    def get(self, period: DateFilter | str | None, today: date | None = None) -> TrainingRollups:
+        """Rollups of the sessions within ``period`` (see ``DateFilter``)."""
+        bounds = DateFilter.parse(period).bounds(today)
+        if bounds is None:
+            return self.rollups
+        start, end = (np.datetime64(bound, "D") for bound in bounds)
+        return TrainingRollups(
+            sessions=_within(self.rollups.sessions, self._session_days, start, end),
+            exercise_sessions=_within(self.rollups.exercise_sessions, self._exercise_session_days, start, end),
+        )
+
+
+def compute_session_rollup_metrics(rollups: TrainingRollups) -> Dict[str, Any]:
+    """``compute_session_metrics`` result from session rollups."""
+    sessions = SessionColumns.from_frame(rollups.sessions)
+    session_dates = sessions.session_date.astype(object).tolist()
+    durations = session_durations_minutes(sessions)
+    per_session: Dict[int, Dict[str, Any]] = {}
+
+    for session_id, session_date, duration_minutes, row in zip(
+        sessions.session_id.tolist(),
+        session_dates,
+        durations,
+        rollups.sessions.to_dict("records"),
+    ):
+        if not row["total_sets"]:
+            continue
+        per_session[session_id] = {
+            "session_date": session_date,
+            "duration_minutes": duration_minutes,
+            "total_sets": int(row["total_sets"]),
+            "total_reps": int(row["total_reps"]),
+            "total_volume": float(row["total_volume"]),
+            "total_duration_seconds": int(row["total_duration_seconds"]),
+            "avg_intensity": _optional_float(row["avg_e1rm"]),
+            "avg_rir": _optional_float(row["avg_rir"]) or 0,
+            "sets_to_failure": int(row["sets_to_failure"]),
+            "exercises_count": int(row["exercises_count"]),
+        }
+
+    return {
+        "per_session": per_session,
+        "global": summarize_sessions(per_session, session_dates),
+    }
+
+
+def compute_frequency_rollup_metrics(
+    rollups: TrainingRollups,
+    exercises: Iterable[Exercise],
+) -> Dict[str, Any]:
+    """``compute_frequency_metrics`` result from session and exercise-session rollups."""
+    if rollups.sessions.empty:
+        return {}
+
+    session_dates = sorted(_dates(rollups.sessions["session_date"]))
+    exercise_dates = zip(
+        rollups.exercise_sessions["exercise_id"].astype(int).tolist(),
+        _dates(rollups.exercise_sessions["session_date"]),
+    )
+    return summarize_frequency(session_dates, exercise_dates, exercises)
+
+
+def compute_body_part_rollup_metrics(
+    rollups: TrainingRollups,
+    exercises: Iterable[Exercise],
+    exercise_muscle_targets: Iterable[ExerciseMuscleTarget],
+) -> Dict[str, Any]:
+    """``compute_body_part_metrics`` result from exercise-session rollups."""
+    body_part_by_exercise = {e.exercise_id: e.body_part for e in exercises}
+    targets_by_exercise: Dict[int, list[dict[str, Any]]] = defaultdict(list)
+    for target in exercise_muscle_targets:
+        targets_by_exercise[target.exercise_id].append(
+            {
+                "muscle_group": target.muscle_group,
+                "muscle_name": target.muscle_name,
+                "role": target.role,
+                "set_factor": target.set_factor,
+            }
+        )
+
+    trained = rollups.exercise_sessions
+    trained = trained[trained["total_sets"] > 0].assign(
+        session_date=lambda df: _dates(df["session_date"]),
+        e1rm_sum=lambda df: df["avg_e1rm"].fillna(0) * df["e1rm_count"],
+    )
+
+    per_exercise: Dict[int, Dict[str, Any]] = {}
+    for exercise_id, rows in trained.groupby("exercise_id", sort=False):
+        exercise_id = int(exercise_id)
+        e1rm_count = int(rows["e1rm_count"].sum())
+        one_rm_rows = rows[rows["e1rm_count"] > 0]
+        per_exercise[exercise_id] = {
+            "body_part": body_part_by_exercise.get(exercise_id),
+            "muscle_targets": targets_by_exercise.get(exercise_id, []),
+            "total_sets": int(rows["total_sets"].sum()),
+            "effective_sets": float(rows["effective_sets"].sum()),
+            "total_volume": float(rows["total_volume"].sum()),
+            "estimated_1rm_avg": float(rows["e1rm_sum"].sum() / e1rm_count) if e1rm_count else None,
+            "per_session_1rm": [
+                {"date": date, "estimated_1rm": round(float(value), 2)}
+                for date, value in zip(one_rm_rows["session_date"], one_rm_rows["avg_e1rm"])
+            ],
+            "per_session_duration": [
+                {"date": date, "duration_seconds": int(value)}
+                for date, value in zip(rows["session_date"], rows["total_duration_seconds"])
+                if value
+            ],
+        }
+
+    return summarize_body_parts(per_exercise)
+
+
+def rollup_metric_sources(
+    load_rollups: Callable[[], TrainingRollups],
+    exercises: list[Exercise],
+    exercise_muscle_targets: list[ExerciseMuscleTarget],
+) -> Dict[str, Callable[[], dict]]:
+    """Compute functions for ``ROLLUP_METRICS``, for ``LazyMetrics(sources=...)``.
+
+    ``load_rollups`` runs once, on the first lookup of any of the groups.
+    """
+    rollups = cache(load_rollups)
+    return {
+        "sessions": lambda: compute_session_rollup_metrics(rollups()),
+        "frequency": lambda: compute_frequency_rollup_metrics(rollups(), exercises),
+        "body_parts": lambda: compute_body_part_rollup_metrics(
+            rollups(), exercises, exercise_muscle_targets
+        ),
+    }
+
+
+def _days(values: pd.Series) -> np.ndarray:
+    return pd.to_datetime(values).to_numpy().astype("datetime64[D]")
+
+
+def _within(frame: pd.DataFrame, days: np.ndarray, start: np.datetime64, end: np.datetime64) -> pd.DataFrame:
+    return frame[(days >= start) & (days <= end)].reset_index(drop=True)
+
+
+def _dates(values: pd.Series) -> list:
+    return list(pd.to_datetime(values).dt.date)
+
+
+def _optional_float(value: Any) -> float | None:
+    if value is None or pd.isna(value):
+        return None
+    return float(value)
@@ -0,0 +1,117 @@
+"""
+Dependency-aware metric scheduler.
+
+Resolves the subgraph of the metric registry needed for a set of target
+groups, orders it topologically and computes every node exactly once.
+Results of dependencies are fed to their dependents, so shared inputs such as
+the per-exercise series are computed once per run instead of once per
+consumer. A failing node isolates only itself and the nodes depending on it.
+"""
+
+from __future__ import annotations
+
+import logging
+from graphlib import CycleError, TopologicalSorter
+from typing import Dict, Iterable
+
+from instrumentation import PerformanceReport
+from metrics.index import MetricsIndex
+from metrics.input import MetricsInput
+from metrics.registry import MetricNode
+
+logger = logging.getLogger(__name__)
+
+
+class MetricScheduler:
+    """Plan and run metric groups over a ``MetricNode`` registry."""
+
+    def __init__(self, registry: Dict[str, MetricNode]) -> None:
+        self.registry = registry
+
+    def plan(self, targets: Iterable[str]) -> list[str]:
+        """
+        Return the nodes needed for ``targets`` in dependency order.
+
+        Raises
+        ------
+        ValueError
+            If a target or dependency is not registered, or the graph has a cycle.
+        """
+        graph: dict[str, tuple[str, ...]] = {}
+        pending = list(targets)[::-1]
+        while pending:
+            name = pending.pop()
+            if name in graph:
+                continue
+            node = self.registry.get(name)
+            if node is None:
+                raise ValueError(f"Unknown metric '{name}'")
+            graph[name] = node.requires
+            pending.extend(node.requires)
+
+        try:
+            return list(TopologicalSorter(graph).static_order())
+        except CycleError as exc:
+            raise ValueError(f"Metric dependency cycle: {exc.args[1]}") from exc
+
+    def run(
+        self,
+        metrics_input: MetricsInput,
+        targets: Iterable[str],
+        index: MetricsIndex | None = None,
+        results: Dict[str, dict] | None = None,
+        report: PerformanceReport | None = None,
+    ) -> Dict[str, dict]:
+        """
+        Compute ``targets`` and their dependencies.
+
+        ``results`` holds already computed groups; they are reused and the new
+        ones are added to it. Returns the same mapping. When ``report`` is
+        given, each computed node is recorded as a stage.
+        """
+        index = MetricsIndex(metrics_input) if index is None else index
+        results = {} if results is None else results
+
+        for name in self.plan(targets):
+            if name in results:
+                continue
+            if report is None:
+                results[name] = self.run_node(metrics_input, name, index, results)
+            else:
+                with report.stage(name):
+                    results[name] = self.run_node(metrics_input, name, index, results)
+        return results
+
+    def run_node(
+        self,
+        metrics_input: MetricsInput,
+        name: str,
+        index: MetricsIndex,
+        results: Dict[str, dict],
+    ) -> dict:
+        """Compute one node whose dependencies are already in ``results``."""
+        return compute_node(self.registry[name], metrics_input, index, results)
+
+
+def compute_node(
+    node: MetricNode,
+    metrics_input: MetricsInput,
+    index: MetricsIndex,
+    results: Dict[str, dict],
+) -> dict:
+    """
+    Compute ``node`` from the dependency results in ``results``.
+
+    A failing dependency or compute function yields ``{"error": ...}``
+    instead of raising.
+    """
+    for dependency in node.requires:
+        if "error" in results[dependency]:
+            return {"error": f"Dependency '{dependency}' failed: {results[dependency]['error']}"}
+
+    dependencies = {dependency: results[dependency] for dependency in node.requires}
+    try:
+        return node.compute(metrics_input, index=index, **dependencies) or {}
+    except Exception as exc:
+        logger.exception("Metric '%s' failed: %s", node.name, exc)
+        return {"error": str(exc),}
@@ -8,16 +8,22 @@ All computations are based solely on normalized data provided
 via MetricsInput. No database or UI dependencies are allowed here.
 """
 
-from collections import defaultdict
-from datetime import datetime, timedelta
+from datetime import date
 from statistics import mean
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 
+import numpy as np
+
+from metrics.columnar import SessionColumns
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.utils import is_duration_set, set_duration_seconds, set_intensity, set_reps, set_volume
+from metrics.utils import exact_mean, ordered_sum
 
 
-def compute_session_metrics(input: MetricsInput) -> Dict[str, Any]:
+def compute_session_metrics(
+    input: MetricsInput,
+    index: MetricsIndex | None = None,
+) -> Dict[str, Any]:
     """
     Compute session-level training metrics.
 
@@ -45,6 +51,8 @@ def compute_session_metrics(input: MetricsInput) -> Dict[str, Any]:
     ----------
     input : MetricsInput
         Normalized training data loaded from the database.
+    index : MetricsIndex, optional
+        Shared join index; built from ``input`` when omitted.
 
     Returns
     -------
@@ -54,75 +62,67 @@ def compute_session_metrics(input: MetricsInput) -> Dict[str, Any]:
         - "global": dict[str, float | None]
     """
 
-    sessions = {s.session_id: s for s in input.sessions}
-
-    sets_by_session: dict[int, list] = defaultdict(list)
-    exercises_by_session: dict[int, set[int]] = defaultdict(set)
-    workout_exercise_to_session = {
-        we.workout_exercise_id: we.session_id
-        for we in input.workout_exercises
-    }
-
-    for workout_set in input.sets:
-        session_id = workout_exercise_to_session.get(workout_set.workout_exercise_id)
-        if session_id is None:
-            continue
-
-        sets_by_session[session_id].append(workout_set)
-        exercises_by_session[session_id].add(workout_set.workout_exercise_id)
+    index = index or MetricsIndex(input)
+    session_columns = index.columnar.session_columns
+    session_ids = session_columns.session_id.tolist()
+    session_dates = index.session_dates
+    durations = session_durations_minutes(session_columns)
+    workout_exercise_ids = index.columnar.set_columns.workout_exercise_id
+    arrays = index.set_arrays
 
     per_session: Dict[int, Dict[str, Any]] = {}
 
-    for session_id, sets in sets_by_session.items():
-        session = sessions.get(session_id)
-        if session is None:
-            continue
-
-        duration_minutes = None
-        if session.start_time and session.end_time:
-            try:
-                start_dt = datetime.combine(session.session_date, session.start_time)
-                end_dt = datetime.combine(session.session_date, session.end_time)
-                if end_dt < start_dt:
-                    end_dt += timedelta(days=1)
-
-                duration_minutes = (end_dt - start_dt).total_seconds() / 60
-            except Exception:
-                duration_minutes = None
-
-        total_sets = len(sets)
-        strength_sets = [s for s in sets if not is_duration_set(s)]
-        total_reps = sum(set_reps(s) for s in strength_sets)
-        total_volume = sum(set_volume(s) for s in sets)
-        total_duration_seconds = sum(set_duration_seconds(s) for s in sets)
-
-        intensities = [
-            intensity
-            for s in strength_sets
-            if (intensity := set_intensity(s)) is not None
-        ]
-        avg_intensity = mean(intensities) if intensities else None
-        rir_values = [s.rir for s in sets if s.rir is not None]
-
-        if rir_values:
-            avg_rir = sum(rir_values) / len(rir_values)
+    for session_pos, positions in index.sets_by_session.items():
+        strength = ~arrays.is_duration[positions]
+        rir_values = arrays.rir[positions]
+        rir_values = rir_values[~np.isnan(rir_values)]
+
+        if len(rir_values):
+            avg_rir = int(rir_values.sum()) / len(rir_values)
         else:
             avg_rir = 0
-        sets_to_failure = sum(1 for s in sets if s.rir == 0)
-
-        per_session[session_id] = {
-            "session_date": session.session_date,
-            "duration_minutes": duration_minutes,
-            "total_sets": total_sets,
-            "total_reps": total_reps,
-            "total_volume": total_volume,
-            "total_duration_seconds": total_duration_seconds,
-            "avg_intensity": avg_intensity,
+
+        per_session[session_ids[session_pos]] = {
+            "session_date": session_dates[session_pos],
+            "duration_minutes": durations[session_pos],
+            "total_sets": len(positions),
+            "total_reps": int(arrays.reps[positions][strength].sum()),
+            "total_volume": ordered_sum(arrays.volume[positions]),
+            "total_duration_seconds": int(arrays.duration_seconds[positions].sum()),
+            "avg_intensity": exact_mean(arrays.intensity[positions]),
             "avg_rir": avg_rir,
-            "sets_to_failure": sets_to_failure,
-            "exercises_count": len(exercises_by_session[session_id]),
+            "sets_to_failure": int((rir_values == 0).sum()),
+            "exercises_count": len(np.unique(workout_exercise_ids[positions])),
         }
 
+    return {
+        "per_session": per_session,
+        "global": summarize_sessions(per_session, session_dates),
+    }
+
+
+def session_durations_minutes(sessions: SessionColumns) -> list[float | None]:
+    """Minutes from start to end time per session (past midnight if needed), None if unknown."""
+    known = ~(np.isnat(sessions.start_time) | np.isnat(sessions.end_time))
+    seconds = np.zeros(len(sessions), dtype=np.int64)
+    seconds[known] = (sessions.end_time[known] - sessions.start_time[known]).astype(np.int64)
+    seconds = np.where(seconds < 0, seconds + 24 * 3600, seconds)
+    return [
+        total / 60 if is_known else None
+        for total, is_known in zip(seconds.tolist(), known.tolist())
+    ]
+
+
+def summarize_sessions(
+    per_session: Dict[int, Dict[str, Any]],
+    session_dates: Iterable[date],
+) -> Dict[str, float | None]:
+    """Global averages over a ``per_session`` mapping.
+
+    ``session_dates`` cover all sessions of the period, including those
+    without sets; they only count towards ``avg_sessions_per_week``.
+    """
+    session_dates = list(session_dates)
     durations = [
         s["duration_minutes"]
         for s in per_session.values()
@@ -135,17 +135,13 @@ def compute_session_metrics(input: MetricsInput) -> Dict[str, Any]:
         for s in per_session.values()
         if s["avg_intensity"] is not None
     ]
-    weeks = {session.session_date.isocalendar()[:2] for session in input.sessions}
+    weeks = {session_date.isocalendar()[:2] for session_date in session_dates}
 
-    global_metrics = {
+    return {
         "avg_session_duration": mean(durations) if durations else None,
         "avg_volume_per_session": mean(volumes) if volumes else None,
         "avg_sets_per_session": mean(sets_counts) if sets_counts else None,
-        "avg_sessions_per_week": (len(input.sessions) / len(weeks) if weeks else None),
+        "avg_sessions_per_week": (len(session_dates) / len(weeks) if weeks else None),
         "avg_intensity": mean(intensities) if intensities else None,
     }
 
-    return {
-        "per_session": per_session,
-        "global": global_metrics,
-    }
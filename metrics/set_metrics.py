@@ -5,27 +5,23 @@ This module computes global metrics describing training quality,
 intensity, effort, and load across all performed sets.
 """
 
-from statistics import mean
 from typing import Dict, Any
 
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
-from metrics.utils import (
-    is_duration_set,
-    set_duration_seconds,
-    set_estimated_1rm,
-    set_reps,
-    set_volume,
-    set_weight,
-)
+from metrics.utils import exact_mean, ordered_sum
 
 
-def compute_set_metrics(input: MetricsInput) -> Dict[str, Any]:
+def compute_set_metrics(input: MetricsInput, index: MetricsIndex | None = None) -> Dict[str, Any]:
     """Compute global set-level training metrics.
 
     Parameters
     ----------
     input : MetricsInput
         Normalized training data loaded from the database.
+    index : MetricsIndex, optional
+        Shared join index; its per-set arrays are built from ``input`` when
+        omitted. Set metrics need no joins.
 
     Returns
     -------
@@ -33,46 +29,44 @@ def compute_set_metrics(input: MetricsInput) -> Dict[str, Any]:
         Dictionary with aggregated set-level metrics.
     """
 
-    sets = input.sets
-    if not sets:
+    index = index or MetricsIndex(input)
+    arrays = index.set_arrays
+    total_sets = len(arrays.reps)
+    if not total_sets:
         return {}
 
-    total_sets = len(sets)
-    strength_sets = [s for s in sets if not is_duration_set(s)]
-    total_reps = sum(set_reps(s) for s in strength_sets)
-    total_volume = sum(set_volume(s) for s in sets)
-    total_duration_seconds = sum(set_duration_seconds(s) for s in sets)
+    strength = ~arrays.is_duration
+    strength_count = int(strength.sum())
+    total_reps = int(arrays.reps[strength].sum())
+    total_volume = ordered_sum(arrays.volume)
+    total_duration_seconds = int(arrays.duration_seconds.sum())
 
-    weights = [set_weight(s) for s in strength_sets]
-    avg_weight = mean(weights) if weights else None
-    max_weight = max(weights) if weights else None
+    weights = arrays.weight[strength]
+    avg_weight = exact_mean(weights)
+    max_weight = float(weights.max()) if len(weights) else None
 
-    rirs = [s.rir for s in sets if s.rir is not None]
-    avg_rir = mean(rirs) if rirs else None
+    rirs = arrays.rir
+    avg_rir = exact_mean(rirs, integer=True)
 
     rir_distribution = {
-        "rir_0": sum(1 for s in sets if s.rir == 0),
-        "rir_1": sum(1 for s in sets if s.rir == 1),
-        "rir_2": sum(1 for s in sets if s.rir == 2),
-        "rir_3_plus": sum(1 for s in sets if s.rir is not None and s.rir >= 3),
+        "rir_0": int((rirs == 0).sum()),
+        "rir_1": int((rirs == 1).sum()),
+        "rir_2": int((rirs == 2).sum()),
+        "rir_3_plus": int((rirs >= 3).sum()),
     }
 
     sets_to_failure = rir_distribution["rir_0"]
     failure_ratio = sets_to_failure / total_sets
 
-    one_rms = [
-        estimated_1rm
-        for s in strength_sets
-        if (estimated_1rm := set_estimated_1rm(s)) is not None
-    ]
-    avg_estimated_1rm = mean(one_rms) if one_rms else None
-    max_estimated_1rm = max(one_rms) if one_rms else None
+    one_rms = arrays.estimated_1rm[strength]
+    avg_estimated_1rm = exact_mean(one_rms)
+    max_estimated_1rm = float(one_rms.max()) if len(one_rms) else None
 
-    avg_reps_per_set = total_reps / len(strength_sets) if strength_sets else None
+    avg_reps_per_set = total_reps / strength_count if strength_count else None
     if max_estimated_1rm is not None:
         heavy_threshold = 0.8 * max_estimated_1rm
-        heavy_sets = sum(1 for orm in one_rms if orm >= heavy_threshold)
-        heavy_set_ratio = heavy_sets / len(strength_sets) if strength_sets else None
+        heavy_sets = int((one_rms >= heavy_threshold).sum())
+        heavy_set_ratio = heavy_sets / strength_count if strength_count else None
     else:
         heavy_set_ratio = None
 
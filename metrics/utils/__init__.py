@@ -1,4 +1,6 @@
 from .strength import estimate_1rm
+from .reductions import exact_mean, ordered_sum
+from .set_arrays import SetArrays, compute_set_arrays
 from .set_values import (
     is_duration_set,
     set_duration_seconds,
@@ -11,8 +13,12 @@ from .set_values import (
 )
 
 __all__ = [
+    "SetArrays",
+    "compute_set_arrays",
     "estimate_1rm",
+    "exact_mean",
     "is_duration_set",
+    "ordered_sum",
     "set_duration_seconds",
     "set_effective_sets",
     "set_estimated_1rm",
@@ -0,0 +1,51 @@
+"""
+Reductions that reproduce the per-object metric code bit for bit.
+
+``statistics.mean`` returns the float nearest to the exact mean of its
+inputs (and an ``int`` for integers that divide evenly), and the per-object
+metrics summed floats one set at a time in logged order. NumPy and pandas
+reductions round in a different order, so their results can differ in the
+last bit. Vectorized metrics use these helpers for the values they report.
+"""
+
+from __future__ import annotations
+
+import math
+from fractions import Fraction
+
+import numpy as np
+
+
+def exact_mean(values: np.ndarray, integer: bool = False) -> int | float | None:
+    """``statistics.mean`` of the non-NaN ``values`` (None if there are none).
+
+    With ``integer`` the values are treated as ints, as ``statistics.mean``
+    does for ``int`` inputs: the result is an ``int`` when the mean is whole.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[~np.isnan(values)]
+    if not len(values):
+        return None
+    if integer:
+        mean = Fraction(int(values.astype(np.int64).sum()), len(values))
+        return int(mean) if mean.denominator == 1 else float(mean)
+    return float(_exact_sum(values) / len(values))
+
+
+def ordered_sum(values: np.ndarray) -> float:
+    """Sum of float ``values`` added one at a time, in array order."""
+    return float(sum(np.asarray(values, dtype=np.float64).tolist(), 0.0))
+
+
+def _exact_sum(values: np.ndarray) -> Fraction:
+    """The exact sum of finite floats.
+
+    ``math.fsum`` returns the correctly rounded sum; subtracting it and
+    summing again yields the next lower-order term until nothing is left.
+    """
+    terms = values.tolist()
+    total = Fraction(0)
+    while partial := math.fsum(terms):
+        total += Fraction(partial)
+        terms.append(-partial)
+    return total
@@ -0,0 +1,57 @@
+"""
+Vectorized counterparts of :mod:`metrics.utils.set_values`.
+
+Each array follows the same rules as the scalar helper of the same name:
+missing or NaN numbers count as zero, duration sets have no volume,
+intensity or estimated 1RM, and timed sets count as ``duration / 30``
+effective sets.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from metrics.columnar import SetColumns
+
+
+@dataclass(frozen=True, eq=False)
+class SetArrays:
+    reps: np.ndarray
+    weight: np.ndarray
+    duration_seconds: np.ndarray
+    is_duration: np.ndarray
+    volume: np.ndarray
+    intensity: np.ndarray
+    estimated_1rm: np.ndarray
+    effective_sets: np.ndarray
+    rir: np.ndarray
+
+
+def compute_set_arrays(columns: SetColumns) -> SetArrays:
+    """Derive per-set values for every set in ``columns`` at once.
+
+    ``intensity`` and ``estimated_1rm`` are NaN where the scalar helpers
+    return ``None``; ``rir`` keeps NaN for missing values.
+    """
+    reps = columns.repetitions.astype(np.int64, copy=False)
+    weight = np.nan_to_num(columns.weight.astype(np.float64, copy=False), nan=0.0)
+    duration_seconds = np.trunc(np.nan_to_num(columns.duration_seconds, nan=0.0)).astype(np.int64)
+    is_duration = duration_seconds > 0
+
+    volume = np.where(is_duration, 0.0, reps * weight)
+    estimated_1rm = np.where(is_duration, np.nan, weight * (1 + reps / 30))
+    effective_sets = np.where(duration_seconds != 0, duration_seconds / 30, 1.0)
+
+    return SetArrays(
+        reps=reps,
+        weight=weight,
+        duration_seconds=duration_seconds,
+        is_duration=is_duration,
+        volume=volume,
+        intensity=estimated_1rm,
+        estimated_1rm=estimated_1rm,
+        effective_sets=effective_sets,
+        rir=columns.rir.astype(np.float64, copy=False),
+    )
@@ -0,0 +1,144 @@
+"""
+On-disk dataset snapshot.
+
+Persists the frames ``DatasetSync`` keeps in memory (training tables and
+reference data) as Arrow IPC files, so a restarted process can serve its
+first page from a local file read instead of the full database load.
+
+A snapshot is a directory with one ``<frame>-<token>.arrow`` file per frame
+and ``manifest.json``, the header: snapshot format, a hash of the source
+database URL, the sync watermark, the dataset fingerprint (see
+``db.queries.get_dataset_fingerprint``) and the columns of every frame.
+Every Arrow file also carries the format and frame name in its schema
+metadata. The manifest is replaced atomically after all frames are written,
+so readers never see a half-written snapshot; a snapshot whose header does
+not match the current format, source or expected columns is ignored.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import uuid
+from pathlib import Path
+from typing import Any, Dict, NamedTuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT = 1
+DEFAULT_SNAPSHOT_DIR = Path(__file__).resolve().parent / ".cache" / "dataset_snapshot"
+
+_MANIFEST = "manifest.json"
+
+
+class Snapshot(NamedTuple):
+    """Contents of one snapshot."""
+
+    tables: Dict[str, pd.DataFrame]
+    reference: Dict[str, pd.DataFrame]
+    watermark: Any
+    fingerprint: Dict[str, list]
+
+
+class DatasetSnapshot:
+    """Snapshot directory for one source database.
+
+    Parameters
+    ----------
+    directory : str or Path
+        Where the snapshot files live; created on first save.
+    source : str
+        Identifies the database (e.g. its URL without password). A snapshot
+        written for another source is never loaded.
+    """
+
+    def __init__(self, directory: str | Path, source: str) -> None:
+        self.directory = Path(directory)
+        self.source = hashlib.sha256(source.encode()).hexdigest()
+
+    def load(self, expected_columns: Dict[str, tuple[str, ...]] | None = None) -> Snapshot | None:
+        """Read the snapshot, or None if it is missing, stale or unreadable.
+
+        ``expected_columns`` maps frame names to the columns they must have.
+        """
+        try:
+            manifest = json.loads((self.directory / _MANIFEST).read_text())
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            logger.warning("Unreadable dataset snapshot manifest in %s", self.directory, exc_info=True)
+            return None
+
+        if manifest.get("format") != SNAPSHOT_FORMAT or manifest.get("source") != self.source:
+            return None
+        for name, columns in (expected_columns or {}).items():
+            frame = manifest["frames"].get(name)
+            if frame is None or tuple(frame["columns"]) != tuple(columns):
+                return None
+
+        try:
+            frames = {
+                name: feather.read_feather(self.directory / frame["file"])
+                for name, frame in manifest["frames"].items()
+            }
+        except (OSError, pa.ArrowException):
+            logger.warning("Unreadable dataset snapshot in %s", self.directory, exc_info=True)
+            return None
+
+        return Snapshot(
+            tables={name: frames[name] for name in manifest["tables"]},
+            reference={name: frames[name] for name in manifest["reference"]},
+            watermark=pd.Timestamp(manifest["watermark"]).to_pydatetime(),
+            fingerprint=manifest["fingerprint"],
+        )
+
+    def save(self, snapshot: Snapshot) -> None:
+        """Write ``snapshot``, replacing the previous one."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex[:12]
+        frames = {**snapshot.tables, **snapshot.reference}
+
+        entries = {}
+        for name, frame in frames.items():
+            file_name = f"{name}-{token}.arrow"
+            table = pa.Table.from_pandas(frame.reset_index(drop=True), preserve_index=False)
+            table = table.replace_schema_metadata(
+                {
+                    **(table.schema.metadata or {}),
+                    b"snapshot_format": str(SNAPSHOT_FORMAT).encode(),
+                    b"snapshot_frame": name.encode(),
+                }
+            )
+            feather.write_feather(table, self.directory / file_name)
+            entries[name] = {"file": file_name, "columns": list(frame.columns), "rows": len(frame)}
+
+        manifest = {
+            "format": SNAPSHOT_FORMAT,
+            "source": self.source,
+            "created_at": pd.Timestamp.now(tz="UTC").isoformat(),
+            "watermark": pd.Timestamp(snapshot.watermark).isoformat(),
+            "fingerprint": snapshot.fingerprint,
+            "tables": list(snapshot.tables),
+            "reference": list(snapshot.reference),
+            "frames": entries,
+        }
+        temporary = self.directory / f"{_MANIFEST}.{token}.tmp"
+        temporary.write_text(json.dumps(manifest, indent=2))
+        os.replace(temporary, self.directory / _MANIFEST)
+        self._remove_stale_files(keep={entry["file"] for entry in entries.values()})
+
+    def clear(self) -> None:
+        """Delete the snapshot."""
+        self._remove_stale_files(keep=set())
+        (self.directory / _MANIFEST).unlink(missing_ok=True)
+
+    def _remove_stale_files(self, keep: set[str]) -> None:
+        for path in self.directory.glob("*.arrow"):
+            if path.name not in keep:
+                path.unlink(missing_ok=True)
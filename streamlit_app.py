@@ -33,15 +33,25 @@ Key Design Principles:
   - Single responsibility: each module has one clear concern
 """
 
+import os
+from functools import partial
 from pathlib import Path
 
 import pandas as pd
 import streamlit as st
 
-from data_loader import load_data
+import data_version
+from change_watch import DEFAULT_POLL_INTERVAL, ChangeWatcher
+from data_loader import LoadedData, RollupData
+from data_sync import DatasetSync, RollupSync
+from db.connection import get_engine
+from mapped_dataset import DEFAULT_MAPPED_DIR, MappedDataset
+from metrics.cache import MetricsCache
+from metrics.date_filter import DateFilter
 from metrics.input import MetricsInput
-
-from metrics.metrics_engine import compute_all_metrics
+from metrics.metrics_engine import LazyMetrics
+from metrics.rollups import rollup_metric_sources
+from snapshot import DEFAULT_SNAPSHOT_DIR, DatasetSnapshot
 
 from ui.sidebar_view import SidebarView
 from ui.dashboard_view import DashboardView
@@ -52,10 +62,79 @@ from ui.body_metrics_view import BodyMetricsView
 from ui.utils.data_filter import filter_data_by_month
 
 
-@st.cache_data(ttl=300, show_spinner="Loading workout data…")
-def _load_data_cached() -> tuple[MetricsInput, pd.DataFrame]:
-    """Load and cache application data with a 5-minute TTL."""
-    return load_data()
+@st.cache_resource
+def _dataset_sync() -> DatasetSync:
+    """Process-wide in-memory dataset, kept current by incremental refreshes."""
+    return DatasetSync(workers=_load_workers(), snapshot=_dataset_snapshot(), mapped=_mapped_dataset())
+
+@st.cache_resource
+def _rollup_sync() -> RollupSync:
+    """Process-wide SQL rollups for AGGREGATION_MODE=sql, refreshed like the dataset."""
+    return RollupSync(workers=_load_workers())
+
+def _dataset_snapshot() -> DatasetSnapshot | None:
+    """On-disk snapshot in SNAPSHOT_DIR (default .cache/dataset_snapshot; "off" disables)."""
+    directory = os.getenv("SNAPSHOT_DIR") or DEFAULT_SNAPSHOT_DIR
+    if str(directory).lower() == "off":
+        return None
+    return DatasetSnapshot(directory, source=get_engine().url.render_as_string(hide_password=True))
+
+def _mapped_dataset() -> MappedDataset | None:
+    """Column files shared by all app processes, in MAPPED_DATASET_DIR (default .cache/mapped_dataset; "off" disables)."""
+    directory = os.getenv("MAPPED_DATASET_DIR") or DEFAULT_MAPPED_DIR
+    if str(directory).lower() == "off":
+        return None
+    return MappedDataset(directory)
+
+DATA_MAX_AGE_SECONDS = 3600
+
+@st.cache_resource
+def _change_watcher() -> ChangeWatcher:
+    """Process-wide database change detector (LISTEN/NOTIFY, else fingerprint polling)."""
+    return ChangeWatcher(
+        get_engine(),
+        poll_interval=_change_poll_interval(),
+        background_poll=_refresh_mode() == "background",
+    )
+
+def _load_data() -> LoadedData:
+    """The process-wide dataset, shared by every session and rerun without copying.
+
+    ``DatasetSync.serve`` refreshes it when the ``ChangeWatcher`` token moves
+    (a write by this or another replica, or a script), after a write through
+    ``DataManager`` in this process, or once it is an hour old; the hourly
+    refresh only backs up polling, which does not see in-place updates. With
+    REFRESH_MODE=background the refresh runs on a background thread and
+    reruns keep the previous dataset until it is done.
+
+    The first call restores the on-disk snapshot (or loads the full
+    dataset); later refreshes fetch only rows changed since the previous one
+    (see ``data_sync``).
+    """
+    return _serve(_dataset_sync(), "Loading workout data…")
+
+def _load_rollups() -> RollupData:
+    """The process-wide rollups of AGGREGATION_MODE=sql, served like ``_load_data``."""
+    return _serve(_rollup_sync(), "Loading training rollups…")
+
+def _serve(sync: DatasetSync, message: str):
+    serve = partial(
+        sync.serve,
+        _change_watcher().token(),
+        max_age=DATA_MAX_AGE_SECONDS,
+        background=_refresh_mode() == "background",
+    )
+    if sync.data is None:
+        with st.spinner(message):
+            return serve()
+    return serve()
+
+@st.cache_resource
+def _metrics_cache() -> MetricsCache:
+    """Process-wide LRU of filtered data and metrics, cleared on every DataManager write."""
+    cache = MetricsCache(maxsize=32)
+    data_version.subscribe(cache.invalidate)
+    return cache
 
 def _configure_page() -> None:
     """Configure Streamlit page settings (title, layout, sidebar state)."""
@@ -75,31 +154,155 @@ def _load_global_styles() -> None:
     else:
         st.error(f"CSS NOT FOUND: {css_path}")
 
-def _compute_metrics(input_data: MetricsInput) -> dict:
-    """Compute all domain metrics from filtered input data.
+VIEW_CLASSES = {
+    "Main Dashboard": DashboardView,
+    "Exercises": ExerciseView,
+    "Body Parts": BodyPartsView,
+    "Analytics": AnalyticsView,
+    "Body Metrics": BodyMetricsView,
+}
+
+# Pages that read no sets and only rollup metric groups; with
+# AGGREGATION_MODE=sql they are served from RollupData without loading sets.
+ROLLUP_PAGES = ("Body Parts",)
+
+def _filtered_metrics(
+    data: LoadedData,
+    period: DateFilter,
+    rollups: RollupData | None = None,
+) -> tuple[pd.DataFrame, LazyMetrics]:
+    """Filter the dataset and wrap it in LazyMetrics, memoized per (dataset version, filter).
+    
+    Reruns that change neither the data nor the period (expanders, exercise
+    selection, editors) reuse the cached entry, including every metric group
+    already computed for it. The key includes the resolved date bounds, so a
+    rolling window moves on to a new entry when the day changes.
+
+    With ``rollups`` (AGGREGATION_MODE=sql) the session, frequency and
+    body-part groups are computed from the rollups of the period instead of
+    from its sets; the rollups' version is part of the key.
+    
+    Returns:
+        Filtered sets DataFrame and the LazyMetrics mapping for the filtered input
+    """
+    def _compute() -> tuple[pd.DataFrame, LazyMetrics]:
+        filtered_input, filtered_sets_df = filter_data_by_month(
+            data.metrics_input, data.sets_df, period, data.partitions,
+        )
+        sources = None
+        if rollups is not None:
+            sources = rollup_metric_sources(
+                partial(rollups.partitions.get, period),
+                filtered_input.exercises,
+                filtered_input.exercise_muscle_targets,
+            )
+        return filtered_sets_df, LazyMetrics(filtered_input, sources=sources)
+
+    rollups_version = None if rollups is None else rollups.version
+    return _metrics_cache().get_or_compute(
+        (data.version, rollups_version, period, period.bounds()), _compute
+    )
+
+def _rollup_metrics(rollups: RollupData, period: DateFilter) -> LazyMetrics:
+    """LazyMetrics whose rollup groups come from ``rollups`` only, memoized per (rollups version, filter).
+
+    The metrics input holds no sessions or sets; a rollup group whose
+    source fails is therefore empty instead of falling back to the sets.
+    """
+    def _compute() -> LazyMetrics:
+        empty = MetricsInput(
+            sessions=[],
+            workout_exercises=[],
+            sets=[],
+            exercises=rollups.exercises,
+            exercise_muscle_targets=rollups.exercise_muscle_targets,
+            muscle_groups=[],
+            body_measurements=[],
+            body_composition=[],
+        )
+        sources = rollup_metric_sources(
+            partial(rollups.partitions.get, period), rollups.exercises, rollups.exercise_muscle_targets
+        )
+        return LazyMetrics(empty, sources=sources)
+
+    return _metrics_cache().get_or_compute(("rollups", rollups.version, period, period.bounds()), _compute)
+
+def _compute_metrics(metrics: LazyMetrics, names: tuple[str, ...]) -> LazyMetrics:
+    """Compute the metric groups a view needs.
     
     Args:
-        input_data: MetricsInput with filtered session/exercise/body data
+        metrics: LazyMetrics for the filtered input data
+        names: Metric groups to compute up front (a view's REQUIRED_METRICS)
     
     Returns:
-        Dictionary containing all computed metrics by domain:
-        - sessions: Session-level metrics
-        - exercises: Exercise-level metrics  
-        - progress: Strength progress metrics
-        - fatigue: Fatigue and recovery metrics
-        - body: Body composition and measurement metrics
+        The same LazyMetrics mapping by domain (sessions, exercises, progress,
+        fatigue, body, ...). Groups in ``names`` are already computed; any other
+        group is computed on first access and memoized with the cache entry.
+    """
+    return metrics.prefetch(names, workers=_metrics_workers())
+
+def _refresh_mode() -> str:
+    """How the dataset is refreshed, from REFRESH_MODE ("blocking" or "background").
+
+    In background mode reruns never wait for the database after the first
+    load: the previous dataset is served while ``DatasetSync.serve`` syncs
+    it on a background thread.
     """
-    return compute_all_metrics(input_data)
+    return os.getenv("REFRESH_MODE", "blocking").strip().lower()
+
+def _aggregation_mode() -> str:
+    """Where aggregate-only metric groups are computed, from AGGREGATION_MODE ("python" or "sql")."""
+    return os.getenv("AGGREGATION_MODE", "python").strip().lower()
+
+def _change_poll_interval() -> float:
+    """Seconds between change probes when polling, from CHANGE_POLL_SECONDS (default 15)."""
+    try:
+        return float(os.getenv("CHANGE_POLL_SECONDS") or DEFAULT_POLL_INTERVAL)
+    except ValueError:
+        return DEFAULT_POLL_INTERVAL
+
+def _metrics_workers() -> int | None:
+    """Process pool size for metric computation from METRICS_WORKERS (unset = sequential)."""
+    return _env_workers("METRICS_WORKERS")
+
+def _load_workers() -> int | None:
+    """Thread pool size for concurrent load queries from LOAD_WORKERS (unset = sequential)."""
+    return _env_workers("LOAD_WORKERS")
+
+def _env_workers(name: str) -> int | None:
+    value = os.getenv(name)
+    try:
+        return int(value) if value else None
+    except ValueError:
+        return None
+
+def _rollup_page(page: str) -> bool:
+    """Whether ``page`` is served from rollups alone (AGGREGATION_MODE=sql and a ROLLUP_PAGES page)."""
+    return _aggregation_mode() == "sql" and page in ROLLUP_PAGES
+
+def _build_view(page: str, metrics: LazyMetrics, sets_df: pd.DataFrame | None, period: DateFilter):
+    """Construct only the view for the selected page."""
+    if page == "Main Dashboard":
+        return DashboardView(metrics, sets_df)
+    if page == "Exercises":
+        return ExerciseView(metrics["exercises"], sets_df)
+    if page == "Body Parts":
+        exercises = metrics["exercises"] if "exercises" in metrics.computed else None
+        return BodyPartsView(exercises, period, metrics["body_parts"])
+    if page == "Analytics":
+        return AnalyticsView(metrics)
+    return BodyMetricsView(metrics["body"])
 
 def main() -> None:
     """
     Application entry point orchestrating the complete data and view pipeline.
 
     Execution order on every Streamlit widget interaction or rerun:
-      1. Load cached data            — database is queried once per TTL (300s)
-      2. Render sidebar              — month filter and navigation controls
-      3. Filter application data     — slice to selected month
-      4. Compute all metrics         — process filtered data through metrics layer
+      1. Load cached data            — changes are synced from the database when a write,
+                                       a change notification or a polled fingerprint says so
+      2. Render sidebar              — period filter and navigation controls
+      3. Filter application data     — slice to selected period (cached per data version)
+      4. Compute view metrics        — only the groups the selected view declares
       5. Render selected view        — display pre-computed metrics
 
     Architecture:
@@ -109,33 +312,28 @@ def main() -> None:
     """
     _load_global_styles()
 
+    sidebar = SidebarView()
+    rollup_page = _rollup_page(sidebar.selected_page())
     try:
-        raw_input_data, sets_dataframe = _load_data_cached()
+        rollups = _load_rollups() if _aggregation_mode() == "sql" else None
+        data = rollups if rollup_page else _load_data()
     except Exception as exc:
         st.error(f"Failed to load data: {exc}")
         st.stop()
 
-    sidebar = SidebarView()
-    selected_month = sidebar.render_filters(sets_dataframe)
-
-    filtered_input, filtered_sets_dataframe = filter_data_by_month(
-        raw_input_data, sets_dataframe, selected_month,
-    )
+    period = sidebar.render_filters(data.partitions)
 
-    metrics = _compute_metrics(filtered_input)
+    if rollup_page:
+        filtered_sets_dataframe, metrics = None, _rollup_metrics(rollups, period)
+    else:
+        filtered_sets_dataframe, metrics = _filtered_metrics(data, period, rollups)
 
     selected_page = sidebar.render_navigation()
 
-    views = {
-        "Main Dashboard": DashboardView(metrics, filtered_sets_dataframe),
-        "Exercises": ExerciseView(metrics["exercises"], filtered_sets_dataframe),
-        "Body Parts": BodyPartsView(metrics["exercises"], selected_month),
-        "Analytics": AnalyticsView(metrics),
-        "Body Metrics": BodyMetricsView(metrics["body"]),
-    }
-
-    views[selected_page].render()
+    metrics = _compute_metrics(metrics, VIEW_CLASSES[selected_page].REQUIRED_METRICS)
+    _build_view(selected_page, metrics, filtered_sets_dataframe, period).render()
     sidebar.render_upload()
+    sidebar.render_performance(data.load_report, metrics.report.to_dict())
 
     st.markdown('<div class="app-footer">All data shown are my personal workout and body measurements, used solely for the purposes of this project.</div>', unsafe_allow_html=True,)
 
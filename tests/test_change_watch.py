@@ -0,0 +1,137 @@
+import time
+from threading import Event
+from types import SimpleNamespace
+
+import pandas as pd
+from sqlalchemy import create_engine
+
+import change_watch
+from change_watch import ChangeWatcher
+
+
+class _Probe:
+    """Fingerprint query stand-in with a settable row count."""
+
+    def __init__(self):
+        self.row_count = 10
+        self.calls = 0
+        self.fail = False
+
+    def __call__(self):
+        self.calls += 1
+        if self.fail:
+            raise RuntimeError("database unavailable")
+        return pd.DataFrame(
+            {"table_name": ["workout_sets"], "row_count": [self.row_count], "max_key": [str(self.row_count)]}
+        )
+
+
+def test_polling_token_changes_only_when_the_fingerprint_changes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("change_watch.time.monotonic", lambda: now[0])
+    probe = _Probe()
+    watcher = ChangeWatcher(create_engine("sqlite://"), poll_interval=15, probe=probe)
+
+    first = watcher.token()
+    now[0] += 20
+    assert watcher.token() == first
+
+    probe.row_count = 11
+    now[0] += 5
+    assert watcher.token() == first
+    now[0] += 15
+    assert watcher.token() != first
+    assert watcher.mode == "poll"
+    assert probe.calls == 3
+
+
+def test_failed_probe_keeps_the_previous_token(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("change_watch.time.monotonic", lambda: now[0])
+    probe = _Probe()
+    watcher = ChangeWatcher(create_engine("sqlite://"), poll_interval=0, probe=probe)
+
+    first = watcher.token()
+    probe.fail = True
+    now[0] += 1
+
+    assert watcher.token() == first
+
+
+class _ListenConnection:
+    """psycopg2 connection stand-in whose next poll fails once ``dropped`` is set."""
+
+    def __init__(self):
+        self.dropped = Event()
+        self.notifies = []
+        self.autocommit = False
+
+    def cursor(self):
+        return self
+
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return (True,)
+
+    def poll(self):
+        if self.dropped.is_set():
+            raise OSError("server closed the connection unexpectedly")
+
+    def close(self):
+        pass
+
+
+class _ListenEngine:
+    dialect = SimpleNamespace(name="postgresql")
+
+    def __init__(self):
+        self.connections = []
+        self.refuse = 0
+
+    def raw_connection(self):
+        if self.refuse:
+            self.refuse -= 1
+            raise OSError("connection refused")
+        connection = _ListenConnection()
+        self.connections.append(connection)
+        return SimpleNamespace(detach=lambda: None, dbapi_connection=connection)
+
+
+def _always_readable(readable, writable, exceptional, timeout):
+    time.sleep(0.005)
+    return readable, [], []
+
+
+def _wait_for(condition):
+    deadline = time.monotonic() + 5
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert condition()
+
+
+def test_lost_listener_is_restored_with_backoff(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr("change_watch.time.monotonic", lambda: now[0])
+    monkeypatch.setattr(change_watch, "select", SimpleNamespace(select=_always_readable))
+    engine = _ListenEngine()
+    watcher = ChangeWatcher(engine, poll_interval=0, probe=_Probe())
+    try:
+        assert watcher.mode == "notify"
+
+        engine.refuse = 1
+        engine.connections[0].dropped.set()
+        _wait_for(lambda: watcher.mode == "poll")
+        assert watcher.token()[0] == "poll"
+
+        now[0] += 1
+        assert watcher.token()[0] == "poll"
+        now[0] += 1
+        assert watcher.token()[0] == "poll"
+        now[0] += 1
+        assert watcher.token()[0] == "notify"
+        assert watcher.mode == "notify"
+        assert len(engine.connections) == 2
+    finally:
+        watcher.stop()
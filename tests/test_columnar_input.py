@@ -0,0 +1,114 @@
+import pickle
+from datetime import date, time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metrics.columnar import (
+    ColumnarMetricsInput,
+    SetColumns,
+    WorkoutExerciseColumns,
+    read_only_frame,
+    to_columnar,
+)
+from metrics.metrics_engine import compute_all_metrics
+
+
+def test_columnar_input_round_trips_domain_objects(sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+
+    assert columnar.set_columns.weight.dtype == np.float64
+    assert columnar.session_columns.session_date.dtype == np.dtype("datetime64[D]")
+    assert columnar.sessions == sample_input.sessions
+    assert columnar.workout_exercises == sample_input.workout_exercises
+    assert columnar.sets == sample_input.sets
+    assert to_columnar(columnar) is columnar
+
+
+def test_columnar_input_builds_from_frames_with_missing_values():
+    columnar = ColumnarMetricsInput.from_frames(
+        sessions_df=pd.DataFrame(
+            [
+                {"session_id": 1, "session_date": pd.Timestamp("2026-05-01"), "start_time": time(10, 0), "end_time": None},
+            ]
+        ),
+        workout_exercises_df=pd.DataFrame(
+            [{"workout_exercise_id": 101, "session_id": 1, "exercise_id": 1}]
+        ),
+        sets_df=pd.DataFrame(
+            [
+                {"workout_exercise_id": 101, "set_number": 1, "repetitions": 10, "weight": 100.0, "rir": None, "duration_seconds": None},
+                {"workout_exercise_id": 101, "set_number": 2, "repetitions": 45, "weight": 0.0, "rir": 1, "duration_seconds": 45},
+            ]
+        ),
+        exercises=[],
+        exercise_muscle_targets=[],
+        muscle_groups=[],
+        body_measurements=[],
+        body_composition=[],
+    )
+
+    session = columnar.sessions[0]
+    assert session.session_date == date(2026, 5, 1)
+    assert session.start_time == time(10, 0)
+    assert session.end_time is None
+    assert [s.rir for s in columnar.sets] == [None, 1]
+    assert [s.duration_seconds for s in columnar.sets] == [None, 45]
+
+
+def test_columnar_input_drops_rows_with_missing_ids_instead_of_filling_zero(caplog):
+    with caplog.at_level("WARNING", logger="metrics.columnar"):
+        workout_exercises = WorkoutExerciseColumns.from_frame(
+            pd.DataFrame({"workout_exercise_id": [101, 102], "session_id": [1, 1], "exercise_id": [1, None]})
+        )
+        sets = SetColumns.from_frame(
+            pd.DataFrame(
+                {
+                    "workout_exercise_id": [None, 101, "x"],
+                    "set_number": [1, None, 3],
+                    "repetitions": [5, None, 5],
+                    "weight": [100.0, 0.0, 100.0],
+                }
+            )
+        )
+
+    assert list(workout_exercises.workout_exercise_id) == [101]
+    assert list(workout_exercises.exercise_id) == [1]
+    assert list(sets.workout_exercise_id) == [101]
+    assert list(sets.set_number) == [0]
+    assert list(sets.repetitions) == [0]
+    assert len(caplog.records) == 2
+
+
+def test_columnar_input_pickles_arrays_without_materialized_lists(sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    assert columnar.sets
+
+    restored = pickle.loads(pickle.dumps(columnar))
+
+    assert "sets" not in restored.__dict__
+    assert restored.sets == sample_input.sets
+    assert compute_all_metrics(restored) == compute_all_metrics(sample_input)
+
+
+def test_read_only_frame_rejects_in_place_writes_without_copying():
+    frame = pd.DataFrame(
+        {
+            "session_date": pd.to_datetime(["2026-05-01", "2026-05-08"]),
+            "exercise_name": ["Bench Press", "Row"],
+            "weight": [100.0, 60.0],
+            "repetitions": [10, 12],
+        }
+    )
+
+    shared = read_only_frame(frame)
+
+    assert shared.dtypes.equals(frame.dtypes)
+    assert np.shares_memory(shared["weight"].to_numpy(), frame["weight"].to_numpy())
+    with pytest.raises(ValueError):
+        shared.loc[0, "weight"] = 0.0
+    with pytest.raises(ValueError):
+        shared.iloc[1, 3] = 0
+    assert shared[shared["weight"] > 80].assign(weight=0.0)["weight"].tolist() == [0.0]
+    assert shared["weight"].tolist() == [100.0, 60.0]
@@ -0,0 +1,70 @@
+import threading
+import time
+
+import pandas as pd
+
+from data_loader import run_queries, split_training_rows
+from instrumentation import PerformanceReport
+
+
+def _training_rows() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "session_id": [2, 2, 2, 1, 3],
+            "session_date": ["2026-05-08", "2026-05-08", "2026-05-08", "2026-05-01", "2026-04-20"],
+            "start_time": ["18:00:00"] * 5,
+            "end_time": ["19:00:00"] * 5,
+            "workout_exercise_id": [21.0, 21.0, 20.0, 10.0, None],
+            "exercise_id": [2.0, 2.0, 1.0, 1.0, None],
+            "exercise_name": ["Bench", "Bench", "Squat", None, None],
+            "body_part": ["Chest", "Chest", "Legs", None, None],
+            "set_id": [5.0, 6.0, None, 1.0, None],
+            "set_number": [1.0, 2.0, None, 1.0, None],
+            "repetitions": [8.0, 6.0, None, 5.0, None],
+            "weight": [80.0, 85.0, None, 100.0, None],
+            "duration_seconds": [None, None, None, None, None],
+            "volume": [640.0, 510.0, None, 500.0, None],
+            "rir": [2.0, 1.0, None, 3.0, None],
+        }
+    )
+
+
+def test_split_training_rows_derives_every_frame_from_one_join():
+    frames = split_training_rows(_training_rows())
+
+    assert list(frames.sessions["session_id"]) == [2, 1, 3]
+    assert frames.sessions["session_date"].dtype.kind == "M"
+    assert list(frames.workout_exercises["workout_exercise_id"]) == [10, 20, 21]
+    assert frames.workout_exercises["exercise_id"].dtype == "int64"
+    assert list(frames.sets_raw["workout_exercise_id"]) == [10, 21, 21]
+    assert frames.sets_raw["set_number"].dtype == "int64"
+    assert frames.sets_raw["duration_seconds"].isna().all()
+
+
+def test_split_training_rows_ui_frame_keeps_query_order_and_columns():
+    sets_ui = split_training_rows(_training_rows()).sets_ui
+
+    assert list(sets_ui.columns) == [
+        "session_id", "set_id", "session_date", "exercise_name", "body_part", "set_number",
+        "repetitions", "weight", "duration_seconds", "volume", "rir",
+    ]
+    assert list(sets_ui["set_id"]) == [5, 6]
+    assert sets_ui["repetitions"].dtype == "int64"
+
+
+def testrun_queries_concurrently_times_each_query():
+    def _query(rows):
+        def run():
+            time.sleep(0.2)
+            return pd.DataFrame({"thread": [threading.get_ident()] * rows})
+        return run
+
+    report = PerformanceReport("load_data")
+    started = time.perf_counter()
+    results = run_queries(report, {"a": _query(1), "b": _query(2), "c": _query(3)}, workers=3)
+    elapsed = time.perf_counter() - started
+
+    assert list(results) == ["a", "b", "c"]
+    assert len({int(df["thread"].iloc[0]) for df in results.values()}) == 3
+    assert elapsed < 0.5
+    assert {s.stage: s.cardinalities["rows"] for s in report.stages} == {"a": 1, "b": 2, "c": 3}
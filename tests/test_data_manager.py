@@ -1,4 +1,8 @@
+import pytest
+
 from data_manager import DataManager
+from data_version import current_version
+from db.queries import ImportedWorkout, NewExercise
 
 
 def test_add_exercise_returns_insert_result(monkeypatch):
@@ -8,3 +12,32 @@ def test_add_exercise_returns_insert_result(monkeypatch):
     monkeypatch.setattr("data_manager.insert_exercise", lambda *args: False)
 
     assert manager.add_exercise("New Exercise", "Push", "Chest") is False
+
+
+def test_add_workout_bumps_version_only_after_a_successful_import(monkeypatch):
+    manager = object.__new__(DataManager)
+    manager.engine = object()
+    before = current_version()
+
+    def _fail(*args):
+        raise ValueError("Exercise not found: Squat")
+
+    monkeypatch.setattr("data_manager.insert_workout", _fail)
+    with pytest.raises(ValueError):
+        manager.add_workout("2026-05-01", [{"name": "Squat", "sets": []}])
+    assert current_version() == before
+
+    monkeypatch.setattr("data_manager.insert_workout", lambda *args: ImportedWorkout(7, [70], [[700]]))
+    assert manager.add_workout("2026-05-01", [{"name": "Bench Press", "sets": []}]).session_id == 7
+    assert current_version() == before + 1
+
+
+def test_add_exercises_bumps_version_once_for_the_batch(monkeypatch):
+    manager = object.__new__(DataManager)
+    manager.engine = object()
+    before = current_version()
+
+    monkeypatch.setattr("data_manager.insert_exercises", lambda engine, exercises: [53, 54])
+
+    assert manager.add_exercises([NewExercise("Row"), NewExercise("Plank")]) == [53, 54]
+    assert current_version() == before + 1
@@ -0,0 +1,452 @@
+import threading
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+
+from data_loader import join_training_tables, split_training_rows
+from data_sync import DatasetSync, RollupSync, apply_changes, changed_keys
+from data_version import bump_version
+from db.queries import SYNC_TABLES
+from mapped_dataset import MappedDataset
+from snapshot import DatasetSnapshot
+
+
+class _FakeManager:
+    """In-memory database with ``updated_at`` tracking and tombstones."""
+
+    def __init__(self):
+        self.now = datetime(2026, 5, 1, 12, 0)
+        self.fail_deltas = False
+        self.full_loads = 0
+        self.tables = {
+            "workout_sessions": pd.DataFrame(
+                {
+                    "session_id": [1, 2],
+                    "session_date": ["2026-04-20", "2026-05-01"],
+                    "start_time": [None, None],
+                    "end_time": [None, None],
+                }
+            ),
+            "workout_exercises": pd.DataFrame(
+                {"workout_exercise_id": [10, 20], "session_id": [1, 2], "exercise_id": [1, 2]}
+            ),
+            "workout_sets": pd.DataFrame(
+                {
+                    "set_id": [100, 101, 200],
+                    "workout_exercise_id": [10, 10, 20],
+                    "set_number": [1, 2, 1],
+                    "repetitions": [5, 5, 8],
+                    "weight": [100.0, 100.0, 60.0],
+                    "duration_seconds": [None, None, None],
+                    "rir": [1.0, 2.0, 0.0],
+                }
+            ),
+        }
+        for table in self.tables.values():
+            table["updated_at"] = self.now
+        self.deleted = pd.DataFrame({"table_name": [], "row_id": [], "deleted_at": []})
+        self.exercises = pd.DataFrame(
+            {"exercise_id": [1, 2], "exercise_name": ["Bench", "Squat"], "body_part": ["Chest", "Legs"]}
+        )
+
+    def __call__(self):
+        return self
+
+    def tick(self):
+        self.now += timedelta(hours=1)
+
+    def upsert(self, table, row):
+        key = SYNC_TABLES[table][0]
+        frame = self.tables[table]
+        frame = frame[frame[key] != row[key]]
+        self.tables[table] = pd.concat([frame, pd.DataFrame([{**row, "updated_at": self.now}])], ignore_index=True)
+
+    def delete(self, table, row_id):
+        key = SYNC_TABLES[table][0]
+        self.tables[table] = self.tables[table][self.tables[table][key] != row_id]
+        tombstone = pd.DataFrame({"table_name": [table], "row_id": [row_id], "deleted_at": [self.now]})
+        self.deleted = pd.concat([self.deleted, tombstone], ignore_index=True)
+
+    def current_rows(self):
+        return join_training_tables(
+            {table: frame.drop(columns="updated_at") for table, frame in self.tables.items()},
+            self.exercises,
+        )
+
+    def load_database_time(self):
+        return self.now
+
+    def load_dataset_fingerprint(self):
+        return pd.DataFrame(
+            {
+                "table_name": list(self.tables),
+                "row_count": [len(frame) for frame in self.tables.values()],
+                "max_key": [str(frame[SYNC_TABLES[table][0]].max()) for table, frame in self.tables.items()],
+            }
+        )
+
+    def load_training_rows(self):
+        self.full_loads += 1
+        return self.current_rows()
+
+    def load_changed_rows(self, table, since):
+        if self.fail_deltas:
+            raise RuntimeError("column updated_at does not exist")
+        frame = self.tables[table]
+        return frame.loc[frame["updated_at"] > since, list(SYNC_TABLES[table][1])].reset_index(drop=True)
+
+    def load_deleted_rows(self, since):
+        return self.deleted.loc[self.deleted["deleted_at"] > since, ["table_name", "row_id"]]
+
+    def prune_deleted_rows(self, before):
+        pruned = self.deleted["deleted_at"] < before
+        self.deleted = self.deleted[~pruned]
+        return int(pruned.sum())
+
+    def load_exercises(self):
+        return self.exercises
+
+    def load_exercise_muscle_targets(self):
+        return pd.DataFrame()
+
+    def load_body_measurements(self):
+        return pd.DataFrame()
+
+    def load_body_composition(self):
+        return pd.DataFrame()
+
+
+def _assert_matches_full_load(data, manager):
+    expected = split_training_rows(manager.current_rows())
+
+    pd.testing.assert_frame_equal(data.sets_df, expected.sets_ui, check_dtype=False)
+    assert list(data.metrics_input.set_columns.workout_exercise_id) == list(expected.sets_raw["workout_exercise_id"])
+    assert sorted(data.metrics_input.session_columns.session_id) == sorted(expected.sessions["session_id"])
+
+
+def test_apply_changes_replaces_deletes_and_keeps_reinserted_rows():
+    table = pd.DataFrame({"set_id": [1, 2, 3], "weight": [10.0, 20.0, 30.0]})
+    changed = pd.DataFrame({"set_id": [3, 4], "weight": [35.0, 40.0]})
+
+    patched = apply_changes(table, "set_id", changed, pd.Series([2, 3]))
+
+    assert list(patched["set_id"]) == [1, 3, 4]
+    assert list(patched["weight"]) == [10.0, 35.0, 40.0]
+
+
+def test_changed_keys_ignore_rows_read_again_without_a_difference():
+    table = pd.DataFrame({"set_id": [1, 2, 3], "weight": [10.0, 20.0, None]})
+    changed = pd.DataFrame({"set_id": [2, 3, 4], "weight": [20.0, None, 40.0]})
+
+    keys = changed_keys(table, "set_id", changed, pd.Series([1, 9]))
+
+    assert list(keys) == [1, 4]
+
+
+def test_refresh_rebuilds_only_the_changed_days_and_reads_reference_data_once():
+    manager = _FakeManager()
+    exercise_loads = []
+    load_exercises = manager.load_exercises
+    manager.load_exercises = lambda: exercise_loads.append(1) or load_exercises()
+    sync = DatasetSync(manager_factory=manager)
+    first = sync.refresh()
+
+    manager.tick()
+    manager.upsert("workout_sets", {
+        "set_id": 201, "workout_exercise_id": 20, "set_number": 2, "repetitions": 6,
+        "weight": 65.0, "duration_seconds": None, "rir": 1.0,
+    })
+    data = sync.refresh()
+
+    stages = {stage["stage"]: stage for stage in data.load_report["stages"]}
+    assert stages["apply_changes"]["changed_rows"] == 1
+    assert stages["split_training_rows"]["rows"] == 2
+    assert "load_exercises" not in stages
+    assert len(exercise_loads) == 1
+    assert data.partitions.get("2026-04")[1] is first.partitions.get("2026-04")[1]
+    _assert_matches_full_load(data, manager)
+
+
+def test_refresh_without_changes_keeps_dataset_version():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+
+    first = sync.refresh()
+    manager.tick()
+    second = sync.refresh()
+
+    assert second.version == first.version
+    assert second.load_report["name"] == "sync_data"
+    assert manager.full_loads == 1
+
+
+def test_refresh_patches_inserts_updates_and_deletes():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    first = sync.refresh()
+
+    manager.tick()
+    manager.upsert("workout_sets", {
+        "set_id": 201, "workout_exercise_id": 20, "set_number": 2, "repetitions": 6,
+        "weight": 65.0, "duration_seconds": None, "rir": float("nan"),
+    })
+    manager.upsert("workout_sessions", {
+        "session_id": 1, "session_date": "2026-03-30", "start_time": None, "end_time": None,
+    })
+    manager.delete("workout_sets", 101)
+    data = sync.refresh()
+
+    assert data.version != first.version
+    assert manager.full_loads == 1
+    assert data.partitions.months == ["2026-03", "2026-05"]
+    _assert_matches_full_load(data, manager)
+
+
+def test_refresh_falls_back_to_full_load_when_deltas_fail():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    sync.refresh()
+
+    manager.fail_deltas = True
+    manager.delete("workout_sets", 200)
+    data = sync.refresh()
+
+    assert manager.full_loads == 2
+    _assert_matches_full_load(data, manager)
+
+
+@pytest.mark.parametrize("overlap", [timedelta(0), timedelta(minutes=5)])
+def test_refresh_is_idempotent_within_the_overlap_window(overlap):
+    manager = _FakeManager()
+    sync = DatasetSync(overlap=overlap, manager_factory=manager)
+    sync.refresh()
+
+    manager.tick()
+    manager.delete("workout_exercises", 20)
+    manager.delete("workout_sets", 200)
+    changed = sync.refresh()
+    again = sync.refresh()
+
+    assert again.version == changed.version
+    _assert_matches_full_load(again, manager)
+
+
+def test_refresh_prunes_tombstones_older_than_the_retention():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager, tombstone_retention=timedelta(hours=2))
+    sync.refresh()
+
+    manager.tick()
+    manager.delete("workout_sets", 200)
+    sync.refresh()
+    manager.tick()
+    sync.refresh()
+    assert len(manager.deleted) == 1
+
+    for _ in range(2):
+        manager.tick()
+        data = sync.refresh()
+
+    assert manager.deleted.empty
+    assert manager.full_loads == 1
+    _assert_matches_full_load(data, manager)
+
+
+def test_refresh_reloads_fully_when_the_watermark_is_older_than_the_retention():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager, tombstone_retention=timedelta(hours=2))
+    sync.refresh()
+
+    manager.now += timedelta(hours=3)
+    manager.delete("workout_sets", 200)
+    manager.deleted = manager.deleted.iloc[0:0]
+    data = sync.refresh()
+
+    assert manager.full_loads == 2
+    _assert_matches_full_load(data, manager)
+
+
+def test_restart_serves_snapshot_without_loading_when_fingerprint_matches(tmp_path):
+    manager = _FakeManager()
+    DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "db")).refresh()
+
+    restarted = DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "db"))
+    data = restarted.refresh()
+
+    assert manager.full_loads == 1
+    assert data.load_report["name"] == "restore_snapshot"
+    _assert_matches_full_load(data, manager)
+
+
+def test_restart_syncs_changes_made_after_the_snapshot(tmp_path):
+    manager = _FakeManager()
+    DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "db")).refresh()
+
+    manager.tick()
+    manager.delete("workout_sets", 200)
+    data = DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "db")).refresh()
+
+    assert manager.full_loads == 1
+    assert data.load_report["name"] == "sync_data"
+    _assert_matches_full_load(data, manager)
+
+
+def test_snapshot_of_another_database_is_ignored(tmp_path):
+    manager = _FakeManager()
+    DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "db")).refresh()
+
+    DatasetSync(manager_factory=manager, snapshot=DatasetSnapshot(tmp_path, "other")).refresh()
+
+    assert manager.full_loads == 2
+
+
+def test_restarted_process_maps_the_columns_another_process_published_without_building_them(tmp_path):
+    manager = _FakeManager()
+    snapshot, mapped = DatasetSnapshot(tmp_path / "snapshot", "db"), MappedDataset(tmp_path / "mapped")
+    first = DatasetSync(manager_factory=manager, snapshot=snapshot, mapped=mapped).refresh()
+
+    data = DatasetSync(manager_factory=manager, snapshot=snapshot, mapped=mapped).refresh()
+
+    stages = {stage["stage"]: stage for stage in data.load_report["stages"]}
+    assert stages["map_published_input"]["published"]
+    assert "build_columnar_input" not in stages
+    assert stages["map_columns"]["written"] == 0
+    weight = data.metrics_input.set_columns.weight
+    assert not weight.flags.writeable and weight.base.filename == first.metrics_input.set_columns.weight.base.filename
+    _assert_matches_full_load(data, manager)
+
+
+def test_serve_answers_with_the_previous_dataset_while_refreshing_in_background():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    first = sync.serve("t1")
+
+    manager.tick()
+    manager.delete("workout_sets", 200)
+    release = threading.Event()
+    database_time = manager.load_database_time
+    manager.load_database_time = lambda: release.wait(5) and database_time()
+
+    assert sync.serve("t2") is first
+    assert sync.serve("t2") is first
+    release.set()
+    sync.wait(5)
+
+    data = sync.serve("t2")
+    assert data.version != first.version
+    _assert_matches_full_load(data, manager)
+
+
+def test_serve_skips_the_refresh_while_the_token_is_unchanged():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    first = sync.serve("t1")
+    probes = []
+    manager.load_database_time = lambda: probes.append(1) or manager.now
+
+    assert sync.serve("t1") is first
+    sync.wait(5)
+    assert sync.serve("t1", max_age=0) is first
+    sync.wait(5)
+
+    assert probes == [1]
+
+
+def test_concurrent_blocking_serves_of_a_new_token_share_one_refresh():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    sync.serve("before", background=False)
+    probes = []
+    database_time = manager.load_database_time
+
+    def _slow_database_time():
+        probes.append(1)
+        time.sleep(0.05)
+        return database_time()
+
+    manager.load_database_time = _slow_database_time
+    barrier = threading.Barrier(5)
+    served = []
+
+    def _session():
+        barrier.wait()
+        served.append(sync.serve("after", background=False))
+
+    sessions = [threading.Thread(target=_session) for _ in range(5)]
+    for session in sessions:
+        session.start()
+    for session in sessions:
+        session.join()
+
+    assert len(probes) == 1
+    assert all(data is served[0] for data in served)
+
+
+def test_serve_refreshes_before_answering_after_a_local_write():
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    first = sync.serve("t1")
+
+    manager.tick()
+    manager.delete("workout_sets", 200)
+    bump_version()
+    data = sync.serve("t1")
+
+    assert data.version != first.version
+    _assert_matches_full_load(data, manager)
+
+
+def test_rollup_sync_serves_rollups_without_loading_sets_and_keeps_unchanged_versions():
+    manager = _FakeManager()
+    manager.session_rollups = pd.DataFrame(
+        {"session_id": [1, 2], "session_date": ["2026-04-20", "2026-05-01"], "total_sets": [2, 0]}
+    )
+    manager.load_session_rollups = lambda: manager.session_rollups
+    manager.load_exercise_session_rollups = lambda: pd.DataFrame(
+        {"session_id": [1], "session_date": ["2026-04-20"], "exercise_id": [1], "total_sets": [2]}
+    )
+    sync = RollupSync(manager_factory=manager)
+
+    first = sync.refresh()
+    manager.tick()
+    unchanged = sync.refresh()
+    manager.session_rollups = manager.session_rollups.assign(total_sets=[2, 1])
+    changed = sync.refresh()
+
+    assert manager.full_loads == 0
+    assert unchanged.version == first.version
+    assert changed.version != first.version
+    assert first.partitions.months == ["2026-04"]
+    assert changed.partitions.months == ["2026-04", "2026-05"]
+
+
+def test_app_shares_one_dataset_until_a_write_and_keeps_static_asset_caches(monkeypatch):
+    import streamlit_app
+    from ui.utils import body_heatmap
+
+    manager = _FakeManager()
+    sync = DatasetSync(manager_factory=manager)
+    monkeypatch.setattr(streamlit_app, "_dataset_sync", lambda: sync)
+    monkeypatch.setattr(streamlit_app, "_change_watcher", lambda: SimpleNamespace(token=lambda: ("poll", ())))
+    mtime_ns = body_heatmap.BODY_IMAGE_PATH.stat().st_mtime_ns
+    mask = body_heatmap._body_fill_mask(mtime_ns)
+
+    first = streamlit_app._load_data()
+    assert streamlit_app._load_data() is first
+    assert not first.metrics_input.set_columns.weight.flags.writeable
+
+    manager.tick()
+    manager.delete("workout_sets", 200)
+    bump_version()
+    second = streamlit_app._load_data()
+    assert second.version != first.version
+    assert streamlit_app._load_data() is second
+
+    def _unreadable(*args):
+        raise AssertionError("fill mask recomputed")
+
+    monkeypatch.setattr(body_heatmap.Image, "open", _unreadable)
+    assert (body_heatmap._body_fill_mask(mtime_ns) == mask).all()
@@ -2,6 +2,8 @@ from datetime import date
 
 import pandas as pd
 
+from metrics.date_filter import DateFilter
+from metrics.partitions import MonthPartitions
 from ui.body_parts_view import BodyPartsView, _bar_fig, _data_signature
 from ui.utils.data_filter import filter_data_by_month
 from ui.utils.exercise_matcher import normalize
@@ -84,3 +86,46 @@ def test_body_parts_chart_helpers_return_stable_outputs():
 
     assert _data_signature(body_df) == _data_signature(body_df.sample(frac=1))
     assert _bar_fig(body_df, "Total_Volume", "Volume (kg)").data[0].orientation == "h"
+
+
+def test_month_partitions_return_views_for_each_month(sample_input, sets_dataframe):
+    partitions = MonthPartitions(sample_input, sets_dataframe)
+
+    may_input, may_df = partitions.get("2026-05")
+    april_input, _ = partitions.get("2026-04")
+    empty_input, empty_df = partitions.get("2020-01")
+
+    assert partitions.months == ["2026-04", "2026-05"]
+    assert [session.session_id for session in may_input.sessions] == [1, 2]
+    assert [session.session_id for session in april_input.sessions] == [3]
+    assert may_input.set_columns.weight.base is april_input.set_columns.weight.base
+    assert list(may_df["session_id"]) == [1, 2]
+    assert len(empty_input.sets) == 0 and empty_df.empty
+    assert partitions.get("All time") == (sample_input, sets_dataframe)
+
+
+def test_date_filter_bounds_and_period_weeks():
+    today = date(2026, 5, 10)
+
+    assert DateFilter.parse("2026-05").bounds() == (date(2026, 5, 1), date(2026, 5, 31))
+    assert DateFilter.parse("2026-05").period_weeks(today) == 10 / 7
+    assert DateFilter.last_weeks(4).bounds(today) == (date(2026, 4, 13), today)
+    assert DateFilter.last_weeks(4).period_weeks(today) == 4.0
+    assert DateFilter.between(date(2026, 5, 8), date(2026, 5, 1)).label == "2026-05-01 - 2026-05-08"
+    assert DateFilter.parse("All time").period_weeks(today) is None
+
+
+def test_filter_data_by_date_range_and_rolling_window(sample_input, sets_dataframe):
+    period = DateFilter.between(date(2026, 4, 20), date(2026, 5, 1))
+    range_input, range_df = filter_data_by_month(sample_input, sets_dataframe, period)
+
+    assert [session.session_id for session in range_input.sessions] == [1, 3]
+    assert {workout_set.workout_exercise_id for workout_set in range_input.sets} == {101, 103}
+    assert list(range_df["session_id"]) == [1, 3]
+
+    partitions = MonthPartitions(sample_input, sets_dataframe)
+    rolling_input, rolling_df = partitions.get(DateFilter.last_weeks(4), today=date(2026, 5, 8))
+
+    assert [session.session_id for session in rolling_input.sessions] == [1, 2, 3]
+    assert partitions.date_span == (date(2026, 4, 20), date(2026, 5, 8))
+    assert list(rolling_df["session_id"]) == [1, 2, 3]
@@ -0,0 +1,140 @@
+import sqlite3
+from datetime import date, time
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from import_history import HistoryImporter, ImportReport, read_workouts
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    # sqlite3 has no default adapter for times of day; PostgreSQL drivers do.
+    monkeypatch.setitem(sqlite3.adapters, (time, sqlite3.PrepareProtocol), time.isoformat)
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE workout_sessions (session_id INTEGER PRIMARY KEY, session_date TEXT, "
+            "start_time TEXT, end_time TEXT, notes TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE exercises (exercise_id INTEGER PRIMARY KEY, exercise_name TEXT, "
+            "category TEXT, body_part TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE workout_exercises (workout_exercise_id INTEGER PRIMARY KEY, "
+            "session_id INTEGER, exercise_id INTEGER)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE workout_sets (set_id INTEGER PRIMARY KEY, workout_exercise_id INTEGER, "
+            "set_number INTEGER, repetitions INTEGER, weight REAL, duration_seconds INTEGER, rir INTEGER)"
+        ))
+        conn.execute(text(
+            "INSERT INTO exercises VALUES (1, 'Bench Press', 'Push', 'Chest'), (2, 'Row', 'Pull', 'Back')"
+        ))
+    return engine
+
+
+@pytest.fixture
+def history(tmp_path):
+    (tmp_path / "2026-05-01 push.txt").write_text(
+        "Godzina: 10:00 - 11:15\n1. Bench Press\n10x100 / 8x110\nRIR: 2 / 1\n", encoding="utf-8"
+    )
+    (tmp_path / "pull.txt").write_text("Trening 2026-05-03\n1. row\n12x60\nRIR: 3\n", encoding="utf-8")
+    (tmp_path / "undated.txt").write_text("1. Row\n12x60\n", encoding="utf-8")
+    (tmp_path / "export.csv").write_text(
+        "session_date,exercise_name,set_number,repetitions,weight,duration_seconds,rir\n"
+        "2026-05-08,Bench Press,2,8,112.5,,1\n"
+        "2026-05-08,Bench Press,1,10,102.5,,2\n"
+        "2026-05-08,Row,1,12,62.5,,\n"
+        "2026-05-10,Squat,1,5,140,,1\n",
+        encoding="utf-8",
+    )
+    return tmp_path
+
+
+def _count(engine, table):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table}")).scalar()
+
+
+def test_import_writes_txt_logs_and_csv_exports(engine, history):
+    progress = []
+    report = ImportReport()
+
+    HistoryImporter(engine, batch_size=2, progress=lambda r: progress.append(r.imported)).run(
+        read_workouts([history], report), report
+    )
+
+    assert (report.workouts, report.imported, report.sets) == (4, 3, 6)
+    assert progress == [2, 3]
+    assert len(report.failed) == 2
+    assert any("undated.txt" in message for message in report.failed)
+    assert any("Squat" in message for message in report.failed)
+    with engine.connect() as conn:
+        sessions = conn.execute(text(
+            "SELECT session_date, start_time, end_time FROM workout_sessions ORDER BY session_date"
+        )).all()
+        csv_sets = conn.execute(text(
+            "SELECT set_number, repetitions, weight, rir FROM workout_sets "
+            "JOIN workout_exercises USING (workout_exercise_id) "
+            "JOIN workout_sessions USING (session_id) "
+            "WHERE session_date = '2026-05-08' ORDER BY set_id"
+        )).all()
+    assert [row[0] for row in sessions] == ["2026-05-01", "2026-05-03", "2026-05-08"]
+    assert sessions[0][1:] == (str(time(10, 0)), str(time(11, 15)))
+    assert csv_sets == [(1, 10, 102.5, 2), (2, 8, 112.5, 1), (1, 12, 62.5, None)]
+
+
+def test_rerun_skips_workouts_already_imported(engine, history):
+    HistoryImporter(engine).run(read_workouts([history], ImportReport()))
+
+    report = HistoryImporter(engine).run(read_workouts([history], ImportReport()))
+
+    assert (report.imported, report.skipped_existing) == (0, 3)
+    assert _count(engine, "workout_sessions") == 3
+    assert _count(engine, "workout_sets") == 6
+
+
+def test_workouts_sharing_a_date_are_all_imported_and_reported(engine, tmp_path):
+    (tmp_path / "2026-05-01 am.txt").write_text("Godzina: 07:00 - 08:00\n1. Row\n12x60\nRIR: 3\n", encoding="utf-8")
+    (tmp_path / "2026-05-01 pm.txt").write_text("Godzina: 18:00 - 19:00\n1. Row\n12x60\nRIR: 3\n", encoding="utf-8")
+    (tmp_path / "export.csv").write_text(
+        "session_date,exercise_name,repetitions,weight,rir\n"
+        "2026-05-08,Row,12,60,2\n"
+        "2026-05-09,Row,10,70,2\n"
+        "2026-05-08,Bench Press,8,100,1\n",
+        encoding="utf-8",
+    )
+
+    report = HistoryImporter(engine).run(read_workouts([tmp_path], ImportReport()))
+    rerun = HistoryImporter(engine).run(read_workouts([tmp_path], ImportReport()))
+
+    assert (report.imported, report.skipped_existing) == (5, 0)
+    assert sum("2026-05-01 already has a session" in message for message in report.warnings) == 1
+    assert sum("2026-05-08 already has a session" in message for message in report.warnings) == 1
+    assert (rerun.imported, rerun.skipped_existing, rerun.warnings) == (0, 5, [])
+    assert _count(engine, "workout_sessions") == 5
+    assert _count(engine, "workout_sets") == 5
+
+
+def test_repeated_workout_in_one_run_is_imported_once(engine, history):
+    report = HistoryImporter(engine).run(read_workouts([history, history / "pull.txt"], ImportReport()))
+
+    assert (report.imported, report.skipped_existing) == (3, 1)
+    assert _count(engine, "workout_sessions") == 3
+
+
+def test_dry_run_writes_nothing(engine, history):
+    report = HistoryImporter(engine, dry_run=True).run(read_workouts([history], ImportReport()))
+
+    assert (report.imported, report.sets) == (3, 6)
+    assert report.summary(dry_run=True).startswith("4 workouts read: would import 3 (6 sets)")
+    assert _count(engine, "workout_sessions") == 0
+
+
+def test_workout_dates_come_from_file_name_or_text(history):
+    workouts = list(read_workouts([history / "2026-05-01 push.txt", history / "pull.txt"], ImportReport()))
+
+    assert [w.session_date for w in workouts] == [date(2026, 5, 1), date(2026, 5, 3)]
+    assert workouts[0].start_time == time(10, 0)
@@ -0,0 +1,105 @@
+import logging
+
+import pandas as pd
+import pytest
+
+import data_loader
+from instrumentation import PerformanceReport, input_cardinalities
+from metrics.metrics_engine import LazyMetrics, compute_all_metrics
+
+
+def test_report_records_stage_timings_and_cardinalities(caplog):
+    report = PerformanceReport("pipeline", {"sets": 5})
+
+    with caplog.at_level(logging.INFO, logger="instrumentation"):
+        with report.stage("step") as stage:
+            stage["rows"] = 3
+
+    summary = report.to_dict()
+    assert summary["name"] == "pipeline"
+    assert [s["stage"] for s in summary["stages"]] == ["step"]
+    assert summary["stages"][0]["sets"] == 5
+    assert summary["stages"][0]["rows"] == 3
+    assert summary["stages"][0]["wall_ms"] >= 0
+    assert caplog.records[0].perf["pipeline"] == "pipeline"
+    assert caplog.records[0].perf["stage"] == "step"
+
+
+def test_input_cardinalities_counts_training_and_body_records(sample_input):
+    assert input_cardinalities(sample_input) == {
+        "sessions": 3,
+        "sets": 5,
+        "exercises": 2,
+        "body_records": len(sample_input.body_measurements) + len(sample_input.body_composition),
+    }
+
+
+def test_metrics_report_has_one_stage_per_computed_group(sample_input):
+    report = {}
+    compute_all_metrics(sample_input, names=["progress", "sessions"], report=report)
+
+    stages = [s["stage"] for s in report["stages"]]
+    assert stages == ["exercise_series", "progress", "sessions"]
+    assert report["cardinalities"]["sets"] == 5
+    assert all(s["sessions"] == 3 for s in report["stages"])
+
+
+def test_lazy_metrics_report_grows_with_accessed_groups(sample_input):
+    metrics = LazyMetrics(sample_input)
+    metrics["body"]
+
+    assert [s.stage for s in metrics.report.stages] == ["body"]
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_load_data_reports_every_query_stage(monkeypatch, workers):
+    class _FakeManager:
+        def load_training_rows(self):
+            return pd.DataFrame(
+                {
+                    "session_id": [1, 1, 2],
+                    "session_date": ["2026-05-01", "2026-05-01", "2026-04-01"],
+                    "start_time": [None, None, None],
+                    "end_time": [None, None, None],
+                    "workout_exercise_id": [10.0, 10.0, None],
+                    "exercise_id": [1.0, 1.0, None],
+                    "exercise_name": ["Bench", "Bench", None],
+                    "body_part": ["Chest", "Chest", None],
+                    "set_id": [100.0, 101.0, None],
+                    "set_number": [1.0, 2.0, None],
+                    "repetitions": [5.0, 5.0, None],
+                    "weight": [100.0, 100.0, None],
+                    "duration_seconds": [None, None, None],
+                    "volume": [500.0, 500.0, None],
+                    "rir": [None, None, None],
+                }
+            )
+
+        def load_exercises(self):
+            return pd.DataFrame(
+                {"exercise_id": [1], "exercise_name": ["Bench"], "body_part": ["Chest"]}
+            )
+
+        def load_exercise_muscle_targets(self):
+            return pd.DataFrame()
+
+        def load_body_measurements(self):
+            return pd.DataFrame()
+
+        def load_body_composition(self):
+            return pd.DataFrame()
+
+    monkeypatch.setattr(data_loader, "DataManager", _FakeManager)
+
+    data = data_loader.load_data(workers=workers)
+    report = data.load_report
+
+    stages = {s["stage"]: s for s in report["stages"]}
+    assert stages["load_training_rows"]["rows"] == 3
+    assert "load_body_composition" in stages
+    assert stages["split_training_rows"]["rows"] == 2
+    assert stages["build_columnar_input"]["sets"] == 2
+    assert stages["build_columnar_input"]["sessions"] == 2
+    assert report["cardinalities"] == input_cardinalities(data.metrics_input)
+    with pytest.raises(ValueError):
+        data.sets_df.loc[0, "weight"] = 0.0
@@ -0,0 +1,108 @@
+import os
+from datetime import date, datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from mapped_dataset import MappedDataset, dataset_key
+from metrics.columnar import ColumnarMetricsInput
+from metrics.partitions import MonthPartitions
+
+
+WATERMARK = datetime(2026, 5, 1, 12, 0)
+FINGERPRINT = {"sets": [42, "42"]}
+KEY = dataset_key(WATERMARK, FINGERPRINT)
+
+
+def _is_mapped(array):
+    return isinstance(array.base, np.memmap) and not array.flags.writeable
+
+
+def _reference(columnar):
+    return {
+        "exercises": columnar.exercises,
+        "exercise_muscle_targets": columnar.exercise_muscle_targets,
+        "muscle_groups": columnar.muscle_groups,
+        "body_measurements": columnar.body_measurements,
+        "body_composition": columnar.body_composition,
+    }
+
+
+def test_shared_input_maps_read_only_copies_of_the_columns(tmp_path, sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+
+    version = MappedDataset(tmp_path).version(KEY)
+    shared = version.share_input(columnar)
+
+    assert version.written == 3
+    assert _is_mapped(shared.set_columns.weight)
+    assert _is_mapped(shared.session_columns.session_date)
+    assert shared.sets == sample_input.sets
+    assert shared.sessions == sample_input.sessions
+    assert shared.exercises is columnar.exercises
+    with pytest.raises(ValueError):
+        shared.set_columns.weight[0] = 1.0
+
+
+def test_another_process_maps_the_published_version_by_key_without_building_it(tmp_path, sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    assert MappedDataset(tmp_path).version(KEY).published_input(**_reference(columnar)) is None
+    MappedDataset(tmp_path).version(KEY).share_input(columnar)
+
+    version = MappedDataset(tmp_path).version(KEY)
+    shared = version.published_input(**_reference(columnar))
+
+    assert version.written == 0
+    assert _is_mapped(shared.set_columns.weight)
+    assert shared.sets == sample_input.sets
+    assert shared.sessions == sample_input.sessions
+    assert version.share_input(shared).set_columns is shared.set_columns
+
+
+def test_dataset_key_is_the_same_for_a_watermark_restored_from_a_snapshot():
+    restored = pd.Timestamp(pd.Timestamp(WATERMARK).isoformat()).to_pydatetime()
+
+    assert dataset_key(restored, dict(FINGERPRINT)) == KEY
+    assert dataset_key(WATERMARK + timedelta(seconds=1), FINGERPRINT) != KEY
+    assert dataset_key(WATERMARK, {"sets": [43, "43"]}) != KEY
+
+
+def test_new_versions_prune_all_but_the_newest(tmp_path, sample_input):
+    mapped = MappedDataset(tmp_path, keep=2)
+    keys = []
+    for hours in (1, 2, 3):
+        version = mapped.version(dataset_key(WATERMARK + timedelta(hours=hours), FINGERPRINT))
+        os.utime(version.directory, (hours, hours))
+        keys.append(version.key)
+
+    assert len(set(keys)) == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == sorted(keys[1:])
+
+
+def test_unreadable_group_falls_back_to_the_arrays_in_memory(tmp_path, sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    version = MappedDataset(tmp_path).version(KEY)
+    (version.directory / "set_columns").mkdir()
+    (version.directory / "set_columns" / "manifest.json").write_text("{}")
+
+    shared = version.share_input(columnar)
+
+    assert shared.set_columns is columnar.set_columns
+    assert _is_mapped(shared.session_columns.session_id)
+
+
+def test_partitions_over_mapped_arrays_match_in_memory_partitions(tmp_path, sample_input, sets_dataframe):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    version = MappedDataset(tmp_path).version(KEY)
+    shared = version.share_input(columnar)
+
+    mapped = MonthPartitions(shared, sets_dataframe, share=version.share)
+    in_memory = MonthPartitions(columnar, sets_dataframe)
+
+    may_input, _ = mapped.get("2026-05")
+    assert _is_mapped(may_input.set_columns.weight.base)
+    assert may_input.sets == in_memory.get("2026-05")[0].sets
+    window = (date(2026, 4, 25), date(2026, 5, 8))
+    assert mapped.window(*window)[0].sessions == in_memory.window(*window)[0].sessions
+    assert mapped.date_span == in_memory.date_span
@@ -1,13 +1,23 @@
 from datetime import date, time
 
+import pandas as pd
+import pytest
+
 from mapper import (
     map_body_composition,
+    map_body_compositions,
     map_body_measurement,
+    map_body_measurements,
     map_exercise,
     map_exercise_muscle_target,
+    map_exercise_muscle_targets,
+    map_exercises,
     map_workout_exercise,
+    map_workout_exercises,
     map_workout_session,
+    map_workout_sessions,
     map_workout_set,
+    map_workout_sets,
 )
 
 
@@ -90,3 +100,81 @@ def test_body_composition_mapper_uses_database_column_names():
 
     assert entry.weight == 82.0
     assert entry.fat_percentage == 18.9
+
+
+def _frames() -> dict[str, pd.DataFrame]:
+    return {
+        "sessions": pd.DataFrame(
+            {"session_id": [1, 2], "session_date": pd.to_datetime(["2026-05-01", "2026-05-08"])}
+        ),
+        "workout_exercises": pd.DataFrame(
+            {"workout_exercise_id": [10, 11], "session_id": [1, 2], "exercise_id": [2, 3]}
+        ),
+        "sets": pd.DataFrame(
+            {
+                "workout_exercise_id": [10, 10, 11],
+                "set_number": [1, 2, 1],
+                "repetitions": [8, 6, 0],
+                "weight": [100.0, 105.0, 0.0],
+                "duration_seconds": [None, None, 60.0],
+                "rir": [1.0, None, None],
+            }
+        ),
+        "exercises": pd.DataFrame(
+            {"exercise_id": [2, 3], "exercise_name": ["Row", "Plank"], "body_part": ["Back", None]}
+        ),
+        "targets": pd.DataFrame(
+            {
+                "exercise_id": [2],
+                "muscle_group": ["Back"],
+                "muscle_name": ["Latissimus"],
+                "role": ["primary"],
+                "set_factor": ["0.5"],
+            }
+        ),
+        "measurements": pd.DataFrame(
+            {
+                "measurement_date": [date(2026, 5, 1), date(2026, 6, 1)],
+                "chest": [104.0, None],
+                "waist": [None, 80.0],
+                "biceps": [38.0, 38.5],
+            }
+        ),
+        "composition": pd.DataFrame(
+            {
+                "measurement_date": [date(2026, 5, 1)],
+                "weight": [82.0],
+                "muscle_mass": [37.0],
+                "fat_mass": [None],
+                "water_mass": [49.0],
+                "body_fat_percentage": [18.9],
+                "method": ["scale"],
+            }
+        ),
+    }
+
+
+@pytest.mark.parametrize(
+    ("frame", "bulk", "row_mapper"),
+    [
+        ("sessions", map_workout_sessions, map_workout_session),
+        ("workout_exercises", map_workout_exercises, map_workout_exercise),
+        ("sets", map_workout_sets, map_workout_set),
+        ("exercises", map_exercises, map_exercise),
+        ("targets", map_exercise_muscle_targets, map_exercise_muscle_target),
+        ("composition", map_body_compositions, map_body_composition),
+    ],
+)
+def test_bulk_mappers_match_row_mappers(frame, bulk, row_mapper):
+    df = _frames()[frame]
+
+    assert repr(bulk(df)) == repr([row_mapper(row) for row in df.to_dict("records")])
+    assert bulk(df.iloc[0:0]) == []
+
+
+def test_bulk_body_measurements_match_row_mapper_order():
+    df = _frames()["measurements"]
+    expected = [m for row in df.to_dict("records") for m in map_body_measurement(row)]
+
+    assert repr(map_body_measurements(df)) == repr(expected)
+    assert map_body_measurements(pd.DataFrame()) == []
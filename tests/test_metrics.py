@@ -1,7 +1,10 @@
 from datetime import date
+from statistics import mean
 
 import pytest
 
+from metrics.columnar import ColumnarMetricsInput, SessionColumns, SetColumns, WorkoutExerciseColumns
+from metrics.index import MetricsIndex
 from metrics.input import MetricsInput
 from metrics.body_metrics import (
     _calculate_metric_deltas,
@@ -17,8 +20,11 @@ from models.workout_set import WorkoutSet
 from metrics.exercise_metrics import compute_exercise_metrics
 from metrics.fatigue_metrics import compute_fatigue_metrics
 from metrics.frequency_metrics import compute_frequency_metrics
-from metrics.metrics_engine import compute_all_metrics
+from metrics.body_part_metrics import summarize_body_parts
+from metrics.metrics_engine import LazyMetrics, compute_all_metrics
 from metrics.progress_metrics import compute_progress_metrics
+from metrics.registry import MetricNode
+from metrics.scheduler import MetricScheduler
 from metrics.session_metrics import compute_session_metrics
 from metrics.set_metrics import compute_set_metrics
 from metrics.utils import estimate_1rm
@@ -168,3 +174,235 @@ def test_compute_all_metrics_runs_registered_metric_groups(sample_input):
 
     assert {"sessions", "exercises", "sets", "frequency", "fatigue", "progress", "body"} <= set(result)
     assert "error" not in result["sessions"]
+
+
+def test_compute_exercise_metrics_builds_per_session_series(sample_input):
+    bench = compute_exercise_metrics(sample_input)["per_exercise"][1]
+
+    assert bench["per_session_1rm"] == [
+        {"date": date(2026, 5, 1), "estimated_1rm": 136.33},
+        {"date": date(2026, 5, 8), "estimated_1rm": 142.83},
+    ]
+    assert bench["per_session_volume"] == [
+        {"date": date(2026, 5, 1), "volume": 1880.0},
+        {"date": date(2026, 5, 8), "volume": 1970.0},
+    ]
+    assert bench["per_session_duration"] == []
+    assert bench["strength_trend_1rm"] == pytest.approx(145.666667 - 133.333333)
+    assert bench["avg_rir"] == 1
+
+
+def test_compute_exercise_metrics_matches_for_columnar_input(sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+
+    assert compute_exercise_metrics(columnar) == compute_exercise_metrics(sample_input)
+
+
+def test_compute_exercise_metrics_sorts_sets_without_session_last():
+    input_data = MetricsInput(
+        sessions=[WorkoutSession(1, date(2026, 5, 1), None, None)],
+        workout_exercises=[WorkoutExercise(101, 1, 1), WorkoutExercise(102, 99, 1)],
+        sets=[
+            WorkoutSet(102, 1, 5, 50.0, 1),
+            WorkoutSet(101, 1, 10, 100.0, 2),
+        ],
+        exercises=[Exercise(1, "Bench Press", None, "Chest")],
+        exercise_muscle_targets=[],
+        muscle_groups=["Chest"],
+        body_measurements=[],
+        body_composition=[],
+    )
+
+    bench = compute_exercise_metrics(input_data)["per_exercise"][1]
+
+    assert bench["total_sets"] == 2
+    assert bench["sessions_count"] == 1
+    assert bench["volume_trend"] == 250 - 1000
+    assert [point["date"] for point in bench["per_session_volume"]] == [date(2026, 5, 1)]
+
+
+def test_per_session_1rm_matches_the_rounded_statistics_mean():
+    # The grouped float mean of these e1RMs rounds to 124.05; the exact mean to 124.06.
+    sets = [
+        WorkoutSet(101, number, reps, weight, 1)
+        for number, (reps, weight) in enumerate(
+            [(11, 88.25), (4, 37.0), (1, 180.75), (7, 98.0), (1, 145.25)], start=1
+        )
+    ]
+    input_data = MetricsInput(
+        sessions=[WorkoutSession(1, date(2026, 5, 1), None, None)],
+        workout_exercises=[WorkoutExercise(101, 1, 1)],
+        sets=sets,
+        exercises=[Exercise(1, "Bench Press", None, "Chest")],
+        exercise_muscle_targets=[],
+        muscle_groups=["Chest"],
+        body_measurements=[],
+        body_composition=[],
+    )
+
+    bench = compute_exercise_metrics(input_data)["per_exercise"][1]
+
+    one_rms = [estimate_1rm(s.weight, s.repetitions) for s in sets]
+    assert bench["per_session_1rm"][0]["estimated_1rm"] == round(mean(one_rms), 2) == 124.06
+    assert bench["estimated_1rm_avg"] == mean(one_rms)
+    assert bench["avg_weight"] == mean(s.weight for s in sets)
+
+
+def test_exercise_averages_keep_the_statistics_mean_types():
+    input_data = MetricsInput(
+        sessions=[WorkoutSession(1, date(2026, 5, 1), None, None)],
+        workout_exercises=[WorkoutExercise(101, 1, 1), WorkoutExercise(102, 1, 2)],
+        sets=[
+            WorkoutSet(101, 1, 10, 88.3, 1),
+            WorkoutSet(101, 2, 10, 88.3, 3),
+            WorkoutSet(101, 3, 10, 88.3, None),
+            WorkoutSet(102, 1, 10, 50.0, 1),
+            WorkoutSet(102, 2, 10, 50.0, 2),
+        ],
+        exercises=[],
+        exercise_muscle_targets=[],
+        muscle_groups=[],
+        body_measurements=[],
+        body_composition=[],
+    )
+
+    per_exercise = compute_exercise_metrics(input_data)["per_exercise"]
+
+    assert per_exercise[1]["avg_rir"] == 2 and type(per_exercise[1]["avg_rir"]) is int
+    assert per_exercise[2]["avg_rir"] == 1.5
+
+
+def test_compute_all_metrics_shares_one_index_across_metric_groups(sample_input, monkeypatch):
+    seen = []
+
+    def _record(name):
+        def _metric(metrics_input, index=None):
+            seen.append(index)
+            return {"name": name}
+        return _metric
+
+    monkeypatch.setattr(
+        "metrics.metrics_engine.METRIC_REGISTRY",
+        {"a": MetricNode("a", _record("a")), "b": MetricNode("b", _record("b"))},
+    )
+
+    result = compute_all_metrics(sample_input)
+
+    assert result == {"a": {"name": "a"}, "b": {"name": "b"}}
+    assert isinstance(seen[0], MetricsIndex)
+    assert seen[0] is seen[1]
+
+
+def test_metrics_index_groups_sets_by_session_and_exercise(sample_input):
+    index = MetricsIndex(sample_input)
+
+    # Groupings hold positions: sessions 1, 2, 3 are at 0, 1, 2, sets in logged order.
+    assert {pos: positions.tolist() for pos, positions in index.sets_by_session.items()} == {
+        0: [0, 1],
+        1: [2, 3],
+        2: [4],
+    }
+    assert [len(index.sets_by_exercise[e]) for e in (1, 2)] == [4, 1]
+    assert index.sessions_by_date.tolist() == [2, 0, 1]
+    assert index.session_dates[2] == date(2026, 4, 20)
+
+
+def test_metrics_on_columnar_input_never_build_domain_objects(sample_input, monkeypatch):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    expected = compute_all_metrics(sample_input)
+
+    def _materialize(self):
+        raise AssertionError(f"{type(self).__name__} materialized")
+
+    for columns in (SessionColumns, WorkoutExerciseColumns, SetColumns):
+        monkeypatch.setattr(columns, "to_models", _materialize)
+
+    assert compute_all_metrics(columnar) == expected
+    assert not {"sessions", "workout_exercises", "sets"} & set(columnar.__dict__)
+
+
+def test_lazy_metrics_computes_groups_on_first_access_only(sample_input, monkeypatch):
+    calls = []
+
+    def _metric(metrics_input, index=None):
+        calls.append(index)
+        return {"ok": True}
+
+    monkeypatch.setattr(
+        "metrics.metrics_engine.METRIC_REGISTRY",
+        {"body": MetricNode("body", _metric), "sessions": MetricNode("sessions", _metric)},
+    )
+
+    metrics = LazyMetrics(sample_input).prefetch(["body"])
+
+    assert metrics.computed == ("body",)
+    assert metrics["body"] == {"ok": True}
+    assert metrics.get("sessions") == {"ok": True}
+    assert len(calls) == 2
+    assert metrics.computed == ("body", "sessions")
+    assert metrics.get("missing", {}) == {}
+
+
+def test_scheduler_runs_dependencies_once_before_dependents(sample_input):
+    calls = []
+
+    def _metric(name):
+        def _compute(metrics_input, index=None, **dependencies):
+            calls.append((name, sorted(dependencies)))
+            return {"name": name}
+        return _compute
+
+    scheduler = MetricScheduler(
+        {
+            "base": MetricNode("base", _metric("base"), public=False),
+            "left": MetricNode("left", _metric("left"), requires=("base",)),
+            "right": MetricNode("right", _metric("right"), requires=("base",)),
+            "unused": MetricNode("unused", _metric("unused")),
+        }
+    )
+
+    results = scheduler.run(sample_input, ["left", "right"])
+
+    assert calls == [("base", []), ("left", ["base"]), ("right", ["base"])]
+    assert set(results) == {"base", "left", "right"}
+
+
+def test_scheduler_isolates_failed_dependency(sample_input):
+    def _broken(metrics_input, index=None):
+        raise RuntimeError("boom")
+
+    scheduler = MetricScheduler(
+        {
+            "base": MetricNode("base", _broken),
+            "derived": MetricNode("derived", lambda metrics_input, index=None, base=None: {}, requires=("base",)),
+            "other": MetricNode("other", lambda metrics_input, index=None: {"ok": True}),
+        }
+    )
+
+    results = scheduler.run(sample_input, ["derived", "other"])
+
+    assert results["base"] == {"error": "boom"}
+    assert results["derived"]["error"].startswith("Dependency 'base' failed")
+    assert results["other"] == {"ok": True}
+
+
+def test_scheduler_rejects_unknown_metrics_and_cycles():
+    scheduler = MetricScheduler(
+        {
+            "a": MetricNode("a", lambda metrics_input, index=None, **_: {}, requires=("b",)),
+            "b": MetricNode("b", lambda metrics_input, index=None, **_: {}, requires=("a",)),
+        }
+    )
+
+    with pytest.raises(ValueError, match="Unknown metric"):
+        scheduler.plan(["missing"])
+    with pytest.raises(ValueError, match="cycle"):
+        scheduler.plan(["a"])
+
+
+def test_body_part_metrics_reuse_exercise_results(sample_input):
+    metrics = LazyMetrics(sample_input).prefetch(["body_parts"])
+
+    assert metrics.computed == ("exercises", "body_parts")
+    assert metrics["body_parts"] == summarize_body_parts(metrics["exercises"]["per_exercise"])
+    assert "exercise_series" not in metrics
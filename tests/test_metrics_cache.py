@@ -0,0 +1,70 @@
+import data_version
+from data_manager import DataManager
+from metrics.cache import MetricsCache
+
+
+def test_cache_returns_cached_value_until_evicted():
+    cache = MetricsCache(maxsize=2)
+    calls = []
+
+    def _compute(value):
+        def _inner():
+            calls.append(value)
+            return value
+        return _inner
+
+    assert cache.get_or_compute(("v1", "2026-05"), _compute("may")) == "may"
+    assert cache.get_or_compute(("v1", "2026-05"), _compute("other")) == "may"
+    cache.get_or_compute(("v1", "2026-04"), _compute("april"))
+    cache.get_or_compute(("v1", "2026-05"), _compute("may"))
+    cache.get_or_compute(("v1", "All time"), _compute("all"))
+
+    assert calls == ["may", "april", "all"]
+    assert ("v1", "2026-04") not in cache
+    assert ("v1", "2026-05") in cache
+    assert cache.stats()["hits"] == 2
+
+
+def test_failed_compute_is_not_cached():
+    cache = MetricsCache()
+
+    def _broken():
+        raise RuntimeError("boom")
+
+    try:
+        cache.get_or_compute("key", _broken)
+    except RuntimeError:
+        pass
+
+    assert cache.get_or_compute("key", lambda: "ok") == "ok"
+
+
+def test_data_manager_write_invalidates_subscribed_cache(monkeypatch):
+    cache = MetricsCache()
+    data_version.subscribe(cache.invalidate)
+    try:
+        cache.get_or_compute(("v1", None), lambda: "cached")
+        before = data_version.current_version()
+
+        manager = object.__new__(DataManager)
+        manager.engine = object()
+        monkeypatch.setattr("data_manager.insert_body_composition", lambda *args: None)
+        monkeypatch.setattr("data_manager.insert_exercise", lambda *args: False)
+
+        assert manager.add_exercise("New Exercise", "Push", "Chest") is False
+        assert len(cache) == 1
+
+        assert manager.add_body_composition({}) is True
+        assert len(cache) == 0
+        assert data_version.current_version() == before + 1
+    finally:
+        data_version.unsubscribe(cache.invalidate)
+
+
+def test_each_load_gets_a_new_dataset_version():
+    first = data_version.new_dataset_version()
+    second = data_version.new_dataset_version()
+
+    assert first != second
+    assert first.writes == second.writes == data_version.current_version()
+
@@ -0,0 +1,93 @@
+import pytest
+from sqlalchemy import create_engine, text
+
+from db.check_query_plans import PlanCheck, check_query_plans
+from db.migrate import MIGRATIONS, Migration, applied_migrations, migrate
+from db.queries import SYNC_TABLES
+
+
+def _create_table(name):
+    return lambda conn: conn.execute(text(f"CREATE TABLE {name} (id INTEGER PRIMARY KEY)"))
+
+
+def test_migrate_applies_pending_migrations_in_order_once():
+    engine = create_engine("sqlite://")
+    order = []
+    migrations = [
+        Migration(2, "second", lambda conn: order.append(2)),
+        Migration(1, "first", lambda conn: order.append(1)),
+    ]
+
+    assert [m.version for m in migrate(engine, migrations)] == [1, 2]
+    assert migrate(engine, migrations) == []
+    assert order == [1, 2]
+    assert applied_migrations(engine) == {1, 2}
+
+
+def test_failed_migration_is_rolled_back_and_rerun_continues():
+    engine = create_engine("sqlite://")
+    create_log = Migration(1, "log", _create_table("log"))
+
+    def _broken(conn):
+        conn.execute(text("INSERT INTO log (id) VALUES (1)"))
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        migrate(engine, [create_log, Migration(2, "fill_log", _broken)])
+    assert applied_migrations(engine) == {1}
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM log")).scalar() == 0
+
+    applied = migrate(engine, [create_log, Migration(2, "fill_log", _create_table("fixed"))])
+
+    assert [m.name for m in applied] == ["fill_log"]
+    assert applied_migrations(engine) == {1, 2}
+
+
+def test_index_migration_makes_app_lookups_use_indexes():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE workout_sessions (session_id INTEGER PRIMARY KEY, session_date TEXT)"))
+        conn.execute(text(
+            "CREATE TABLE workout_exercises (workout_exercise_id INTEGER PRIMARY KEY, "
+            "session_id INTEGER, exercise_id INTEGER)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE workout_sets (set_id INTEGER PRIMARY KEY, workout_exercise_id INTEGER, "
+            "set_number INTEGER, repetitions INTEGER, weight REAL, rir INTEGER)"
+        ))
+
+    assert not any(result.uses_index for result in check_query_plans(engine))
+
+    migrate(engine, [next(m for m in MIGRATIONS if m.name == "performance_indexes")])
+
+    assert all(result.uses_index for result in check_query_plans(engine))
+    [cast_lookup] = check_query_plans(
+        engine,
+        (
+            PlanCheck(
+                "cast lookup",
+                "workout_sessions_session_date_idx",
+                "SELECT session_id FROM workout_sessions WHERE CAST(session_date AS DATE) = :day",
+                {"day": "2026-05-01"},
+            ),
+        ),
+    )
+    assert not cast_lookup.uses_index
+
+
+def test_sync_tracking_is_a_versioned_migration_covering_every_sync_table():
+    statements = []
+
+    class _RecordingConnection:
+        def execute(self, statement, *args):
+            statements.append(str(statement))
+
+    sync_tracking = next(m for m in MIGRATIONS if m.name == "sync_tracking")
+    sync_tracking.apply(_RecordingConnection())
+
+    assert [m.version for m in MIGRATIONS] == sorted({m.version for m in MIGRATIONS})
+    assert any("CREATE TABLE IF NOT EXISTS sync_deletions" in sql for sql in statements)
+    for table, (key, _) in SYNC_TABLES.items():
+        assert any(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS updated_at" in sql for sql in statements)
+        assert any(f"sync_record_deletion('{key}')" in sql and table in sql for sql in statements)
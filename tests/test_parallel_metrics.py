@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import Future
+from threading import Barrier, Thread
+
+from metrics import parallel
+from metrics.columnar import ColumnarMetricsInput
+from metrics.metrics_engine import compute_all_metrics
+from metrics.parallel import ParallelMetricRunner, SharedInput, attach_input
+from metrics.registry import MetricNode
+
+
+def _set_count(metrics_input, index=None):
+    return {"sets": len(metrics_input.set_columns)}
+
+
+def _broken(metrics_input, index=None):
+    raise RuntimeError("boom")
+
+
+def _doubled(metrics_input, index=None, base=None):
+    return {"sets": base["sets"] * 2}
+
+
+def test_shared_input_round_trips_columns(sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+
+    with SharedInput(columnar) as shared:
+        attached, shm = attach_input(shared.layout)
+        try:
+            assert attached.sets == columnar.sets
+            assert attached.sessions == columnar.sessions
+            assert attached.exercises == columnar.exercises
+            assert not attached.set_columns.weight.flags.writeable
+        finally:
+            del attached
+            shm.close()
+
+
+def test_parallel_mode_matches_sequential(sample_input):
+    assert compute_all_metrics(sample_input, workers=2) == compute_all_metrics(sample_input)
+
+
+def test_parallel_runner_keeps_error_isolation(sample_input):
+    runner = ParallelMetricRunner(
+        max_workers=2,
+        registry={
+            "base": MetricNode("base", _set_count),
+            "doubled": MetricNode("doubled", _doubled, requires=("base",)),
+            "broken": MetricNode("broken", _broken),
+            "after_broken": MetricNode("after_broken", _doubled, requires=("broken",)),
+        },
+    )
+    try:
+        results = runner.run(sample_input, ["doubled", "broken", "after_broken"])
+    finally:
+        runner.shutdown()
+
+    assert results["doubled"] == {"sets": 10}
+    assert results["broken"] == {"error": "boom"}
+    assert results["after_broken"]["error"].startswith("Dependency 'broken' failed")
+
+
+def test_worker_state_is_released_with_its_mapping(sample_input):
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+
+    with SharedInput(columnar) as shared:
+        result, _, _ = parallel._worker_compute(shared.layout, MetricNode("base", _set_count), {})
+        shm = parallel._worker_state["shm"]
+        parallel._release_worker_state()
+
+    assert result == {"sets": 5}
+    assert parallel._worker_state == {}
+    assert shm.buf is None
+
+
+def test_concurrent_sessions_share_one_pool(monkeypatch):
+    def _slow_pool(**kwargs):
+        time.sleep(0.01)
+        return object()
+
+    monkeypatch.setattr(parallel, "ProcessPoolExecutor", _slow_pool)
+    runner = ParallelMetricRunner(max_workers=2)
+    barrier = Barrier(8)
+    pools = []
+
+    def _session():
+        barrier.wait()
+        pools.append(runner._pool())
+
+    threads = [Thread(target=_session) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len({id(pool) for pool in pools}) == 1
+
+
+def test_node_cancelled_by_another_sessions_shutdown_runs_in_process(sample_input):
+    runner = ParallelMetricRunner(registry={"base": MetricNode("base", _set_count)})
+    columnar = ColumnarMetricsInput.from_metrics_input(sample_input)
+    future = Future()
+    future.cancel()
+
+    assert runner._collect(future, object(), columnar, "base", None, {}, None) == {"sets": 5}
@@ -1,13 +1,31 @@
-from db.queries import insert_exercise
+from datetime import date, time
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from db.exercise_muscle_resolver import MuscleTarget
+from db.queries import (
+    NewExercise,
+    copy_workouts,
+    insert_exercise,
+    insert_exercises,
+    insert_workout,
+    prune_deleted_rows,
+)
 
 
 class _Result:
-    def __init__(self, value):
+    def __init__(self, value, rows=()):
         self.value = value
+        self.rows = list(rows)
 
     def scalar(self):
         return self.value
 
+    def __iter__(self):
+        return iter(self.rows)
+
 
 class _Connection:
     def __init__(self):
@@ -16,7 +34,8 @@ class _Connection:
     def execute(self, query, params=None):
         self.executed.append((str(query), params))
         if "RETURNING exercise_id" in str(query):
-            return _Result(53)
+            names = [params[f"exercise_name_{i}"] for i in range(len(params) // 3)]
+            return _Result(None, [(53 + i, name) for i, name in enumerate(names)])
         return _Result(None)
 
 
@@ -39,26 +58,25 @@ class _Engine:
         return _BeginContext(self.conn)
 
 
-def test_insert_exercise_assigns_next_exercise_id():
+def test_insert_exercise_leaves_the_id_to_the_sequence():
     engine = _Engine()
 
     assert insert_exercise(engine, "Incline Press", "Push", "Chest") is True
 
-    lock_query, lock_params = engine.conn.executed[0]
-    exercise_query, exercise_params = engine.conn.executed[1]
-    muscle_query, muscle_params = engine.conn.executed[2]
-    assert lock_query == "LOCK TABLE exercises IN EXCLUSIVE MODE"
-    assert lock_params is None
-    assert "exercise_id, exercise_name, category, body_part" in exercise_query
-    assert "COALESCE(MAX(exercise_id), 0) + 1" in exercise_query
+    exercise_query, exercise_params = engine.conn.executed[0]
+    muscle_query, muscle_params = engine.conn.executed[1]
+    assert not any("LOCK TABLE" in query for query, _ in engine.conn.executed)
+    assert "INSERT INTO exercises (exercise_name, category, body_part)" in exercise_query
+    assert "MAX(exercise_id)" not in exercise_query
     assert exercise_params == {
-        "name": "Incline Press",
-        "category": "Push",
-        "body_part": "Chest",
+        "exercise_name_0": "Incline Press",
+        "category_0": "Push",
+        "body_part_0": "Chest",
     }
     assert "INSERT INTO exercise_muscle_map" in muscle_query
     assert "muscle_group" in muscle_query
     assert "set_factor" in muscle_query
+    assert {row["exercise_id"] for row in muscle_params} == {53}
     assert {row["muscle_group"] for row in muscle_params} == {
         "Chest",
         "Shoulders",
@@ -66,17 +84,62 @@ def test_insert_exercise_assigns_next_exercise_id():
     }
 
 
+def test_insert_exercises_writes_a_batch_with_two_statements():
+    engine = _Engine()
+    plank_target = MuscleTarget("Core", "Rectus abdominis", "primary", 1.0, "test")
+
+    exercise_ids = insert_exercises(
+        engine,
+        [NewExercise("T-Bar Row"), NewExercise("Plank", "Core", "Core", [plank_target])],
+    )
+
+    assert exercise_ids == [53, 54]
+    assert len(engine.conn.executed) == 2
+    exercise_params = engine.conn.executed[0][1]
+    muscle_params = engine.conn.executed[1][1]
+    assert exercise_params["exercise_name_0"] == "T-Bar Row"
+    assert exercise_params["category_0"] == "Pull"
+    assert (exercise_params["exercise_name_1"], exercise_params["body_part_1"]) == ("Plank", "Core")
+    assert {row["exercise_id"] for row in muscle_params if row["muscle_group"] == "Back"} == {53}
+    assert [row for row in muscle_params if row["exercise_id"] == 54] == [
+        {
+            "exercise_id": 54,
+            "muscle_group": "Core",
+            "muscle_name": "Rectus abdominis",
+            "role": "primary",
+            "set_factor": 1.0,
+            "source_note": "test",
+        }
+    ]
+
+
+def test_insert_exercises_rejects_duplicate_names_before_writing():
+    engine = _Engine()
+    plank_target = MuscleTarget("Core", "Rectus abdominis", "primary", 1.0, "test")
+
+    with pytest.raises(ValueError, match="Duplicate exercise names in batch: Plank"):
+        insert_exercises(
+            engine,
+            [
+                NewExercise("Plank", "Core", "Core", [plank_target]),
+                NewExercise("Plank", "Core", "Core", [plank_target]),
+            ],
+        )
+
+    assert engine.conn.executed == []
+
+
 def test_insert_exercise_resolves_t_bar_row_as_compound_pull():
     engine = _Engine()
 
     assert insert_exercise(engine, "T-Bar Row") is True
 
-    exercise_params = engine.conn.executed[1][1]
-    muscle_params = engine.conn.executed[2][1]
+    exercise_params = engine.conn.executed[0][1]
+    muscle_params = engine.conn.executed[1][1]
     assert exercise_params == {
-        "name": "T-Bar Row",
-        "category": "Pull",
-        "body_part": "Back",
+        "exercise_name_0": "T-Bar Row",
+        "category_0": "Pull",
+        "body_part_0": "Back",
     }
     assert {row["muscle_group"] for row in muscle_params} == {
         "Back",
@@ -87,3 +150,153 @@ def test_insert_exercise_resolves_t_bar_row_as_compound_pull():
     }
     assert next(row for row in muscle_params if row["muscle_group"] == "Back")["role"] == "primary"
     assert next(row for row in muscle_params if row["muscle_group"] == "Biceps")["role"] == "secondary"
+
+
+def _workout_engine():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE workout_sessions (session_id INTEGER PRIMARY KEY, session_date TEXT, "
+            "start_time TEXT, end_time TEXT, notes TEXT)"
+        ))
+        conn.execute(text("CREATE TABLE exercises (exercise_id INTEGER PRIMARY KEY, exercise_name TEXT)"))
+        conn.execute(text(
+            "CREATE TABLE workout_exercises (workout_exercise_id INTEGER PRIMARY KEY, "
+            "session_id INTEGER, exercise_id INTEGER)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE workout_sets (set_id INTEGER PRIMARY KEY, workout_exercise_id INTEGER, "
+            "set_number INTEGER, repetitions INTEGER, weight REAL, duration_seconds INTEGER, rir INTEGER)"
+        ))
+        conn.execute(text("INSERT INTO exercises VALUES (1, 'Bench Press'), (2, 'Plank')"))
+    return engine
+
+
+def test_insert_workout_writes_session_exercises_and_sets(monkeypatch):
+    monkeypatch.setattr("db.queries._INSERT_BATCH_ROWS", 2)
+    engine = _workout_engine()
+
+    imported = insert_workout(
+        engine,
+        "2026-05-01",
+        [
+            {"name": "Bench Press", "sets": [{"reps": 8, "weight": 100.0, "rir": 2}] * 3},
+            {"name": "Plank", "sets": [{"reps": 0, "weight": 0.0, "rir": None, "duration_seconds": 60}]},
+            {"name": "Bench Press", "sets": [{"reps": 12, "weight": 60.0, "rir": 0}]},
+        ],
+        notes="Imported",
+    )
+
+    with engine.connect() as conn:
+        exercises = conn.execute(text(
+            "SELECT workout_exercise_id, session_id, exercise_id FROM workout_exercises ORDER BY 1"
+        )).all()
+        sets = conn.execute(text(
+            "SELECT set_id, workout_exercise_id, set_number, repetitions, duration_seconds FROM workout_sets ORDER BY 1"
+        )).all()
+
+    assert imported.workout_exercise_ids == [row[0] for row in exercises]
+    assert [row[1:] for row in exercises] == [(imported.session_id, 1), (imported.session_id, 2), (imported.session_id, 1)]
+    assert [len(ids) for ids in imported.set_ids] == [3, 1, 1]
+    assert {
+        set_id: (workout_exercise_id, number)
+        for workout_exercise_id, ids in zip(imported.workout_exercise_ids, imported.set_ids)
+        for number, set_id in enumerate(ids, start=1)
+    } == {row[0]: (row[1], row[2]) for row in sets}
+    assert sets[3][3:] == (0, 60)
+
+
+def test_insert_workout_writes_nothing_when_an_exercise_is_unknown():
+    engine = _workout_engine()
+
+    with pytest.raises(ValueError, match="Squat"):
+        insert_workout(
+            engine,
+            "2026-05-01",
+            [
+                {"name": "Bench Press", "sets": [{"reps": 8, "weight": 100.0, "rir": 2}]},
+                {"name": "Squat", "sets": [{"reps": 5, "weight": 140.0, "rir": 1}]},
+            ],
+        )
+
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM workout_sessions")).scalar() == 0
+
+
+def test_insert_workout_adds_to_the_session_already_on_that_date():
+    engine = _workout_engine()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO workout_sessions (session_id, session_date) VALUES (5, '2026-05-01 00:00:00')"))
+
+    imported = insert_workout(
+        engine, date(2026, 5, 1), [{"name": "Plank", "sets": [{"reps": 0, "weight": 0.0, "rir": None}]}]
+    )
+
+    assert imported.session_id == 5
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM workout_sessions")).scalar() == 1
+
+
+class _CopyCursor:
+    def __init__(self):
+        self.copied = {}
+
+    def copy_expert(self, sql, buffer):
+        self.copied[sql.split()[1]] = (sql, buffer.read().splitlines())
+
+    def close(self):
+        pass
+
+
+class _CopyConnection:
+    """Connection stand-in serving sequence values and recording COPY payloads."""
+
+    def __init__(self):
+        self.cursor = _CopyCursor()
+        self.connection = SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=lambda: self.cursor))
+        self.next_ids = {"workout_sessions": 10, "workout_exercises": 100, "workout_sets": 1000}
+
+    def execute(self, query, params):
+        start = self.next_ids[params["table"]]
+        self.next_ids[params["table"]] += params["count"]
+        return SimpleNamespace(scalars=lambda: range(start, start + params["count"]))
+
+
+def test_copy_workouts_links_rows_with_reserved_ids():
+    conn = _CopyConnection()
+
+    copy_workouts(
+        conn,
+        [
+            {
+                "session_date": date(2026, 5, 1),
+                "start_time": time(10, 0),
+                "end_time": None,
+                "notes": "Imported",
+                "exercises": [
+                    {"exercise_id": 1, "sets": [{"reps": 8, "weight": 100.0, "rir": 2}] * 2},
+                    {"exercise_id": 7, "sets": [{"reps": 0, "weight": 0.0, "rir": None, "duration_seconds": 60}]},
+                ],
+            },
+        ],
+    )
+
+    copied = conn.cursor.copied
+    assert copied["workout_sessions"][1] == ["10,2026-05-01,Imported,10:00:00,"]
+    assert copied["workout_exercises"][1] == ["100,10,1", "101,10,7"]
+    assert copied["workout_sets"][1] == ["1000,100,1,8,100.0,,2", "1001,100,2,8,100.0,,2", "1002,101,1,0,0.0,60,"]
+    assert "FROM STDIN WITH (FORMAT csv)" in copied["workout_sets"][0]
+
+
+def test_prune_deleted_rows_removes_only_older_tombstones():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE sync_deletions (table_name TEXT, row_id INTEGER, deleted_at TEXT)"))
+        conn.execute(text(
+            "INSERT INTO sync_deletions VALUES "
+            "('workout_sets', 1, '2026-04-01 10:00:00'), ('workout_sets', 2, '2026-05-01 10:00:00')"
+        ))
+
+    assert prune_deleted_rows(engine, "2026-04-15 00:00:00") == 1
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT row_id FROM sync_deletions")).scalars().all() == [2]
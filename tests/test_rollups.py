@@ -0,0 +1,140 @@
+from dataclasses import asdict, replace
+from datetime import date, time
+
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from data_loader import RollupData, load_training_rollups
+from data_version import new_dataset_version
+from db.queries import get_exercise_session_rollups, get_session_rollups
+from metrics.date_filter import DateFilter
+from metrics.metrics_engine import LazyMetrics
+from metrics.rollups import ROLLUP_METRICS, RollupPartitions, TrainingRollups, rollup_metric_sources
+from models.workout_set import WorkoutSet
+from ui.body_parts_view import BodyPartsView
+from ui.utils.data_filter import filter_data_by_month
+
+
+class _RollupManager:
+    """DataManager stand-in serving the rollup queries from in-memory SQLite."""
+
+    def __init__(self, metrics_input):
+        self.engine = create_engine("sqlite://")
+        sets = pd.DataFrame([asdict(s) for s in metrics_input.sets])
+        sets.insert(0, "set_id", range(1, len(sets) + 1))
+        with self.engine.begin() as conn:
+            pd.DataFrame([asdict(s) for s in metrics_input.sessions]).to_sql("workout_sessions", conn, index=False)
+            pd.DataFrame([asdict(we) for we in metrics_input.workout_exercises]).to_sql(
+                "workout_exercises", conn, index=False
+            )
+            sets.to_sql("workout_sets", conn, index=False)
+
+    def load_session_rollups(self, start=None, end=None):
+        rollups = get_session_rollups(self.engine, start, end)
+        # SQLite returns TIME columns as text.
+        for column in ("start_time", "end_time"):
+            rollups[column] = [time.fromisoformat(value) if isinstance(value, str) else None for value in rollups[column]]
+        return rollups
+
+    def load_exercise_session_rollups(self, start=None, end=None):
+        return get_exercise_session_rollups(self.engine, start, end)
+
+
+@pytest.fixture
+def rollup_input(sample_input):
+    return replace(
+        sample_input,
+        sets=[
+            *sample_input.sets,
+            WorkoutSet(103, 2, 0, 0.0, None, 45),
+            WorkoutSet(103, 3, 10, 62.5, None),
+        ],
+    )
+
+
+@pytest.mark.parametrize(
+    "period",
+    [DateFilter.all_time(), DateFilter.for_month("2026-05"), DateFilter.between(date(2026, 4, 1), date(2026, 5, 1))],
+)
+def test_rollup_metrics_match_set_level_metrics(rollup_input, period):
+    manager = _RollupManager(rollup_input)
+    filtered, _ = filter_data_by_month(rollup_input, pd.DataFrame({"session_date": []}), period)
+
+    expected = LazyMetrics(filtered)
+    actual = LazyMetrics(
+        filtered,
+        sources=rollup_metric_sources(
+            lambda: load_training_rollups(period.bounds(), manager),
+            filtered.exercises,
+            filtered.exercise_muscle_targets,
+        ),
+    )
+
+    for name in ROLLUP_METRICS:
+        _assert_close(actual[name], expected[name])
+    assert [stage.stage for stage in actual.report.stages] == [f"{name}_source" for name in ROLLUP_METRICS]
+
+
+@pytest.mark.parametrize(
+    "period",
+    [DateFilter.all_time(), DateFilter.for_month("2026-05"), DateFilter.between(date(2026, 4, 1), date(2026, 5, 1))],
+)
+def test_rollup_partitions_match_the_rollups_queried_for_a_period(rollup_input, period):
+    manager = _RollupManager(rollup_input)
+    partitions = RollupPartitions(load_training_rollups(None, manager))
+
+    actual = partitions.get(period)
+    expected = load_training_rollups(period.bounds(), manager)
+
+    # The all-time query widens integer columns with NULLs elsewhere to float.
+    pd.testing.assert_frame_equal(actual.sessions, expected.sessions, check_dtype=False)
+    pd.testing.assert_frame_equal(actual.exercise_sessions, expected.exercise_sessions, check_dtype=False)
+    assert partitions.months == ["2026-04", "2026-05"]
+    assert partitions.date_span == (date(2026, 4, 20), date(2026, 5, 8))
+
+
+def test_rollup_page_computes_body_parts_from_the_rollups_version_only(rollup_input):
+    import streamlit_app
+
+    rollups = RollupData(
+        rollup_input.exercises,
+        rollup_input.exercise_muscle_targets,
+        {},
+        new_dataset_version(),
+        RollupPartitions(load_training_rollups(None, _RollupManager(rollup_input))),
+    )
+
+    metrics = streamlit_app._rollup_metrics(rollups, DateFilter.all_time())
+    metrics.prefetch(BodyPartsView.REQUIRED_METRICS)
+
+    assert metrics.computed == ("body_parts",)
+    assert streamlit_app._rollup_metrics(rollups, DateFilter.all_time()) is metrics
+    _assert_close(metrics["body_parts"], LazyMetrics(rollup_input)["body_parts"])
+
+
+def _assert_close(actual, expected):
+    if isinstance(expected, dict):
+        assert actual.keys() == expected.keys()
+        for key in expected:
+            _assert_close(actual[key], expected[key])
+    elif isinstance(expected, list):
+        assert len(actual) == len(expected)
+        for actual_item, expected_item in zip(actual, expected):
+            _assert_close(actual_item, expected_item)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected)
+    else:
+        assert actual == expected
+
+
+def test_failing_source_falls_back_to_set_level_metrics(sample_input):
+    def _unavailable() -> TrainingRollups:
+        raise RuntimeError("database unavailable")
+
+    metrics = LazyMetrics(
+        sample_input,
+        sources=rollup_metric_sources(_unavailable, sample_input.exercises, sample_input.exercise_muscle_targets),
+    )
+
+    assert metrics["sessions"] == LazyMetrics(sample_input)["sessions"]
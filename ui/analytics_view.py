@@ -53,6 +53,8 @@ class AnalyticsView:
     - fatigue_metrics: Fatigue scores and recovery trends
     """
 
+    REQUIRED_METRICS = ("sessions", "exercises", "progress", "fatigue")
+
     def __init__(self, metrics: Dict) -> None:
         """Initialize with pre-computed analytics metrics.
         
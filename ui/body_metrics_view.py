@@ -42,6 +42,8 @@ class BodyMetricsView:
     - Forms for adding new measurements
     """
 
+    REQUIRED_METRICS = ("body",)
+
     def __init__(self, body_metrics: Dict) -> None:
         """Initialize view with pre-computed body metrics.
         
@@ -203,7 +205,6 @@ class BodyMetricsView:
                         date, weight, fat_pct, muscle_mass, fat_mass, water_mass
                     )
                     st.success("Body composition saved.")
-                    st.cache_data.clear()
                     st.rerun()
 
         with tabs[1]:
@@ -226,7 +227,6 @@ class BodyMetricsView:
                         date, chest, waist, abdomen, hips, thigh, calf, biceps
                     )
                     st.success("Body measurements saved.")
-                    st.cache_data.clear()
                     st.rerun()
 
     def _render_metric_trends_section(self, df: pd.DataFrame, section_key: str, title: str) -> None:
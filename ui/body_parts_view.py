@@ -8,13 +8,11 @@ Responsibilities:
   - Display volume and strength distribution across body parts
   - Provide comparative table of body parts ranked by volume
   
-All metrics are pre-computed in the exercise_metrics layer; this view aggregates and presents them.
+All metrics are pre-computed in the body_part_metrics layer; this view only presents them.
 """
 
 from __future__ import annotations
 
-from collections import defaultdict
-from calendar import monthrange
 import hashlib
 from typing import Dict
 
@@ -22,11 +20,22 @@ import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from metrics.body_part_metrics import summarize_body_parts
+from metrics.date_filter import DateFilter
 from ui.utils.body_heatmap import render_body_heatmap
 from ui.utils.body_parts_table import render_body_parts_table
 from ui.utils.ui_helpers import ACCENT, PLOTLY_LAYOUT, chart_label, format_number, page_title, section_header
 
 
+_DISPLAY_COLUMNS = {
+    "body_part": "Body Part",
+    "total_sets": "Total_Sets",
+    "total_volume": "Total_Volume",
+    "sessions": "Sessions",
+    "avg_1rm": "Avg_1RM",
+}
+
+
 class BodyPartsView:
     """UI view for body-part-level training distribution analysis.
     
@@ -37,148 +46,61 @@ class BodyPartsView:
     - Training balance overview
     
     Data Source:
-    - exercises_metrics: Pre-computed per-exercise metrics aggregated by body part
+    - body_part_metrics: Per-body-part aggregates derived from exercise metrics
+      (or from SQL rollups with AGGREGATION_MODE=sql)
     """
 
-    def __init__(self, exercises_metrics: Dict, selected_month: str | None = None) -> None:
-        """Initialize with pre-computed exercise metrics.
+    REQUIRED_METRICS = ("body_parts",)
+
+    def __init__(
+        self,
+        exercises_metrics: Dict | None,
+        selected_month: DateFilter | str | None = None,
+        body_part_metrics: Dict | None = None,
+    ) -> None:
+        """Initialize with pre-computed exercise and body part metrics.
         
         Args:
-            exercises_metrics: Dictionary with 'per_exercise' key containing exercise-level metrics
-            selected_month: Active global month filter, or "All time".
+            exercises_metrics: Dictionary with 'per_exercise' key containing exercise-level metrics,
+                or None when they were not computed (only used if body_part_metrics failed)
+            selected_month: Active global period filter (DateFilter, YYYY-MM month, or "All time").
+            body_part_metrics: Output of compute_body_part_metrics; summarized from
+                exercises_metrics when omitted.
         """
-        self.exercises_metrics = exercises_metrics
+        self.exercises_metrics = exercises_metrics or {}
         self.selected_month = selected_month
+        self.period = DateFilter.parse(selected_month)
+        if body_part_metrics is None or "error" in body_part_metrics:
+            body_part_metrics = summarize_body_parts(self.exercises_metrics.get("per_exercise", {}))
+        self.body_part_metrics = body_part_metrics
 
     def _build_bodypart_df(self) -> pd.DataFrame:
-        """Aggregate exercise metrics per body part.
+        """Convert the body part summary into the display table.
         
         Returns:
             DataFrame with columns: Body Part, Total_Sets, Total_Volume, Sessions, Avg_1RM
             Sorted by total volume descending.
         """
-        per_exercise = self.exercises_metrics.get("per_exercise", {})
-        if not per_exercise:
-            return pd.DataFrame()
-
-        rows = []
-        session_dates_by_part: dict[str, set] = defaultdict(set)
-
-        for row in per_exercise.values():
-            muscle_targets = row.get("muscle_targets") or []
-            if not muscle_targets and row.get("body_part"):
-                muscle_targets = [
-                    {
-                        "muscle_group": row["body_part"],
-                        "muscle_name": row["body_part"],
-                        "role": "primary",
-                        "set_factor": 1.0,
-                    }
-                ]
-
-            for target in muscle_targets:
-                body_part = target.get("muscle_group")
-                if not body_part:
-                    continue
-                factor = float(target.get("set_factor", 1.0))
-                set_exposure = float(row.get("effective_sets") or row["total_sets"])
-                rows.append(
-                    {
-                        "Body Part": str(body_part),
-                        "Total_Sets": set_exposure * factor,
-                        "Total_Volume": float(row["total_volume"]) * factor,
-                        "Avg_1RM": row.get("estimated_1rm_avg"),
-                        "Weight": max(set_exposure * factor, 0.0),
-                    }
-                )
-
-            session_points = [
-                *row.get("per_session_1rm", []),
-                *row.get("per_session_duration", []),
-            ]
-            for point in session_points:
-                date = point.get("date")
-                if date is not None:
-                    for target in muscle_targets:
-                        body_part = target.get("muscle_group")
-                        if body_part:
-                            session_dates_by_part[str(body_part)].add(pd.to_datetime(date).date())
-
+        rows = self.body_part_metrics.get("per_body_part", [])
         if not rows:
             return pd.DataFrame()
 
-        df = pd.DataFrame(rows)
-        weighted_1rm = (
-            df.dropna(subset=["Avg_1RM"])
-            .assign(Weighted_1RM=lambda x: x["Avg_1RM"] * x["Weight"])
-            .groupby("Body Part", dropna=True)
-            .agg(Weighted_1RM=("Weighted_1RM", "sum"), Weight=("Weight", "sum"))
-        )
-
-        body_df = (
-            df.groupby("Body Part", dropna=True)
-            .agg(
-                Total_Sets=("Total_Sets", "sum"),
-                Total_Volume=("Total_Volume", "sum"),
-                Avg_1RM=("Avg_1RM", "mean"),
-            )
-            .reset_index()
-        )
-        if not weighted_1rm.empty:
-            body_df = body_df.drop(columns=["Avg_1RM"]).merge(
-                weighted_1rm.reset_index(),
-                on="Body Part",
-                how="left",
-            )
-            body_df["Avg_1RM"] = body_df.apply(
-                lambda row: row["Weighted_1RM"] / row["Weight"] if row["Weight"] else None,
-                axis=1,
-            )
-            body_df = body_df.drop(columns=["Weighted_1RM", "Weight"])
-
-        body_df["Sessions"] = body_df["Body Part"].map(
-            lambda part: len(session_dates_by_part.get(str(part), set()))
-        )
-
-        return (
-            body_df.sort_values("Total_Volume", ascending=False)
-            .reset_index(drop=True)
-        )
+        return pd.DataFrame(rows).rename(columns=_DISPLAY_COLUMNS)[list(_DISPLAY_COLUMNS.values())]
 
     def _training_period(self) -> tuple[float, str]:
         """Return the filtered period length in weeks and a display label."""
-        selected_month = self.selected_month
-        if selected_month and selected_month != "All time":
-            year, month = map(int, selected_month.split("-"))
-            days_in_month = monthrange(year, month)[1]
-            start = pd.Timestamp(year=year, month=month, day=1)
-            end = pd.Timestamp(year=year, month=month, day=days_in_month)
-            today = pd.Timestamp.today().normalize()
-
-            if today.year == year and today.month == month:
-                end = min(end, today)
-
-            days = max((end - start).days + 1, 1)
-            return max(days / 7, 1.0), selected_month
-
-        dates = self._metric_dates()
-        if not dates:
+        period_weeks = self.period.period_weeks()
+        if period_weeks is not None:
+            return period_weeks, self.period.label
+
+        start = self.body_part_metrics.get("first_date")
+        end = self.body_part_metrics.get("last_date")
+        if start is None or end is None:
             return 1.0, "All time"
 
-        start = min(dates)
-        end = max(dates)
         days = max((end - start).days + 1, 1)
         return max(days / 7, 1.0), f"All time ({start:%Y-%m-%d} - {end:%Y-%m-%d})"
 
-    def _metric_dates(self) -> list[pd.Timestamp]:
-        dates = []
-        for row in self.exercises_metrics.get("per_exercise", {}).values():
-            for point in row.get("per_session_1rm", []):
-                date = point.get("date")
-                if date is not None:
-                    dates.append(pd.to_datetime(date).normalize())
-        return dates
-
     def render(self) -> None:
         """Render the complete body parts view."""
         page_title("Body Parts", "Training Distribution")
@@ -227,7 +149,7 @@ class BodyPartsView:
             )
 
     def _chart_key(self, body_df: pd.DataFrame, value_col: str) -> str:
-        return f"body_parts_{value_col}_{self.selected_month or 'all'}_{_data_signature(body_df)}"
+        return f"body_parts_{value_col}_{self.period.key}_{_data_signature(body_df)}"
 
     def _render_heatmap(self, body_df: pd.DataFrame) -> None:
         """Render training target heatmap for the active filter period."""
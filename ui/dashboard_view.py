@@ -47,6 +47,8 @@ class DashboardView:
     - sets_df: Raw set data for detailed session rendering
     """
 
+    REQUIRED_METRICS = ("sessions",)
+
     def __init__(self, metrics: dict, sets_df: pd.DataFrame) -> None:
         """Initialize with pre-computed metrics and raw set data.
         
@@ -147,7 +149,6 @@ class DashboardView:
                 with col2:
                     if st.button("Delete Session", key=f"del_{session_id}", type="secondary", use_container_width=True, icon=":material/delete:"):
                         if self.dm.delete_session(session_id):
-                            st.cache_data.clear()
                             st.toast(f"Session deleted successfully!")
                             st.rerun()
 
@@ -36,6 +36,8 @@ class ExerciseView:
     - sets_df: Raw set-level data for calculating time-series trends
     """
 
+    REQUIRED_METRICS = ("exercises",)
+
     def __init__(self, exercises_metrics: Dict, sets_df: pd.DataFrame) -> None:
         """Initialize with pre-computed exercise metrics and raw set data.
         
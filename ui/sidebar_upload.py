@@ -99,22 +99,19 @@ class SidebarUpload:
             st.sidebar.warning("Time range not found in file. Importing without time data.")
 
         try:
-            for ex in parsed:
-                norm_name = normalize(ex["name"])
-                original_name = original_map[norm_name]
-                
-                self.dm.add_full_session(
-                    session_date=workout_date,
-                    notes="Imported",
-                    exercise_name=original_name,
-                    sets_data=ex["sets"],
-                    session_start=start_time,
-                    session_end=end_time
-                )
+            self.dm.add_workout(
+                session_date=workout_date,
+                exercises=[
+                    {"name": original_map[normalize(ex["name"])], "sets": ex["sets"]}
+                    for ex in parsed
+                ],
+                session_start=start_time,
+                session_end=end_time,
+                notes="Imported",
+            )
 
             st.sidebar.success("Workout imported successfully!")
 
-            st.cache_data.clear()
             st.session_state.adding_exercise = False
             st.session_state.pending_exercise = None
             st.session_state.uploaded_file_name = None
@@ -147,7 +144,6 @@ class SidebarUpload:
                 st.session_state.exercise_mapping[suggested_name] = selected_exercise
                 st.session_state.adding_exercise = False
                 st.session_state.pending_exercise = None
-                st.cache_data.clear()
                 st.rerun()
                 return
             
@@ -165,7 +161,6 @@ class SidebarUpload:
             st.session_state.exercise_mapping[suggested_name] = selected_exercise_all
             st.session_state.adding_exercise = False
             st.session_state.pending_exercise = None
-            st.cache_data.clear()
             st.rerun()
             return
         
@@ -199,7 +194,6 @@ class SidebarUpload:
 
                 st.sidebar.success("Exercise added!")
                 
-                st.cache_data.clear()
                 st.session_state.adding_exercise = False
                 st.session_state.pending_exercise = None
                 st.rerun()
@@ -377,11 +371,11 @@ class SidebarUpload:
                 rir_values.extend(self._parse_rir_values(line))
 
         if not set_tokens:
-            st.sidebar.warning(f"Exercise '{name}': no valid sets found.")
+            self._warn(f"Exercise '{name}': no valid sets found.")
             return []
 
         if rir_values and len(rir_values) != len(set_tokens):
-            st.sidebar.warning(
+            self._warn(
                 f"Exercise '{name}': set count != RIR count. Missing RIR values will be imported as empty."
             )
 
@@ -393,7 +387,7 @@ class SidebarUpload:
             duration_seconds = token.get("duration_seconds")
 
             if reps <= 0 or weight < 0 or (rir is not None and rir < 0):
-                st.sidebar.warning(f"Exercise '{name}': negative values not allowed. Set skipped.")
+                self._warn(f"Exercise '{name}': negative values not allowed. Set skipped.")
                 continue
 
             sets_data.append(
@@ -407,6 +401,10 @@ class SidebarUpload:
 
         return sets_data
 
+    def _warn(self, message: str) -> None:
+        """Report a parsing problem to the user."""
+        st.sidebar.warning(message)
+
     def _parse_work_tokens(self, line: str) -> list[dict]:
         """Find weighted or duration-based set tokens in source order."""
         tokens = []
@@ -4,13 +4,27 @@ Sidebar view.
 Responsible for:
 - global filters (time range)
 - navigation between views
+- optional performance panel
 """
 
-from typing import Optional
+from typing import Any, Dict
 import pandas as pd
 import streamlit as st
+from metrics.date_filter import ALL_TIME, ROLLING_WEEKS, DateFilter
+from metrics.partitions import MonthPartitions
+from metrics.rollups import RollupPartitions
 from ui.sidebar_upload import SidebarUpload
 
+_CUSTOM_RANGE = "Custom range"
+
+NAVIGATION_OPTIONS = (
+    "Main Dashboard",
+    "Exercises",
+    "Body Parts",
+    "Analytics",
+    "Body Metrics",
+)
+
 
 class SidebarView:
     """
@@ -22,41 +36,63 @@ class SidebarView:
     - return user selections
     """
 
-    def render_filters(self, sets_df: pd.DataFrame) -> Optional[str]:
+    def render_filters(self, partitions: MonthPartitions | RollupPartitions) -> DateFilter:
         """
         Render global sidebar filters.
 
         Currently supported:
+        - all time
+        - rolling windows over the last 4, 8 or 12 weeks
+        - custom date range
         - month selector (YYYY-MM)
 
         Parameters
         ----------
-        sets_df : pd.DataFrame
-            Set-level dataframe containing `session_date`.
+        partitions : MonthPartitions or RollupPartitions
+            Month index built at load time; supplies the available months
+            and the date span of the data.
 
         Returns
         -------
-        Optional[str]
-            Selected month in YYYY-MM format, or None.
+        DateFilter
+            Selected period.
         """
         st.sidebar.header("Filters")
 
-        if sets_df is None or sets_df.empty:
-            st.sidebar.info("No data available.")
-            return None
-
-        df = sets_df.copy()
-        df["session_date"] = pd.to_datetime(df["session_date"])
-
-        available_months = (df["session_date"].dt.to_period("M").astype(str).sort_values().unique())
-        month_options = ["All time", *available_months]
-        
+        available_months = partitions.months if partitions is not None else []
         if len(available_months) == 0:
-            return None
-        
-        selected_month = st.sidebar.selectbox("Select month",options=month_options,index=0)
-        
-        return selected_month
+            st.sidebar.info("No data available.")
+            return DateFilter.all_time()
+
+        rolling_options = {f"Last {weeks} weeks": weeks for weeks in ROLLING_WEEKS}
+        period_options = [ALL_TIME, *rolling_options, _CUSTOM_RANGE, *available_months]
+        selected_period = st.sidebar.selectbox("Select period", options=period_options, index=0)
+
+        if selected_period == ALL_TIME:
+            return DateFilter.all_time()
+        if selected_period in rolling_options:
+            return DateFilter.last_weeks(rolling_options[selected_period])
+        if selected_period == _CUSTOM_RANGE:
+            return self._render_date_range(partitions)
+        return DateFilter.for_month(selected_period)
+
+    def _render_date_range(self, partitions: MonthPartitions | RollupPartitions) -> DateFilter:
+        """Start/end date picker bounded by the dates present in the data."""
+        first_date, last_date = partitions.date_span
+        selected = st.sidebar.date_input(
+            "Date range",
+            value=(first_date, last_date),
+            min_value=first_date,
+            max_value=last_date,
+        )
+        # The picker returns a single date while the range is half selected.
+        if not isinstance(selected, (tuple, list)):
+            selected = (selected,)
+        if len(selected) == 0:
+            return DateFilter.between(first_date, last_date)
+        start = selected[0]
+        end = selected[1] if len(selected) > 1 else start
+        return DateFilter.between(start, end)
 
     def render_navigation(self) -> str:
         """
@@ -75,13 +111,7 @@ class SidebarView:
         st.sidebar.divider()
         st.sidebar.title("Navigation")
 
-        options = [
-            "Main Dashboard",
-            "Exercises",
-            "Body Parts",
-            "Analytics",
-            "Body Metrics",
-        ]
+        options = NAVIGATION_OPTIONS
 
         icons = {
             "Main Dashboard": ":material/dashboard:",
@@ -107,6 +137,15 @@ class SidebarView:
 
         return st.session_state.nav_selected
 
+    @staticmethod
+    def selected_page() -> str:
+        """Section selected for this run, before the navigation is rendered.
+
+        Navigation clicks are stored by a button callback, which runs before
+        the rerun, so the data for the page can be chosen up front.
+        """
+        return st.session_state.get("nav_selected", NAVIGATION_OPTIONS[0])
+
     def render_upload(self) -> None:
         """
         Render workout upload section.
@@ -114,7 +153,37 @@ class SidebarView:
         st.sidebar.divider()
         
         SidebarUpload().render()
-        
+
+    def render_performance(self, *reports: Dict[str, Any]) -> None:
+        """
+        Render a collapsed "Performance" panel with per-stage timings.
+
+        Parameters
+        ----------
+        *reports : dict
+            ``PerformanceReport.to_dict()`` summaries (e.g. data load and
+            metric computation of the current rerun).
+        """
+        reports = [report for report in reports if report and report.get("stages")]
+        if not reports:
+            return
+
+        with st.sidebar.expander("Performance", expanded=False):
+            for report in reports:
+                st.caption(
+                    f"{report['name']}: {report['total_wall_ms']:,.1f} ms wall, "
+                    f"{report['total_cpu_ms']:,.1f} ms CPU"
+                )
+                cardinalities = report.get("cardinalities") or {}
+                if cardinalities:
+                    st.caption(", ".join(f"{key}: {value:,}" for key, value in cardinalities.items()))
+                stages = pd.DataFrame(report["stages"])
+                st.dataframe(
+                    stages[[col for col in ("stage", "wall_ms", "cpu_ms", "rows") if col in stages]],
+                    hide_index=True,
+                    width="stretch",
+                )
+
 
 def _set_selected_nav(option: str) -> None:
     st.session_state.nav_selected = option